@@ -12,8 +12,15 @@ Renderer__ = "Arnold"
 
 """
 
-from . import shaderMain
-from . import shaderUi
+import importlib
+
+# Submodules load on first use, so batch code that only needs shaderMain never imports Qt
+_SUBMODULES = ('shaderMain', 'shaderUi', 'batchBuild')
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 autoShaderUi = None
 
@@ -27,6 +34,7 @@ def showTool():
     except:
         pass
     
+    from . import shaderUi
     autoShaderUi = shaderUi.AutoShaderTool()
     autoShaderUi.show()
 
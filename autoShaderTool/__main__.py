@@ -0,0 +1,16 @@
+"""
+Command line entry point for Auto Shader Tool
+
+python -m autoShaderTool build manifest.json --workers 4
+
+Author: Nieves Yashuang Lopez
+Version: 1.0
+
+"""
+#------------------------------------------------
+import sys
+
+from autoShaderTool import batchBuild
+
+if __name__ == "__main__":
+    sys.exit(batchBuild.main())
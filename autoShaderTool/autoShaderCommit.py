@@ -0,0 +1,54 @@
+"""
+Maya command plugin for Auto Shader Tool
+
+Runs the MDGModifier queued by nodeBuilder.ApiBuilder inside a command so
+the whole shader network lands on the undo queue as a single step.
+
+Author: Nieves Yashuang Lopez
+Version: 1.0
+
+"""
+#------------------------------------------------
+import maya.api.OpenMaya as om
+try:
+    from autoShaderTool import nodeBuilder
+except ImportError:
+    import nodeBuilder
+
+def maya_useNewAPI():
+    pass
+
+#------------------------------------------------
+class AutoShaderCommitCmd(om.MPxCommand):
+    kPluginCmdName = nodeBuilder.COMMIT_COMMAND
+
+    def __init__(self):
+        super().__init__()
+        self.modifier = None
+
+    @staticmethod
+    def creator():
+        return AutoShaderCommitCmd()
+
+    def doIt(self, args):
+        if not nodeBuilder.pendingModifiers:
+            raise RuntimeError("No shader network queued")
+        self.modifier = nodeBuilder.pendingModifiers.pop(0)
+        self.redoIt()
+
+    def redoIt(self):
+        self.modifier.doIt()
+
+    def undoIt(self):
+        self.modifier.undoIt()
+
+    def isUndoable(self):
+        return True
+
+#------------------------------------------------
+def initializePlugin(plugin):
+    om.MFnPlugin(plugin, "Nieves Yashuang Lopez", "1.0").registerCommand(
+        AutoShaderCommitCmd.kPluginCmdName, AutoShaderCommitCmd.creator)
+
+def uninitializePlugin(plugin):
+    om.MFnPlugin(plugin).deregisterCommand(AutoShaderCommitCmd.kPluginCmdName)
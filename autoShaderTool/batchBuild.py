@@ -0,0 +1,381 @@
+"""
+Headless batch build module for Auto Shader Tool
+
+Builds one Maya ASCII shader library per asset folder listed in a JSON
+manifest, spread over several mayapy worker processes.
+
+Author: Nieves Yashuang Lopez
+Version: 1.0
+
+Manifest:
+{
+    "output": "/lib/shaders",
+    "roots": ["/kits/furniture"],
+    "assets": ["/kits/props/chair", {"path": "/kits/props/lamp", "name": "deskLamp"}],
+    "options": {"useUdim": true, "namePrefix": "", "backend": "api",
+                "dedupContent": false, "convertToTx": false}
+}
+
+Every subfolder of a root is one asset. Relative paths are resolved
+against the manifest's folder.
+
+"""
+#------------------------------------------------
+import argparse
+import json
+import os
+import queue
+import shlex
+import subprocess
+import sys
+import threading
+import time
+
+# Worker lines starting with this are protocol messages, everything else is log output
+MESSAGE_PREFIX = '@@autoShader '
+DEFAULT_OPTIONS = {'useUdim': False, 'namePrefix': "", 'backend': 'api', 'dedupContent': False, 'convertToTx': False}
+
+#------------------------------------------------
+class AssetError(RuntimeError):
+    # Problem with the asset itself, retrying it would fail the same way
+    pass
+
+def getMayapyCommand(mayapy=None):
+    # Explicit command, AUTOSHADER_MAYAPY, mayapy next to the running Maya, or mayapy on PATH
+    command = mayapy or os.environ.get('AUTOSHADER_MAYAPY')
+    if command:
+        return shlex.split(command, posix=(os.name != 'nt'))
+    executableDir = os.path.dirname(sys.executable)
+    candidate = os.path.join(executableDir, 'mayapy' + ('.exe' if os.name == 'nt' else ''))
+    if os.path.exists(candidate):
+        return [candidate]
+    return ['mayapy']
+
+def loadManifest(manifestPath):
+    """Reads a manifest, returns (jobs, options).
+
+    jobs are {'name', 'path', 'output'} dicts in manifest order; names
+    that repeat get a numeric suffix so outputs never collide.
+    """
+    with open(manifestPath, 'r') as f:
+        manifest = json.load(f)
+    baseDir = os.path.dirname(os.path.abspath(manifestPath))
+    resolve = lambda path: os.path.normpath(os.path.join(baseDir, os.path.expanduser(path)))
+
+    output = resolve(manifest.get('output', 'shaderLibrary'))
+    entries = []
+    for root in manifest.get('roots', []):
+        root = resolve(root)
+        if not os.path.isdir(root):
+            raise RuntimeError(f"Manifest root does not exist: {root}")
+        entries.extend((None, entry.path) for entry in sorted(os.scandir(root), key=lambda e: e.name)
+                       if entry.is_dir() and not entry.name.startswith('.'))
+    for asset in manifest.get('assets', []):
+        if isinstance(asset, dict):
+            entries.append((asset.get('name'), resolve(asset['path'])))
+        else:
+            entries.append((None, resolve(asset)))
+
+    jobs = []
+    usedNames = set()
+    for name, path in entries:
+        name = name or os.path.basename(path)
+        uniqueName = name
+        counter = 1
+        while uniqueName.lower() in usedNames:
+            counter += 1
+            uniqueName = f"{name}_{counter}"
+        usedNames.add(uniqueName.lower())
+        jobs.append({'name': uniqueName, 'path': path, 'output': os.path.join(output, uniqueName + '.ma')})
+
+    options = dict(DEFAULT_OPTIONS)
+    options.update(manifest.get('options', {}))
+    return jobs, options
+
+#------------------------------------------------
+class WorkerProcess:
+    """One mayapy process building assets sent over stdin, one JSON line each."""
+
+    def __init__(self, command, options, logCallback=None):
+        self.command = command
+        self.options = options
+        self.logCallback = logCallback
+        self.process = None
+        self.timedOut = False
+
+    def start(self):
+        # Run as the package, the commit plugin imports nodeBuilder through it and must
+        # see the same pendingModifiers as the builder
+        packageDir = os.path.dirname(os.path.abspath(__file__))
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join([os.path.dirname(packageDir)] +
+                                            ([env['PYTHONPATH']] if env.get('PYTHONPATH') else []))
+        self.process = subprocess.Popen(self.command + ['-m', os.path.basename(packageDir), 'worker'],
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                        universal_newlines=True, bufsize=1, env=env)
+        self._send({'options': self.options})
+
+    def _send(self, message):
+        self.process.stdin.write(json.dumps(message) + '\n')
+        self.process.stdin.flush()
+
+    def build(self, job, timeout=None):
+        # Result dict from the worker; a dead, missing or timed out worker gives ok=False
+        self.timedOut = False
+        timer = None
+        try:
+            if self.process is None or self.process.poll() is not None:
+                self.start()
+            if timeout:
+                timer = threading.Timer(timeout, self._onTimeout, (self.process,))
+                timer.daemon = True
+                timer.start()
+            self._send({'job': job})
+            for line in self.process.stdout:
+                if line.startswith(MESSAGE_PREFIX):
+                    return json.loads(line[len(MESSAGE_PREFIX):])
+                if self.logCallback:
+                    self.logCallback(job['name'], line.rstrip())
+        except (OSError, ValueError, subprocess.SubprocessError) as e:
+            self.stop()
+            return {'ok': False, 'error': f"worker error: {e}"}
+        finally:
+            if timer:
+                timer.cancel()
+        self.stop()
+        if self.timedOut:
+            return {'ok': False, 'error': f"timed out after {timeout}s"}
+        return {'ok': False, 'error': "worker exited unexpectedly"}
+
+    def _onTimeout(self, process):
+        # Killing the process ends the read loop in build()
+        self.timedOut = True
+        process.kill()
+
+    def stop(self):
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=10)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+
+class BatchBuilder:
+    """Runs jobs on a pool of worker processes with retries.
+
+    Workers pull from one shared queue, so a slow asset never holds up
+    the others. A failed asset goes back on the queue until it has run
+    retries + 1 times, unless the worker marked it as a failure a retry
+    cannot fix. A worker that crashes or times out is restarted.
+    """
+
+    def __init__(self, mayapyCommand, options, workers=None, retries=1, timeout=None, logCallback=None,
+                 progressCallback=None):
+        self.mayapyCommand = list(mayapyCommand)
+        self.options = options
+        self.workers = workers or max(1, min(4, (os.cpu_count() or 2) // 2))
+        self.retries = retries
+        self.timeout = timeout
+        self.logCallback = logCallback
+        self.progressCallback = progressCallback
+        self.results = {}
+        self._lock = threading.Lock()
+
+    def run(self, jobs):
+        # {asset name: result dict} once every job succeeded or ran out of attempts
+        pending = queue.Queue()
+        for job in jobs:
+            pending.put((job, 1))
+        self.results = {}
+        # Jobs without a final result, and jobs a thread is working on right now
+        remaining = [len(jobs)]
+        active = [0]
+
+        def workerLoop():
+            worker = WorkerProcess(self.mayapyCommand, self.options, self.logCallback)
+            try:
+                while True:
+                    with self._lock:
+                        # Nothing queued or running means no job can come back, whatever remaining says
+                        if not remaining[0] or (not active[0] and pending.empty()):
+                            return
+                    try:
+                        job, attempt = pending.get(timeout=0.2)
+                    except queue.Empty:
+                        continue
+                    with self._lock:
+                        active[0] += 1
+                    try:
+                        start = time.time()
+                        try:
+                            result = worker.build(job, self.timeout)
+                        except Exception as e:
+                            result = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+                        result.update(name=job['name'], path=job['path'], attempts=attempt,
+                                      seconds=round(time.time() - start, 3))
+                        if not result.get('ok') and result.get('retry', True) and attempt <= self.retries:
+                            pending.put((job, attempt + 1))
+                            continue
+                        with self._lock:
+                            self.results[job['name']] = result
+                            remaining[0] -= 1
+                            done = len(self.results)
+                        if self.progressCallback:
+                            self.progressCallback(done, len(jobs), result)
+                    finally:
+                        with self._lock:
+                            active[0] -= 1
+            finally:
+                worker.stop()
+
+        threads = [threading.Thread(target=workerLoop, daemon=True) for _ in range(min(self.workers, len(jobs)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.results
+
+#------------------------------------------------
+def initializeMaya():
+    # Standalone Maya only exists under mayapy
+    try:
+        import maya.standalone
+    except ImportError:
+        return False
+    maya.standalone.initialize(name='python')
+    return True
+
+def buildAsset(job, options):
+    """Builds the materials of one asset folder into a new scene saved as job['output']."""
+    import maya.cmds as cmds
+    try:
+        from . import shaderMain
+    except ImportError:
+        import shaderMain
+
+    if not os.path.isdir(job['path']):
+        raise AssetError(f"Asset folder does not exist: {job['path']}")
+    cmds.file(new=True, force=True)
+    creator = shaderMain.ArnoldShaderCreator()
+    creator.builderBackend = options.get('backend', 'api')
+    creator.setUdimMode(bool(options.get('useUdim')))
+    manager = creator.textureManager
+    manager.dedupContent = bool(options.get('dedupContent'))
+    manager.convertToTx = bool(options.get('convertToTx'))
+
+    textureGroups = manager.groupTextures(job['path'])
+    if not textureGroups:
+        raise AssetError(f"No textures found in: {job['path']}")
+    materials = creator.createShaderNetworks(textureGroups, namePrefix=options.get('namePrefix', ""))
+
+    # Saved under a temporary name first so a crash never leaves a half written library
+    output = job['output']
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    tempOutput = os.path.splitext(output)[0] + f".{os.getpid()}.partial.ma"
+    cmds.file(rename=tempOutput)
+    cmds.file(save=True, type='mayaAscii', force=True)
+    os.replace(tempOutput, output)
+    return {'ok': True, 'output': output, 'materials': sorted(materials.values())}
+
+def workerMain():
+    # Reads the options line, then one job per line until stdin closes
+    initializeMaya()
+    options = {}
+    for line in sys.stdin:
+        message = json.loads(line)
+        if 'options' in message:
+            options = message['options']
+            continue
+        job = message['job']
+        try:
+            result = buildAsset(job, options)
+        except AssetError as e:
+            result = {'ok': False, 'error': str(e), 'retry': False}
+        except Exception as e:
+            result = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+        sys.stdout.write(MESSAGE_PREFIX + json.dumps(result) + '\n')
+        sys.stdout.flush()
+    try:
+        import maya.standalone
+        maya.standalone.uninitialize()
+    except (ImportError, AttributeError, RuntimeError):
+        pass
+
+#------------------------------------------------
+def printSummary(results, seconds, stream=None):
+    # sys.stdout looked up per call, it may have been redirected since import
+    stream = stream or sys.stdout
+    built = [result for result in results.values() if result.get('ok')]
+    failed = [result for result in results.values() if not result.get('ok')]
+    retried = [result for result in results.values() if result.get('attempts', 1) > 1]
+    stream.write(f"\n{len(built)} built, {len(failed)} failed, {len(retried)} needed a retry, {seconds:.1f}s\n")
+    for result in sorted(failed, key=lambda r: r['name']):
+        stream.write(f"  FAILED {result['name']} ({result['attempts']} attempts): {result.get('error')}\n")
+
+def buildMain(arguments):
+    jobs, options = loadManifest(arguments.manifest)
+    if arguments.skipExisting:
+        jobs = [job for job in jobs if not os.path.exists(job['output'])]
+    if not jobs:
+        print("Nothing to build")
+        return 0
+
+    def onProgress(done, total, result):
+        status = "ok" if result.get('ok') else "FAILED"
+        print(f"[{done}/{total}] {result['name']}: {status} ({result['seconds']:.1f}s)")
+        sys.stdout.flush()
+
+    def onLog(name, line):
+        if arguments.verbose:
+            print(f"  {name}: {line}")
+
+    builder = BatchBuilder(getMayapyCommand(arguments.mayapy), options, arguments.workers, arguments.retries,
+                           arguments.timeout, onLog, onProgress)
+    start = time.time()
+    results = dict(builder.run(jobs))
+    seconds = time.time() - start
+    # A job without a result never finished, it counts as failed
+    for job in jobs:
+        if job['name'] not in results:
+            results[job['name']] = {'ok': False, 'error': "no result", 'name': job['name'], 'path': job['path'],
+                                    'attempts': 0, 'seconds': 0.0}
+    printSummary(results, seconds)
+
+    if arguments.report:
+        report = {'manifest': os.path.abspath(arguments.manifest), 'seconds': round(seconds, 3),
+                  'built': sum(1 for result in results.values() if result.get('ok')),
+                  'failed': sum(1 for result in results.values() if not result.get('ok')),
+                  'assets': [results[job['name']] for job in jobs]}
+        with open(arguments.report, 'w') as f:
+            json.dump(report, f, indent=1)
+    return 0 if all(results[job['name']].get('ok') for job in jobs) else 1
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='autoShaderTool', description="Headless Auto Shader Tool batch builds")
+    commands = parser.add_subparsers(dest='command')
+    build = commands.add_parser('build', help="build one .ma shader library per asset in a manifest")
+    build.add_argument('manifest')
+    build.add_argument('-j', '--workers', type=int, help="mayapy worker processes")
+    build.add_argument('--retries', type=int, default=1, help="extra attempts per failed asset")
+    build.add_argument('--timeout', type=float, help="seconds per asset before its worker is killed")
+    build.add_argument('--mayapy', help="worker interpreter command, defaults to AUTOSHADER_MAYAPY or mayapy")
+    build.add_argument('--report', help="write a JSON report here")
+    build.add_argument('--skip-existing', dest='skipExisting', action='store_true')
+    build.add_argument('-v', '--verbose', action='store_true', help="echo worker output")
+    commands.add_parser('worker', help=argparse.SUPPRESS)
+    arguments = parser.parse_args(argv)
+
+    if arguments.command == 'worker':
+        workerMain()
+        return 0
+    if arguments.command == 'build':
+        return buildMain(arguments)
+    parser.print_help()
+    return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
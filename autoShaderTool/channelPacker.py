@@ -0,0 +1,226 @@
+"""
+Channel packing module for Auto Shader Tool
+
+Packs separate grayscale ao/roughness/metalness maps into one RGB image
+laid out as ORM, ARM or MRAO.
+
+Author: Nieves Yashuang Lopez
+Version: 1.0
+
+"""
+#------------------------------------------------
+import multiprocessing
+import os
+import re
+import sys
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+try:
+    from . import textureScanner
+except ImportError:
+    import textureScanner
+
+# numpy and an image library are optional, packing is unavailable without them.
+# They are imported on first use, the tool imports this module without packing anything
+np = None
+oiio = None
+Image = None
+_librariesLoaded = False
+
+# Value used for a channel without a source map
+DEFAULT_VALUES = {'ao': 1.0, 'roughness': 0.5, 'metalness': 0.0}
+TILE_PATTERNS = {textureScanner.UDIM_TOKEN: r'(1\d{3})', textureScanner.UVTILE_TOKEN: r'([uU]\d+_[vV]\d+)'}
+
+#------------------------------------------------
+def _loadLibraries():
+    global np, oiio, Image, _librariesLoaded
+    if _librariesLoaded:
+        return
+    _librariesLoaded = True
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+    try:
+        import OpenImageIO as oiio
+    except ImportError:
+        oiio = None
+    try:
+        from PIL import Image
+    except ImportError:
+        Image = None
+
+def isAvailable():
+    _loadLibraries()
+    return np is not None and (oiio is not None or Image is not None)
+
+def _checkAvailable():
+    _loadLibraries()
+    if np is None:
+        raise RuntimeError("Channel packing needs numpy")
+    if oiio is None and Image is None:
+        raise RuntimeError("Channel packing needs OpenImageIO or Pillow")
+
+def readChannel(path):
+    # First channel of the image as a 2D array, keeping its pixel type
+    _checkAvailable()
+    if oiio is not None:
+        image = oiio.ImageInput.open(path)
+        if image is None:
+            raise RuntimeError(f"Could not open {path}: {oiio.geterror()}")
+        try:
+            spec = image.spec()
+            pixels = image.read_image(0, 0, 0, 1, spec.format)
+        finally:
+            image.close()
+        if pixels is None:
+            raise RuntimeError(f"Could not read {path}")
+        return np.asarray(pixels).reshape(spec.height, spec.width)
+
+    with Image.open(path) as image:
+        if image.mode in ('P', 'RGB', 'RGBA', 'LA', 'CMYK', 'YCbCr'):
+            image = image.convert('RGBA' if image.mode == 'P' else image.mode).getchannel(0)
+        pixels = np.asarray(image)
+    # 16 bit PNGs come back as int32 from Pillow
+    if pixels.dtype == np.int32:
+        pixels = pixels.astype(np.uint16)
+    return pixels
+
+def writeImage(path, pixels):
+    # Pillow only writes 8 bit RGB and RGBA, see packChannels
+    _checkAvailable()
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    if oiio is not None:
+        height, width, channels = pixels.shape
+        image = oiio.ImageOutput.create(path)
+        if image is None:
+            raise RuntimeError(f"Could not write {path}: {oiio.geterror()}")
+        try:
+            image.open(path, oiio.ImageSpec(width, height, channels, str(pixels.dtype)))
+            image.write_image(pixels)
+        finally:
+            image.close()
+        return
+    Image.fromarray(pixels).save(path)
+
+def _maxValue(dtype):
+    return float(np.iinfo(dtype).max) if np.issubdtype(dtype, np.integer) else 1.0
+
+def _convert(pixels, dtype):
+    # Rescaled into dtype's range, e.g. 8 bit into a 16 bit output
+    values = pixels.astype(np.float64) * (_maxValue(dtype) / _maxValue(pixels.dtype))
+    if np.issubdtype(dtype, np.integer):
+        values = np.rint(np.clip(values, 0, _maxValue(dtype)))
+    return values.astype(dtype)
+
+#------------------------------------------------
+def packChannels(channelPaths, outputPath, layout='orm'):
+    """Writes one packed image from separate grayscale maps.
+
+    channelPaths is {texType: path}; channels without a map are filled
+    with DEFAULT_VALUES. Sources must share one resolution, the output
+    uses the widest pixel type among them. Without OpenImageIO the output
+    is 8 bit, with a RuntimeWarning when that loses depth.
+    """
+    _checkAvailable()
+    channelTypes = textureScanner.PACKED_LAYOUTS[layout]
+    sources = dict((texType, readChannel(path)) for texType, path in channelPaths.items()
+                   if texType in channelTypes and path)
+    if not sources:
+        raise ValueError("No channel maps to pack")
+
+    shapes = set(pixels.shape for pixels in sources.values())
+    if len(shapes) > 1:
+        raise ValueError(f"Channel maps differ in resolution: {sorted(shapes)}")
+    shape = shapes.pop()
+    dtype = np.result_type(*sources.values())
+    if oiio is None and dtype != np.uint8:
+        warnings.warn(f"{outputPath}: {dtype} maps packed as 8 bit, writing deeper RGB images needs OpenImageIO",
+                      RuntimeWarning)
+        dtype = np.dtype(np.uint8)
+    scale = _maxValue(dtype)
+
+    channels = []
+    for texType in channelTypes:
+        pixels = sources.get(texType)
+        if pixels is None:
+            channels.append(np.full(shape, DEFAULT_VALUES[texType] * scale, dtype=dtype))
+        elif pixels.dtype != dtype:
+            channels.append(_convert(pixels, dtype))
+        else:
+            channels.append(pixels)
+    writeImage(outputPath, np.stack(channels, axis=-1))
+    return outputPath
+
+def _tileFiles(path):
+    # {tile text: file} behind a tokenized path, {None: path} for a plain one
+    if not textureScanner.isTokenizedPath(path):
+        return {None: path} if os.path.exists(path) else {}
+    pattern = re.escape(path)
+    for token, tilePattern in TILE_PATTERNS.items():
+        pattern = pattern.replace(re.escape(token), tilePattern)
+    pattern = re.compile(pattern)
+    tiles = {}
+    for filePath in textureScanner.expandTiles(path):
+        match = pattern.fullmatch(filePath)
+        if match:
+            tiles[match.group(1)] = filePath
+    return tiles
+
+def _packTile(channelPaths, outputPath, layout):
+    # packChannels in a worker process, warnings go back to the parent to be shown there
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        packChannels(channelPaths, outputPath, layout)
+    return [str(warning.message) for warning in caught]
+
+def _getPoolContext():
+    # Spawned workers re-import this module; inside Maya they have to run mayapy, not the GUI
+    context = multiprocessing.get_context('spawn')
+    executable = os.path.basename(sys.executable).lower()
+    if executable.startswith('maya') and not executable.startswith('mayapy'):
+        mayapy = os.path.join(os.path.dirname(sys.executable), 'mayapy' + ('.exe' if os.name == 'nt' else ''))
+        if os.path.exists(mayapy):
+            context.set_executable(mayapy)
+    return context
+
+def packTextureSet(channelPaths, outputPath, layout='orm', maxWorkers=None):
+    """Packs maps that may be UDIM tile sets, returns {output file: error or None}.
+
+    With tokenized paths every tile found in any channel is packed into
+    the same tile of the tokenized outputPath, tiles in parallel worker
+    processes. Plain paths pack into outputPath directly.
+    """
+    _checkAvailable()
+    tiles = {}
+    for texType, path in channelPaths.items():
+        for tile, filePath in _tileFiles(path).items():
+            tiles.setdefault(tile, {})[texType] = filePath
+    if not tiles:
+        raise ValueError("No channel maps to pack")
+
+    jobs = {}
+    for tile, paths in tiles.items():
+        target = outputPath
+        if tile is not None:
+            for token in TILE_PATTERNS:
+                target = target.replace(token, tile)
+        jobs[target] = paths
+
+    if len(jobs) == 1:
+        target, paths = jobs.popitem()
+        packChannels(paths, target, layout)
+        return {target: None}
+
+    results = {}
+    workers = maxWorkers or max(1, min(len(jobs), (os.cpu_count() or 2) - 1))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_getPoolContext()) as pool:
+        futures = dict((target, pool.submit(_packTile, paths, target, layout)) for target, paths in jobs.items())
+        for target, future in futures.items():
+            try:
+                for message in future.result():
+                    warnings.warn(message, RuntimeWarning)
+                results[target] = None
+            except Exception as e:
+                results[target] = str(e)
+    return results
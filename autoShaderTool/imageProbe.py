@@ -0,0 +1,212 @@
+"""
+Image header probe module for Auto Shader Tool
+
+Reads resolution, channels and pixel type from file headers only, no
+pixel data is decoded.
+
+Author: Nieves Yashuang Lopez
+Version: 1.0
+
+"""
+#------------------------------------------------
+import os
+import struct
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+try:
+    from . import textureScanner
+except ImportError:
+    import textureScanner
+
+# dataType: 'uint', 'half' or 'float'; bitDepth is bits per channel
+ImageInfo = namedtuple('ImageInfo', 'format width height channels bitDepth dataType')
+
+HEADER_SIZE = 64 * 1024
+PNG_CHANNELS = {0: 1, 2: 3, 3: 3, 4: 2, 6: 4}
+EXR_TYPES = {0: ('uint', 32), 1: ('half', 16), 2: ('float', 32)}
+
+_cache = {}
+_cacheLock = threading.Lock()
+
+#------------------------------------------------
+def _readPng(f):
+    data = f.read(33)
+    if len(data) < 33 or data[:8] != b'\x89PNG\r\n\x1a\n' or data[12:16] != b'IHDR':
+        return None
+    width, height, bitDepth, colorType = struct.unpack('>IIBB', data[16:26])
+    channels = PNG_CHANNELS.get(colorType)
+    if channels is None:
+        return None
+    # Palette images carry alpha in a tRNS chunk before the image data
+    if colorType == 3:
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8 or chunk[4:8] == b'IDAT':
+                break
+            if chunk[4:8] == b'tRNS':
+                channels = 4
+                break
+            f.seek(struct.unpack('>I', chunk[:4])[0] + 4, os.SEEK_CUR)
+        bitDepth = 8
+    return ImageInfo('png', width, height, channels, bitDepth, 'uint')
+
+def _readJpeg(f):
+    if f.read(2) != b'\xff\xd8':
+        return None
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xff:
+            return None
+        code = marker[1]
+        if code == 0xff:
+            f.seek(-1, os.SEEK_CUR)
+            continue
+        if code in (0xd8, 0x01) or 0xd0 <= code <= 0xd7:
+            continue
+        length = struct.unpack('>H', f.read(2))[0]
+        # SOF markers, not DHT/JPG/DAC
+        if 0xc0 <= code <= 0xcf and code not in (0xc4, 0xc8, 0xcc):
+            precision, height, width, components = struct.unpack('>BHHB', f.read(6))
+            return ImageInfo('jpeg', width, height, components, precision, 'uint')
+        f.seek(length - 2, os.SEEK_CUR)
+
+def _readTiff(f):
+    order = f.read(2)
+    if order == b'II':
+        endian = '<'
+    elif order == b'MM':
+        endian = '>'
+    else:
+        return None
+    magic, offset = struct.unpack(endian + 'HI', f.read(6))
+    if magic != 42:
+        return None
+    f.seek(offset)
+    count = struct.unpack(endian + 'H', f.read(2))[0]
+    tags = {}
+    for _ in range(count):
+        tag, fieldType, valueCount, value = struct.unpack(endian + 'HHI4s', f.read(12))
+        if fieldType == 3:
+            number = struct.unpack(endian + 'H', value[:2])[0]
+        elif fieldType == 4:
+            number = struct.unpack(endian + 'I', value)[0]
+        else:
+            continue
+        # Several BitsPerSample values live at an offset, the first one is enough
+        if fieldType == 3 and valueCount > 2:
+            position = f.tell()
+            f.seek(struct.unpack(endian + 'I', value)[0])
+            number = struct.unpack(endian + 'H', f.read(2))[0]
+            f.seek(position)
+        tags[tag] = number
+    if 256 not in tags or 257 not in tags:
+        return None
+    bitDepth = tags.get(258, 1)
+    sampleFormat = tags.get(339, 1)
+    if sampleFormat == 3:
+        dataType = 'half' if bitDepth == 16 else 'float'
+    else:
+        dataType = 'uint'
+    return ImageInfo('tiff', tags[256], tags[257], tags.get(277, 1), bitDepth, dataType)
+
+def _readTga(f):
+    header = f.read(18)
+    if len(header) < 18:
+        return None
+    imageType = header[2]
+    if imageType not in (1, 2, 3, 9, 10, 11):
+        return None
+    width, height, pixelDepth, descriptor = struct.unpack('<HHBB', header[12:18])
+    alphaBits = descriptor & 0x0f
+    if imageType in (3, 11):
+        channels = 2 if alphaBits else 1
+    else:
+        channels = 4 if alphaBits else 3
+    return ImageInfo('tga', width, height, channels, 8, 'uint')
+
+def _readExr(f):
+    if f.read(8)[:4] != b'\x76\x2f\x31\x01':
+        return None
+    data = f.read(HEADER_SIZE)
+    position = 0
+    channels = []
+    width = height = None
+    while position < len(data) and data[position] != 0:
+        nameEnd = data.index(b'\0', position)
+        name = data[position:nameEnd]
+        typeEnd = data.index(b'\0', nameEnd + 1)
+        size = struct.unpack('<i', data[typeEnd + 1:typeEnd + 5])[0]
+        value = data[typeEnd + 5:typeEnd + 5 + size]
+        position = typeEnd + 5 + size
+        if name == b'channels':
+            i = 0
+            while i < len(value) and value[i] != 0:
+                channelEnd = value.index(b'\0', i)
+                channels.append(struct.unpack('<i', value[channelEnd + 1:channelEnd + 5])[0])
+                i = channelEnd + 17
+        elif name == b'dataWindow':
+            xMin, yMin, xMax, yMax = struct.unpack('<iiii', value)
+            width, height = xMax - xMin + 1, yMax - yMin + 1
+    if not channels or width is None:
+        return None
+    dataType, bitDepth = EXR_TYPES.get(max(channels), ('float', 32))
+    return ImageInfo('exr', width, height, len(channels), bitDepth, dataType)
+
+def _readHdr(f):
+    if not f.read(10).startswith((b'#?RADIANCE', b'#?RGBE')):
+        return None
+    f.readline()
+    for _ in range(64):
+        line = f.readline(512).strip()
+        if line.startswith((b'-Y', b'+Y')):
+            parts = line.split()
+            return ImageInfo('hdr', int(parts[3]), int(parts[1]), 3, 32, 'float')
+    return None
+
+READERS = {'.png': _readPng, '.jpg': _readJpeg, '.jpeg': _readJpeg, '.tif': _readTiff, '.tiff': _readTiff,
+           '.tx': _readTiff, '.tga': _readTga, '.exr': _readExr, '.hdr': _readHdr}
+
+#------------------------------------------------
+def probeImage(path):
+    """ImageInfo for path, None when the header can't be read.
+
+    Tokenized UDIM paths are probed through their first tile. Results are
+    cached per (path, mtime).
+    """
+    tiles = textureScanner.expandTiles(path)
+    if not tiles:
+        return None
+    filePath = tiles[0]
+    reader = READERS.get(os.path.splitext(filePath)[1].lower())
+    if reader is None:
+        return None
+    try:
+        mtime = os.stat(filePath).st_mtime_ns
+    except OSError:
+        return None
+
+    key = (filePath, mtime)
+    with _cacheLock:
+        if key in _cache:
+            return _cache[key]
+    try:
+        with open(filePath, 'rb') as f:
+            info = reader(f)
+    except (OSError, ValueError, IndexError, struct.error):
+        info = None
+    with _cacheLock:
+        _cache[key] = info
+    return info
+
+def probeImages(paths, maxWorkers=8):
+    # {path: ImageInfo or None}, headers read on a thread pool
+    paths = list(set(paths))
+    if len(paths) < 2:
+        return dict((path, probeImage(path)) for path in paths)
+    with ThreadPoolExecutor(max_workers=maxWorkers) as pool:
+        return dict(zip(paths, pool.map(probeImage, paths)))
+
+def clearCache():
+    with _cacheLock:
+        _cache.clear()
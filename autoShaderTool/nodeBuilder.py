@@ -0,0 +1,418 @@
+"""
+Shader network builders for Auto Shader Tool
+
+Author: Nieves Yashuang Lopez
+Version: 1.0
+
+"""
+#------------------------------------------------
+import os
+import maya.cmds as cmds
+
+COMMIT_PLUGIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'autoShaderCommit.py')
+COMMIT_COMMAND = 'autoShaderCommit'
+# File nodes showing a viewport proxy keep both paths in these string attributes
+FULL_PATH_ATTR = 'autoShaderFullPath'
+PROXY_PATH_ATTR = 'autoShaderProxyPath'
+# MPlug reader for each file node attribute queryFileNodes knows, 'path' is the full resolution path
+FILE_NODE_ATTRS = {'path': 'asString', 'fileTextureName': 'asString', 'colorSpace': 'asString',
+                   'uvTilingMode': 'asInt', 'alphaIsLuminance': 'asBool'}
+_PLUG_DEFAULTS = {'asString': '', 'asInt': 0, 'asBool': False}
+
+# Modifiers waiting for the autoShaderCommit command to run them
+pendingModifiers = []
+
+#------------------------------------------------
+class ShaderNetworkPlan:
+    """A shader network described as data before anything touches the scene.
+
+    Nodes are referenced by plan keys ('material', 'shadingGroup', ...);
+    builders turn the operations into real nodes and return {key: nodeName}.
+    """
+
+    def __init__(self):
+        self.operations = []
+
+    def createNode(self, key, nodeType, name, role):
+        # role: 'shader', 'texture', 'utility' or 'shadingGroup'
+        self.operations.append(('create', key, nodeType, name, role))
+        return key
+
+    def useNode(self, key, nodeName):
+        # Reference a node that already exists in the scene
+        self.operations.append(('use', key, nodeName))
+        return key
+
+    def shareNode(self, key, plan, planKey):
+        # Reference a node created by an earlier plan of the same commit
+        self.operations.append(('share', key, plan, planKey))
+        return key
+
+    def hasNode(self, key):
+        return any(op[1] == key for op in self.operations if op[0] in ('create', 'use', 'share'))
+
+    def addAttr(self, key, attr):
+        # Dynamic string attribute, used to tag nodes the tool created
+        self.operations.append(('addAttr', key, attr))
+
+    def setAttr(self, key, attr, value, attrType=None):
+        self.operations.append(('set', key, attr, value, attrType))
+
+    def setFilePath(self, key, path, proxied=False):
+        self.setAttr(key, 'fileTextureName', path, 'string')
+        # The old proxy no longer matches, the node shows full resolution until switched again
+        if proxied:
+            self.setAttr(key, FULL_PATH_ATTR, path, 'string')
+            self.setAttr(key, PROXY_PATH_ATTR, '', 'string')
+
+    def connect(self, srcKey, srcAttr, dstKey, dstAttr, force=False):
+        self.operations.append(('connect', srcKey, srcAttr, dstKey, dstAttr, force))
+
+    def nodes(self):
+        return [op for op in self.operations if op[0] == 'create']
+
+    def renamePrefix(self, oldPrefix, newPrefix):
+        # Renames every planned node whose name starts with oldPrefix
+        for i, op in enumerate(self.operations):
+            if op[0] == 'create' and op[3].startswith(oldPrefix):
+                self.operations[i] = op[:3] + (newPrefix + op[3][len(oldPrefix):],) + op[4:]
+
+#------------------------------------------------
+class CmdsBuilder:
+    """Commits plans through maya.cmds, one command per operation."""
+
+    def commit(self, plans):
+        results = []
+        self._planNames = {}
+        cmds.undoInfo(openChunk=True, chunkName='autoShaderTool')
+        try:
+            for plan in plans:
+                results.append(self._commitPlan(plan))
+        finally:
+            cmds.undoInfo(closeChunk=True)
+        return results
+
+    def _commitPlan(self, plan):
+        names = self._planNames[id(plan)] = {}
+        for op in plan.operations:
+            kind = op[0]
+            if kind == 'create':
+                _, key, nodeType, name, role = op
+                if role == 'shadingGroup':
+                    names[key] = cmds.sets(renderable=True, noSurfaceShader=True, empty=True, name=name)
+                elif role == 'shader':
+                    names[key] = cmds.shadingNode(nodeType, asShader=True, name=name)
+                elif role == 'texture':
+                    names[key] = cmds.shadingNode(nodeType, asTexture=True, name=name)
+                else:
+                    names[key] = cmds.shadingNode(nodeType, asUtility=True, name=name)
+            elif kind == 'use':
+                names[op[1]] = op[2]
+            elif kind == 'share':
+                names[op[1]] = self._planNames[id(op[2])][op[3]]
+            elif kind == 'addAttr':
+                cmds.addAttr(names[op[1]], longName=op[2], dataType='string')
+            elif kind == 'set':
+                _, key, attr, value, attrType = op
+                plug = names[key] + "." + attr
+                if attrType:
+                    cmds.setAttr(plug, value, type=attrType)
+                elif isinstance(value, (list, tuple)):
+                    cmds.setAttr(plug, *value)
+                else:
+                    cmds.setAttr(plug, value)
+            elif kind == 'connect':
+                _, srcKey, srcAttr, dstKey, dstAttr, force = op
+                if force:
+                    cmds.connectAttr(names[srcKey] + "." + srcAttr, names[dstKey] + "." + dstAttr, force=True)
+                else:
+                    cmds.connectAttr(names[srcKey] + "." + srcAttr, names[dstKey] + "." + dstAttr)
+        return names
+
+#------------------------------------------------
+class ApiBuilder:
+    """Commits plans through one OpenMaya MDGModifier.
+
+    Every node, attribute value and connection of every plan is queued on
+    a single modifier and applied with one doIt(), run inside the
+    autoShaderCommit command so the whole batch is one undo step. The
+    Hypershade bookkeeping that shadingNode and sets do implicitly (render
+    lists, partition, materialInfo, color management) is queued as well.
+    """
+
+    listPlugs = {'shader': ('defaultShaderList1', 'shaders'),
+                 'texture': ('defaultTextureList1', 'textures'),
+                 'utility': ('defaultRenderUtilityList1', 'utilities'),
+                 'shadingGroup': ('renderPartition', 'sets')}
+    colorManagementPlugs = [('cmEnabled', 'colorManagementEnabled'),
+                            ('configFileEnabled', 'colorManagementConfigFileEnabled'),
+                            ('configFilePath', 'colorManagementConfigFilePath'),
+                            ('workingSpaceName', 'workingSpace')]
+
+    def __init__(self):
+        import maya.api.OpenMaya as om
+        self.om = om
+        self.lastModifier = None
+
+    def commit(self, plans):
+        om = self.om
+        modifier = om.MDGModifier()
+        self._nextIndex = {}
+        self._objects = {}
+        self._planObjects = {}
+
+        planObjects = [self._queuePlan(modifier, plan) for plan in plans]
+        self._run(modifier)
+
+        results = []
+        for objects in planObjects:
+            results.append(dict((key, om.MFnDependencyNode(obj).name()) for key, obj in objects.items()))
+        return results
+
+    def _run(self, modifier):
+        self.lastModifier = modifier
+        if self._loadCommitPlugin():
+            pendingModifiers.append(modifier)
+            try:
+                getattr(cmds, COMMIT_COMMAND)()
+            finally:
+                if modifier in pendingModifiers:
+                    pendingModifiers.remove(modifier)
+        else:
+            # Not undoable from the Maya undo queue, lastModifier.undoIt() reverts it
+            modifier.doIt()
+
+    def _loadCommitPlugin(self):
+        try:
+            if not cmds.pluginInfo(COMMIT_PLUGIN, query=True, loaded=True):
+                cmds.loadPlugin(COMMIT_PLUGIN, quiet=True)
+            return True
+        except RuntimeError:
+            return False
+
+    def _queuePlan(self, modifier, plan):
+        objects = self._planObjects[id(plan)] = {}
+        for op in plan.operations:
+            kind = op[0]
+            if kind == 'create':
+                _, key, nodeType, name, role = op
+                obj = modifier.createNode(nodeType)
+                modifier.renameNode(obj, name)
+                objects[key] = obj
+                self._register(modifier, obj, nodeType, role)
+            elif kind == 'use':
+                objects[op[1]] = self._existing(op[2])
+            elif kind == 'share':
+                objects[op[1]] = self._planObjects[id(op[2])][op[3]]
+            elif kind == 'addAttr':
+                attr = self.om.MFnTypedAttribute().create(op[2], op[2], self.om.MFnData.kString)
+                modifier.addAttribute(objects[op[1]], attr)
+            elif kind == 'set':
+                _, key, attr, value, attrType = op
+                self._setPlug(modifier, self._plug(objects[key], attr), value, attrType)
+            elif kind == 'connect':
+                _, srcKey, srcAttr, dstKey, dstAttr, force = op
+                dstPlug = self._plug(objects[dstKey], dstAttr)
+                if force and dstPlug.isDestination:
+                    modifier.disconnect(dstPlug.source(), dstPlug)
+                modifier.connect(self._plug(objects[srcKey], srcAttr), dstPlug)
+        return objects
+
+    def _register(self, modifier, obj, nodeType, role):
+        listNode, listAttr = self.listPlugs[role]
+        if role == 'shadingGroup':
+            modifier.connect(self._plug(obj, 'partition'), self._nextElement(listNode, listAttr))
+            materialInfo = modifier.createNode('materialInfo')
+            modifier.connect(self._plug(obj, 'message'), self._plug(materialInfo, 'shadingGroup'))
+            return
+        modifier.connect(self._plug(obj, 'message'), self._nextElement(listNode, listAttr))
+        if nodeType == 'file':
+            globalsObj = self._existing('defaultColorMgtGlobals')
+            for src, dst in self.colorManagementPlugs:
+                modifier.connect(self._plug(globalsObj, src), self._plug(obj, dst))
+
+    def _existing(self, nodeName):
+        obj = self._objects.get(nodeName)
+        if obj is None:
+            selection = self.om.MSelectionList()
+            selection.add(nodeName)
+            obj = self._objects[nodeName] = selection.getDependNode(0)
+        return obj
+
+    def _plug(self, obj, attr):
+        return self.om.MFnDependencyNode(obj).findPlug(attr, False)
+
+    def _nextElement(self, nodeName, attr):
+        # Next free logical index, counting connections queued but not done yet
+        key = (nodeName, attr)
+        arrayPlug = self._plug(self._existing(nodeName), attr)
+        if key not in self._nextIndex:
+            indices = arrayPlug.getExistingArrayAttributeIndices()
+            self._nextIndex[key] = (max(indices) + 1) if indices else 0
+        index = self._nextIndex[key]
+        self._nextIndex[key] = index + 1
+        return arrayPlug.elementByLogicalIndex(index)
+
+    def _setPlug(self, modifier, plug, value, attrType):
+        if attrType == 'string':
+            modifier.newPlugValueString(plug, value)
+        elif isinstance(value, (list, tuple)):
+            for i, component in enumerate(value):
+                modifier.newPlugValueFloat(plug.child(i), component)
+        elif isinstance(value, bool):
+            modifier.newPlugValueBool(plug, value)
+        elif isinstance(value, int):
+            modifier.newPlugValueInt(plug, value)
+        else:
+            modifier.newPlugValueFloat(plug, value)
+
+#------------------------------------------------
+class NameAllocator:
+    """Collision-free node names from one snapshot of the scene.
+
+    Existing names are read with a single cmds.ls; a counter per base name
+    remembers the last suffix handed out, so allocation never probes the
+    scene and repeated bases do not rescan the suffixes already used.
+    """
+
+    def __init__(self):
+        self.taken = None
+        self.counters = {}
+
+    def refresh(self):
+        self.taken = set(name.split('|')[-1] for name in cmds.ls() or [])
+        self.counters = {}
+
+    def allocate(self, base, suffixes=('',)):
+        # Returns base or base_N so that base_N + suffix is free for every suffix
+        if self.taken is None:
+            self.refresh()
+        counter = self.counters.get(base, 0)
+        stem = f"{base}_{counter}" if counter else base
+        while any(stem + suffix in self.taken for suffix in suffixes):
+            counter += 1
+            stem = f"{base}_{counter}"
+        self.counters[base] = counter
+        self.reserve(stem + suffix for suffix in suffixes)
+        return stem
+
+    def reserve(self, names):
+        if self.taken is None:
+            self.refresh()
+        self.taken.update(names)
+
+#------------------------------------------------
+class FileNodeIndex:
+    """File nodes keyed on (normalized path, colorSpace, tiling mode, alphaIsLuminance).
+
+    Built from the scene on first use and extended with the file nodes of
+    every committed plan, so materials sharing a texture share its node.
+    Nodes showing a proxy are indexed by their full resolution path.
+    """
+
+    def __init__(self):
+        self.nodes = None
+        self.pending = {}
+        self.proxied = set()
+        self._pendingProxied = set()
+
+    KEY_ATTRS = ('path', 'colorSpace', 'uvTilingMode', 'alphaIsLuminance')
+
+    @staticmethod
+    def key(path, colorSpace, tilingMode, alphaIsLuminance=False):
+        return (normalizePath(path), colorSpace, int(tilingMode), bool(alphaIsLuminance))
+
+    def build(self):
+        self.nodes = {}
+        self.proxied = listProxiedFileNodes()
+        nodes = cmds.ls(type='file') or []
+        for node, values in zip(nodes, queryFileNodes(nodes, self.KEY_ATTRS, self.proxied)):
+            if values[0]:
+                self.nodes.setdefault(self.key(*values), node)
+
+    def find(self, path, colorSpace, tilingMode, alphaIsLuminance=False):
+        # Node name for scene nodes, (plan, planKey) for nodes not committed yet
+        if self.nodes is None:
+            self.build()
+        key = self.key(path, colorSpace, tilingMode, alphaIsLuminance)
+        if key in self.pending:
+            return self.pending[key]
+        node = self.nodes.get(key)
+        if node is None:
+            return None
+        # The scene may have changed since the index was built
+        if not cmds.objExists(node) or self.key(*queryFileNodes([node], self.KEY_ATTRS, self.proxied)[0]) != key:
+            del self.nodes[key]
+            return None
+        return node
+
+    def fullPath(self, node):
+        return cmds.getAttr(f"{node}.{FULL_PATH_ATTR if node in self.proxied else 'fileTextureName'}")
+
+    def addPending(self, path, colorSpace, tilingMode, plan, planKey, proxied=False, alphaIsLuminance=False):
+        key = self.key(path, colorSpace, tilingMode, alphaIsLuminance)
+        self.pending[key] = (plan, planKey)
+        if proxied:
+            self._pendingProxied.add(key)
+
+    def resolve(self, plans, results):
+        # Moves pending entries to real node names once their plans are committed
+        planNames = dict((id(plan), names) for plan, names in zip(plans, results))
+        for key, (plan, planKey) in self.pending.items():
+            names = planNames.get(id(plan))
+            if names and planKey in names and self.nodes is not None:
+                self.nodes[key] = names[planKey]
+                if key in self._pendingProxied:
+                    self.proxied.add(names[planKey])
+        self.discard()
+
+    def discard(self):
+        self.pending = {}
+        self._pendingProxied = set()
+
+#------------------------------------------------
+def listProxiedFileNodes():
+    return set(cmds.ls('*.' + FULL_PATH_ATTR, objectsOnly=True, recursive=True) or [])
+
+def queryFileNodes(nodes, attrs, proxied=()):
+    """[(value of each attr)] for every file node, read in one OpenMaya pass.
+
+    attrs are FILE_NODE_ATTRS keys; 'path' reads FULL_PATH_ATTR on proxied
+    nodes and fileTextureName on the others. Without OpenMaya every value
+    is a cmds.getAttr call.
+    """
+    try:
+        import maya.api.OpenMaya as om
+    except ImportError:
+        om = None
+    readers = [FILE_NODE_ATTRS[attr] for attr in attrs]
+
+    def plugAttr(node, attr):
+        if attr == 'path':
+            return FULL_PATH_ATTR if node in proxied else 'fileTextureName'
+        return attr
+
+    if om is None:
+        return [tuple(cmds.getAttr(f"{node}.{plugAttr(node, attr)}") or _PLUG_DEFAULTS[reader]
+                      for attr, reader in zip(attrs, readers)) for node in nodes]
+
+    selection = om.MSelectionList()
+    for node in nodes:
+        selection.add(node)
+    values = []
+    for i, node in enumerate(nodes):
+        fn = om.MFnDependencyNode(selection.getDependNode(i))
+        values.append(tuple(getattr(fn.findPlug(plugAttr(node, attr), False), reader)()
+                            for attr, reader in zip(attrs, readers)))
+    return values
+
+def normalizePath(path):
+    # Comparable form of a fileTextureName value
+    return os.path.normcase(os.path.normpath(path.replace('\\', '/')))
+
+def getBuilder(backend='cmds'):
+    if backend == 'api':
+        return ApiBuilder()
+    if backend == 'cmds':
+        return CmdsBuilder()
+    raise ValueError(f"Unknown builder backend: {backend}")
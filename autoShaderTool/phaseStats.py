@@ -0,0 +1,196 @@
+"""
+Phase timing module for Auto Shader Tool
+
+Author: Nieves Yashuang Lopez
+Version: 1.0
+
+"""
+#------------------------------------------------
+import functools
+import json
+import time
+
+#------------------------------------------------
+class _NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+_NULL_PHASE = _NullPhase()
+
+class NullStats:
+    """Stand-in used while instrumentation is off, every call is a no-op."""
+
+    enabled = False
+
+    def phase(self, name):
+        return _NULL_PHASE
+
+    def count(self, name, amount=1):
+        pass
+
+    def clock(self):
+        return 0.0
+
+    def addTime(self, name, start):
+        pass
+
+    def reset(self):
+        pass
+
+DISABLED = NullStats()
+
+def timed(name):
+    # Method decorator, runs the method as a phase of self.stats
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.stats.phase(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+#------------------------------------------------
+class _Phase:
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+        self.counters = {}
+
+    def __enter__(self):
+        stats = self.stats
+        if not stats._stack:
+            stats._installCounters()
+        self.path = '/'.join([phase.name for phase in stats._stack] + [self.name])
+        stats._stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        end = time.perf_counter()
+        stats = self.stats
+        stats._stack.pop()
+        stats._record(self.path, self.start, end - self.start, self.counters)
+        if not stats._stack:
+            stats._removeCounters()
+        return False
+
+class _CommandCounter:
+    # Wraps maya.cmds, each command call counts as 'cmdsCalls' on the active phases
+    def __init__(self, cmds, stats):
+        self._cmds = cmds
+        self._stats = stats
+
+    def __getattr__(self, name):
+        command = getattr(self._cmds, name)
+        if not callable(command):
+            return command
+        stats = self._stats
+
+        def counted(*args, **kwargs):
+            stats.count('cmdsCalls')
+            return command(*args, **kwargs)
+        setattr(self, name, counted)
+        return counted
+
+#------------------------------------------------
+class PhaseStats:
+    """Wall time and counters per named phase.
+
+    Phases nest and are keyed by their path ('createShaderNetworks/commit');
+    a phase's time and counters include its children. While the outermost
+    phase runs, the cmds attribute of every module in commandModules is
+    swapped for a counting wrapper. Every phase run is also kept as an
+    event for a Chrome trace.
+    """
+
+    enabled = True
+
+    def __init__(self, commandModules=()):
+        self.commandModules = list(commandModules)
+        self.reset()
+
+    def reset(self):
+        self.phases = {}     # path -> {'calls', 'seconds', 'counters'}
+        self.counters = {}
+        self.events = []     # (path, start, seconds, counters)
+        self._stack = []
+        self._patched = []
+        self._origin = time.perf_counter()
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+        for phase in self._stack:
+            phase.counters[name] = phase.counters.get(name, 0) + amount
+
+    def clock(self):
+        return time.perf_counter()
+
+    def addTime(self, name, start):
+        # Adds the time since start (from clock()) to a child phase of the active one
+        end = time.perf_counter()
+        path = '/'.join([phase.name for phase in self._stack] + [name])
+        self._record(path, start, end - start, {})
+
+    def _record(self, path, start, seconds, counters):
+        entry = self.phases.get(path)
+        if entry is None:
+            entry = self.phases[path] = {'calls': 0, 'seconds': 0.0, 'counters': {}}
+        entry['calls'] += 1
+        entry['seconds'] += seconds
+        for name, amount in counters.items():
+            entry['counters'][name] = entry['counters'].get(name, 0) + amount
+        self.events.append((path, start - self._origin, seconds, dict(counters)))
+
+    def _installCounters(self):
+        for module in self.commandModules:
+            cmds = getattr(module, 'cmds', None)
+            if cmds is not None and not isinstance(cmds, _CommandCounter):
+                module.cmds = _CommandCounter(cmds, self)
+                self._patched.append((module, cmds))
+
+    def _removeCounters(self):
+        for module, cmds in self._patched:
+            module.cmds = cmds
+        self._patched = []
+
+    def toDict(self):
+        return {'phases': dict((path, {'calls': entry['calls'], 'seconds': round(entry['seconds'], 6),
+                                       'counters': dict(entry['counters'])})
+                               for path, entry in self.phases.items()),
+                'counters': dict(self.counters)}
+
+    def report(self):
+        # One line per phase, children indented under their parent in first run order
+        lines = []
+        for path in sorted(self.phases, key=self._firstStart):
+            entry = self.phases[path]
+            depth = path.count('/')
+            name = path.rsplit('/', 1)[-1]
+            text = "%s%-*s %8.3fs" % ("  " * depth, 28 - 2 * depth, name, entry['seconds'])
+            if entry['calls'] > 1:
+                text += f"  x{entry['calls']}"
+            if entry['counters']:
+                text += "  " + ", ".join(f"{key} {value}" for key, value in sorted(entry['counters'].items()))
+            lines.append(text)
+        return "\n".join(lines)
+
+    def _firstStart(self, path):
+        return next((start for eventPath, start, _, _ in self.events if eventPath == path), 0.0)
+
+    def writeJson(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.toDict(), f, indent=1)
+
+    def writeChromeTrace(self, path):
+        # Complete events in microseconds, opens in chrome://tracing or Perfetto
+        events = [{'name': eventPath.rsplit('/', 1)[-1], 'cat': eventPath, 'ph': 'X', 'pid': 1, 'tid': 1,
+                   'ts': round(start * 1e6, 3), 'dur': round(seconds * 1e6, 3), 'args': counters}
+                  for eventPath, start, seconds, counters in self.events]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
@@ -0,0 +1,57 @@
+"""
+Viewport proxy module for Auto Shader Tool
+
+Author: Nieves Yashuang Lopez
+Version: 1.0
+
+"""
+#------------------------------------------------
+import hashlib
+import os
+import shlex
+try:
+    from . import scanIndex
+    from . import txConverter
+except ImportError:
+    import scanIndex
+    import txConverter
+
+# {input}, {output} and {size} are replaced per file, AUTOSHADER_PROXY_CMD overrides the whole command
+DEFAULT_COMMAND = ['oiiotool', '{input}', '--fit', '{size}x{size}', '-o', '{output}']
+DEFAULT_SIZE = 1024
+
+#------------------------------------------------
+def getProxyCommand():
+    command = os.environ.get('AUTOSHADER_PROXY_CMD')
+    if command:
+        return shlex.split(command, posix=(os.name != 'nt'))
+    return list(DEFAULT_COMMAND)
+
+def getProxyDir():
+    return os.path.join(scanIndex.getCacheDir(), 'proxies')
+
+#------------------------------------------------
+class ProxyGenerator(txConverter.ExternalConverter):
+    """Writes downscaled copies of textures into the cache directory.
+
+    Proxies live in <cache>/proxies/<size>/<folder hash>/ under the source
+    file name, so tile numbers and <UDIM> tokens carry over unchanged. A
+    proxy is rebuilt when its source is newer.
+    """
+
+    def __init__(self, size=DEFAULT_SIZE, command=None, maxWorkers=None, timeout=None, proxyDir=None):
+        super().__init__(command or getProxyCommand(), maxWorkers, timeout)
+        self.size = size
+        self.proxyDir = proxyDir or getProxyDir()
+
+    def targetPath(self, path):
+        folder = os.path.normcase(os.path.abspath(os.path.dirname(path)))
+        digest = hashlib.blake2b(folder.encode('utf-8'), digest_size=8).hexdigest()
+        return os.path.join(self.proxyDir, str(self.size), digest, os.path.basename(path)).replace('\\', '/')
+
+    def buildCommand(self, source, target):
+        return [arg.replace('{size}', str(self.size)) for arg in super().buildCommand(source, target)]
+
+    def skipPath(self, path):
+        # Already a proxy
+        return os.path.normcase(os.path.abspath(path)).startswith(os.path.normcase(os.path.abspath(self.proxyDir)))
@@ -0,0 +1,227 @@
+"""
+Persistent scan index for Auto Shader Tool
+
+Author: Nieves Yashuang Lopez
+Version: 1.0
+
+"""
+#------------------------------------------------
+import json
+import os
+import threading
+import time
+
+# Directories modified this recently are not cached, their mtime may still
+# change within the filesystem's timestamp granularity (NFS, FAT)
+RACY_WINDOW_NS = 2 * 1000000000
+# lastUsed only orders eviction, refreshing it more often would rewrite the index on every scan
+LAST_USED_INTERVAL = 3600
+INDEX_VERSION = 2
+
+_defaultIndex = None
+# Exclusive create, binary on Windows, no symlinks, like tempfile.mkstemp
+TEMP_FLAGS = os.O_RDWR | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0) | getattr(os, 'O_NOFOLLOW', 0)
+
+#------------------------------------------------
+def getCacheDir():
+    cacheDir = os.environ.get('AUTOSHADER_CACHE_DIR')
+    if not cacheDir:
+        cacheDir = os.path.join(os.path.expanduser('~'), '.autoShaderTool', 'cache')
+    return cacheDir
+
+def makeTempFile(path, suffix='.tmp'):
+    # (fd, tempPath) next to path, unique to this writer, with the permissions a plain open() gives
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    prefix = os.path.join(directory, os.path.splitext(os.path.basename(path))[0] + '.')
+    while True:
+        tempPath = prefix + os.urandom(6).hex() + suffix
+        try:
+            # Mode 0o666 lets the process umask apply, mkstemp would force 0o600
+            return os.open(tempPath, TEMP_FLAGS, 0o666), tempPath
+        except FileExistsError:
+            continue
+
+def writeJson(path, data):
+    # Written to a temp file unique to this writer, then swapped in, raises OSError
+    fd, tempPath = makeTempFile(path)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tempPath, path)
+    except BaseException:
+        try:
+            os.remove(tempPath)
+        except OSError:
+            pass
+        raise
+
+def getDefaultIndex():
+    # One index shared by every ArnoldTextureManager in the session
+    global _defaultIndex
+    if _defaultIndex is None:
+        _defaultIndex = ScanIndex(os.path.join(getCacheDir(), 'scanIndex.json'))
+    return _defaultIndex
+
+#------------------------------------------------
+class ScanIndex:
+    """On-disk record of directory listings keyed on directory mtime.
+
+    Each scanned root keeps, per directory, the mtime it was listed at, its
+    texture files and its subdirectories, plus the classifier result for
+    every file name. A directory whose mtime is unchanged is never listed
+    again, so an unchanged tree costs one stat per directory. Roots are
+    evicted least recently used first once maxEntries files are stored.
+    """
+
+    def __init__(self, indexPath, maxEntries=250000):
+        self.indexPath = indexPath
+        self.maxEntries = maxEntries
+        self.roots = None
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self.roots is not None:
+            return
+        self.roots = {}
+        try:
+            with open(self.indexPath, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                self.roots = data.get('roots', {})
+        except (OSError, ValueError):
+            pass
+
+    def openRoot(self, root, listingSignature, classifierSignature):
+        # Returns the mutable record for a scan root, dropping stale parts
+        with self._lock:
+            self._load()
+            root = os.path.normpath(root)
+            entry = self.roots.get(root)
+            if entry is None or entry.get('listing') != listingSignature:
+                entry = {'listing': listingSignature, 'classifier': classifierSignature,
+                         'dirs': {}, 'types': {}}
+                self.roots[root] = entry
+                self._dirty = True
+            elif entry.get('classifier') != classifierSignature:
+                entry['classifier'] = classifierSignature
+                entry['types'] = {}
+                self._dirty = True
+            now = time.time()
+            if now - entry.get('lastUsed', 0) > LAST_USED_INTERVAL:
+                entry['lastUsed'] = now
+                self._dirty = True
+            return entry
+
+    def listDirectory(self, entry, path, listFunc):
+        # Cached (files, subdirs) when the directory mtime is unchanged
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return listFunc(path)
+
+        dirs = entry['dirs']
+        record = dirs.get(path)
+        if record is not None and record[0] == mtime:
+            self.hits += 1
+            return ([(name, os.path.join(path, name)) for name in record[1]],
+                    [os.path.join(path, name) for name in record[2]])
+
+        files, subdirs = listFunc(path)
+        # Listings run on scanner threads while save() may be copying the entry
+        with self._lock:
+            self.misses += 1
+            if time.time_ns() - mtime > RACY_WINDOW_NS:
+                dirs[path] = [mtime, [name for name, _ in files],
+                              [os.path.basename(subdir) for subdir in subdirs]]
+            else:
+                dirs.pop(path, None)
+            self._dirty = True
+        return files, subdirs
+
+    def typeMemo(self, entry):
+        # Classifier memo for a root opened with openRoot
+        return TypeMemo(self._lock, entry['types'])
+
+    def prune(self, entry, seenDirs, seenNames):
+        # Forget directories and names that were not part of the last full scan
+        with self._lock:
+            dirs = entry['dirs']
+            for path in [path for path in dirs if path not in seenDirs]:
+                del dirs[path]
+                self._dirty = True
+            types = entry['types']
+            for name in [name for name in types if name not in seenNames]:
+                del types[name]
+                self._dirty = True
+
+    def markDirty(self):
+        self._dirty = True
+
+    def invalidate(self, directory=None):
+        with self._lock:
+            self._load()
+            if directory is None:
+                self.roots = {}
+            else:
+                directory = os.path.normpath(directory)
+                prefix = directory.rstrip(os.sep) + os.sep
+                for root in list(self.roots):
+                    if root == directory or root.startswith(prefix):
+                        del self.roots[root]
+                        continue
+                    dirs = self.roots[root]['dirs']
+                    for path in [path for path in dirs if path == directory or path.startswith(prefix)]:
+                        del dirs[path]
+            self._dirty = True
+        self.save()
+
+    def entryCount(self):
+        return sum(len(record[1]) + 1 for entry in self.roots.values() for record in entry['dirs'].values())
+
+    def _evict(self, keepRoot=None):
+        total = self.entryCount()
+        for root in sorted(self.roots, key=lambda r: self.roots[r].get('lastUsed', 0)):
+            if total <= self.maxEntries:
+                break
+            if root == keepRoot:
+                continue
+            total -= sum(len(record[1]) + 1 for record in self.roots[root]['dirs'].values())
+            del self.roots[root]
+
+    def save(self, keepRoot=None):
+        with self._lock:
+            if not self._dirty or self.roots is None:
+                return
+            self._evict(keepRoot and os.path.normpath(keepRoot))
+            # Shallow copies, records are replaced rather than changed in place
+            roots = dict((root, dict(entry, dirs=dict(entry['dirs']), types=dict(entry['types'])))
+                         for root, entry in self.roots.items())
+            try:
+                writeJson(self.indexPath, {'version': INDEX_VERSION, 'roots': roots})
+                self._dirty = False
+            except OSError:
+                pass
+
+#------------------------------------------------
+class TypeMemo:
+    """Classifier results stored with a scan root.
+
+    Lookups read the stored names directly. New results are added under
+    the index lock, prune() and save() walk the same dict from other
+    threads.
+    """
+
+    def __init__(self, lock, types):
+        self._lock = lock
+        self.types = types
+
+    def get(self, name):
+        return self.types.get(name)
+
+    def __setitem__(self, name, matched):
+        with self._lock:
+            self.types[name] = matched
@@ -0,0 +1,269 @@
+"""
+Scene texture audit module for Auto Shader Tool
+
+Indexes every file node of the scene with a few bulk queries, finds
+missing files, non .tx sources, wrong color spaces and duplicate paths,
+and applies the fixes as one undoable batch.
+
+Author: Nieves Yashuang Lopez
+Version: 1.0
+
+"""
+#------------------------------------------------
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import maya.cmds as cmds
+try:
+    from . import imageProbe
+    from . import nodeBuilder
+    from . import textureScanner
+    from . import txConverter
+except ImportError:
+    import imageProbe
+    import nodeBuilder
+    import textureScanner
+    import txConverter
+
+# materials is a tuple of (material, texType) the node feeds
+FileNodeRecord = namedtuple('FileNodeRecord', 'node path colorSpace tilingMode alphaIsLuminance proxied materials')
+# fix is None or ('fileTextureName' | 'colorSpace' | 'uvTilingMode', new value)
+AuditIssue = namedtuple('AuditIssue', 'material node texType kind detail fix')
+
+ISSUE_KINDS = ['missing', 'colorSpace', 'tiling', 'notTx', 'duplicate']
+
+#------------------------------------------------
+class SceneAuditor:
+    """Audits the file nodes of the scene against the tool's texture rules.
+
+    Attribute values come from OpenMaya in one pass over the nodes, the
+    upstream materials and texture types from the same few connection
+    queries getMaterialFileNodes uses; file checks run on a thread pool.
+    Expected color spaces follow ArnoldShaderCreator._getColorSpace.
+    """
+
+    def __init__(self, creator=None, maxWorkers=16):
+        if creator is None:
+            try:
+                from . import shaderMain
+            except ImportError:
+                import shaderMain
+            creator = shaderMain.ArnoldShaderCreator()
+        self.creator = creator
+        self.maxWorkers = maxWorkers
+        # Also point missing files at same named files found under these folders
+        self.searchDirectories = []
+        self.records = []
+        # {source: [other sources]} whose .tx would have the same name, never switched to a .tx
+        self.txCollisions = {}
+
+    @property
+    def stats(self):
+        return self.creator.stats
+
+    def buildIndex(self):
+        """[FileNodeRecord] of every file node in the scene."""
+        with self.stats.phase('index'):
+            nodes = cmds.ls(type='file') or []
+            proxied = nodeBuilder.listProxiedFileNodes()
+            values = nodeBuilder.queryFileNodes(nodes, nodeBuilder.FileNodeIndex.KEY_ATTRS, proxied)
+
+            # Upstream materials and the texture type each file node plays for them
+            materials = cmds.ls(type='aiStandardSurface') or []
+            usage = {}
+            for material, textures in self.creator.getMaterialFileNodes(materials).items():
+                for texType, node in textures.items():
+                    usage.setdefault(node, []).append((material, texType))
+
+            self.records = [FileNodeRecord(node, path, colorSpace, tilingMode, alphaIsLuminance, node in proxied,
+                                           tuple(sorted(usage.get(node, ()))))
+                            for node, (path, colorSpace, tilingMode, alphaIsLuminance) in zip(nodes, values)]
+            self.stats.count('fileNodes', len(self.records))
+        return self.records
+
+    #------------------------------------------------
+    def audit(self, convertTx=False):
+        """Builds the index and returns every AuditIssue found, sorted by material.
+
+        With convertTx, sources without an up to date .tx are converted so
+        their issue carries the switch as a fix.
+        """
+        records = self.buildIndex()
+        paths = sorted(set(record.path for record in records if record.path))
+
+        with self.stats.phase('checkFiles'):
+            with ThreadPoolExecutor(max_workers=self.maxWorkers) as pool:
+                exists = dict(zip(paths, pool.map(textureScanner.textureExists, paths)))
+                sources = [path for path in paths if exists[path] and not path.lower().endswith('.tx')]
+                txReady = dict(zip(sources, pool.map(self._hasTx, sources)))
+        self.txCollisions = txConverter.findCollisions(sources)
+        for path in self.txCollisions:
+            txReady[path] = False
+        if convertTx:
+            pending = [path for path in sources if not txReady[path] and path not in self.txCollisions]
+            if pending:
+                with self.stats.phase('convertTx'):
+                    converter = txConverter.TxConverter(self.creator.textureManager.txCommand,
+                                                        self.creator.textureManager.txWorkers)
+                    for path in converter.convertPaths(pending):
+                        txReady[path] = True
+
+        with self.stats.phase('probe'):
+            typed = [path for path in paths if exists[path]]
+            imageInfo = imageProbe.probeImages(typed, self.maxWorkers) if self.creator.probeImages else {}
+
+        missing = [record.path for record in records if record.path and not exists[record.path]]
+        candidates = self._findCandidates(missing) if missing and self.searchDirectories else {}
+
+        issues = []
+        byKey = {}
+        for record in records:
+            key = nodeBuilder.FileNodeIndex.key(record.path, record.colorSpace, record.tilingMode,
+                                                record.alphaIsLuminance)
+            if record.path:
+                byKey.setdefault(key, []).append(record.node)
+            issues.extend(self._checkRecord(record, exists, txReady, imageInfo, candidates))
+
+        # Same path, colorSpace, tiling and alphaIsLuminance loaded by several nodes
+        recordsByNode = dict((record.node, record) for record in records)
+        for key, nodes in byKey.items():
+            for node in nodes[1:]:
+                for material, texType in recordsByNode[node].materials or (('', ''),):
+                    issues.append(AuditIssue(material, node, texType, 'duplicate', f"same file as {nodes[0]}", None))
+
+        issues.sort(key=lambda issue: (issue.material, issue.node, ISSUE_KINDS.index(issue.kind)))
+        self.stats.count('issues', len(issues))
+        return issues
+
+    def _hasTx(self, path):
+        return all(txConverter.isUpToDate(source, txConverter.txPath(source))
+                   for source in textureScanner.expandTiles(path))
+
+    def _findCandidates(self, missing):
+        # {missing path: same named file under searchDirectories}, tokenized names match tokenized
+        wanted = {}
+        for path in missing:
+            wanted.setdefault(os.path.basename(path).lower(), []).append(path)
+        scanner = self.creator.textureManager.getScanner()
+        candidates = {}
+        with self.stats.phase('search'):
+            for directory in self.searchDirectories:
+                for filename, filePath in scanner.scan(directory):
+                    name = filename
+                    tile = textureScanner.splitTile(filename)
+                    if tile and tile[1].lower() in wanted:
+                        name = tile[1]
+                        filePath = os.path.join(os.path.dirname(filePath), tile[1])
+                    for path in wanted.get(name.lower(), ()):
+                        candidates.setdefault(path, filePath)
+        return candidates
+
+    def _checkRecord(self, record, exists, txReady, imageInfo, candidates):
+        materials = record.materials or (('', ''),)
+        texTypes = set(texType for _, texType in materials if texType)
+        issues = []
+
+        def add(kind, detail, fix=None):
+            for material, texType in materials:
+                issues.append(AuditIssue(material, record.node, texType, kind, detail, fix))
+
+        if not record.path:
+            add('missing', "no file set")
+            return issues
+        if not exists[record.path]:
+            candidate = candidates.get(record.path)
+            add('missing', record.path, ('fileTextureName', candidate) if candidate else None)
+            return issues
+
+        # A node shared by maps with different rules keeps its color space
+        expected = set(self.creator._getColorSpace(texType, imageInfo.get(record.path)) for texType in texTypes)
+        expected.discard(None)
+        if len(expected) == 1:
+            colorSpace = expected.pop()
+            if colorSpace != record.colorSpace:
+                add('colorSpace', f"{record.colorSpace} should be {colorSpace}", ('colorSpace', colorSpace))
+
+        if textureScanner.isTokenizedPath(record.path) and record.tilingMode == 0:
+            tilingMode = self.creator.textureManager.getTilingMode(record.path, False)
+            add('tiling', "tile tokens with uvTilingMode 0", ('uvTilingMode', tilingMode))
+
+        if not record.path.lower().endswith('.tx'):
+            if txReady.get(record.path):
+                add('notTx', os.path.basename(record.path), ('fileTextureName', txConverter.txPath(record.path)))
+            elif record.path in self.txCollisions:
+                other = os.path.basename(self.txCollisions[record.path][0])
+                add('notTx', f"{os.path.basename(record.path)}, same .tx name as {other}")
+            else:
+                add('notTx', f"{os.path.basename(record.path)}, no up to date .tx")
+        return issues
+
+    #------------------------------------------------
+    def applyFixes(self, issues):
+        """Applies the fixes of issues in one builder commit, a single undo step.
+
+        Returns the number of attribute changes made. A node listed under
+        several materials is changed once.
+        """
+        records = dict((record.node, record) for record in self.records)
+        changes = {}
+        for issue in issues:
+            if issue.fix is None or issue.node not in records:
+                continue
+            changes.setdefault(issue.node, {}).setdefault(issue.fix[0], issue.fix[1])
+        if not changes:
+            return 0
+
+        with self.stats.phase('applyFixes'):
+            plan = nodeBuilder.ShaderNetworkPlan()
+            count = 0
+            for node, attrs in sorted(changes.items()):
+                plan.useNode(node, node)
+                # Tiling goes first so Maya resolves tile tokens on the new path
+                if 'uvTilingMode' in attrs:
+                    plan.setAttr(node, 'uvTilingMode', attrs['uvTilingMode'])
+                if 'colorSpace' in attrs:
+                    plan.setAttr(node, 'colorSpace', attrs['colorSpace'], 'string')
+                if 'fileTextureName' in attrs:
+                    plan.setFilePath(node, attrs['fileTextureName'], records[node].proxied)
+                count += len(attrs)
+            self.creator.getBuilder().commit([plan])
+        return count
+
+#------------------------------------------------
+def groupByMaterial(issues):
+    # {material: [AuditIssue]}, file nodes feeding no material are under ''
+    grouped = {}
+    for issue in issues:
+        grouped.setdefault(issue.material, []).append(issue)
+    return grouped
+
+def formatReport(issues):
+    if not issues:
+        return "No texture problems found"
+    lines = []
+    for material, materialIssues in sorted(groupByMaterial(issues).items()):
+        lines.append(material or "(no material)")
+        for issue in materialIssues:
+            fixText = f"  -> {issue.fix[0]} {issue.fix[1]}" if issue.fix else ""
+            texType = f".{issue.texType}" if issue.texType else ""
+            lines.append(f"  {issue.kind:<11} {issue.node}{texType}: {issue.detail}{fixText}")
+    fixable = sum(1 for issue in issues if issue.fix)
+    lines.append(f"{len(issues)} problems on {len(groupByMaterial(issues))} materials, {fixable} fixable")
+    return "\n".join(lines)
+
+def auditScene(searchDirectories=None, fix=False, convertTx=False, backend=None):
+    """Prints the scene's texture problems grouped by material, returns the AuditIssue list.
+
+    fix applies every available fix as one undo step. backend overrides
+    the shader creator's builderBackend.
+    """
+    auditor = SceneAuditor()
+    if backend:
+        auditor.creator.builderBackend = backend
+    auditor.searchDirectories = list(searchDirectories or [])
+    issues = auditor.audit(convertTx)
+    print(formatReport(issues))
+    if fix:
+        count = auditor.applyFixes(issues)
+        cmds.inViewMessage(amg=f"Fixed {count} file node attributes", pos='midCenter', fade=True)
+    return issues
@@ -8,6 +8,60 @@ Version: 1.0
 #------------------------------------------------
 import maya.cmds as cmds
 import os
+import re
+import sys
+from collections import namedtuple
+try:
+    from . import textureScanner
+    from . import scanIndex
+    from . import nodeBuilder
+    from . import textureDedup
+    from . import txConverter
+    from . import imageProbe
+    from . import proxyGenerator
+    from . import textureStats
+    from . import phaseStats
+except ImportError:
+    import textureScanner
+    import scanIndex
+    import nodeBuilder
+    import textureDedup
+    import txConverter
+    import imageProbe
+    import proxyGenerator
+    import textureStats
+    import phaseStats
+
+# String attribute marking materials created by this tool
+TOOL_ATTR = 'autoShaderTool'
+TOOL_VERSION = '1.0'
+PLACE2D_ATTRS = ['coverage', 'translateFrame', 'rotateFrame', 'mirrorU', 'mirrorV', 'stagger', 'wrapU', 'wrapV',
+                 'repeatUV', 'offset', 'rotateUV', 'noiseUV']
+# colorSpace of the file node for every map type the material uses
+COLOR_SPACES = {'baseColor': 'sRGB', 'emission': 'sRGB', 'metalness': 'Raw', 'roughness': 'Raw',
+                'specular': 'Raw', 'opacity': 'Raw', 'normal': 'Raw', 'bump': 'Raw', 'displacement': 'Raw',
+                'orm': 'Raw', 'arm': 'Raw', 'mrao': 'Raw'}
+# Material inputs driven by single channel maps
+SCALAR_INPUTS = {'metalness': 'metalness', 'roughness': 'specularRoughness', 'specular': 'specular', 'opacity': 'opacity'}
+# aiStandardSurface input -> texture type, normalCamera is resolved through its helper node
+MATERIAL_INPUTS = {'baseColor': 'baseColor', 'metalness': 'metalness', 'specularRoughness': 'roughness',
+                   'specular': 'specular', 'emissionColor': 'emission', 'opacity': 'opacity',
+                   'normalCamera': 'normal', 'displacementShader': 'displacement'}
+HELPER_TYPES = ['aiNormalMap', 'aiBump2d', 'bump2d', 'displacementShader']
+# Maps that are analyzed for a single value, normal and bump drop out when flat
+CONSTANT_TYPES = ['baseColor', 'emission', 'metalness', 'roughness', 'specular', 'opacity', 'normal', 'bump',
+                  'orm', 'arm', 'mrao']
+# Used instead of sRGB for float/half color maps, first one the color config knows wins
+LINEAR_COLOR_SPACES = ['scene-linear Rec.709-sRGB', 'scene-linear Rec 709/sRGB']
+
+# One fileTextureName/uvTilingMode change found by planRelink
+RelinkChange = namedtuple('RelinkChange', 'material texType fileNode oldPath newPath tilingMode')
+
+#------------------------------------------------
+def _srgbToLinear(value):
+    if value <= 0.04045:
+        return value / 12.92
+    return ((value + 0.055) / 1.055) ** 2.4
 
 #------------------------------------------------
 class ArnoldTextureManager:
@@ -23,34 +77,289 @@ class ArnoldTextureManager:
             'specular': ['specular', 'spec', 'reflection', 'refl', 'specular_map', 'spec_color'],
             'emission': ['emission', 'emissive', 'glow', 'emit', 'emiss', 'selfillum', 'emission_map'],
             'ao': ['ao', 'ambient_occlusion', 'ambientocclusion', 'occlusion', 'ambientOcclusion'],
-            'opacity': ['opacity', 'alpha', 'transparent', 'transparency', 'mask']
+            'opacity': ['opacity', 'alpha', 'transparent', 'transparency', 'mask'],
+            'orm': ['orm', 'occlusionroughnessmetallic'],
+            'arm': ['arm'],
+            'mrao': ['mrao']
         }
         self.validExtensions = ['.jpg', '.jpeg', '.png', '.tif', '.tiff', '.tga', '.exr', '.hdr', '.tx']
+        self.ignorePatterns = []
+        self.maxScanDepth = None
+        self.scanWorkers = 8
+        self.firstMatchOnly = False
+        self.useScanIndex = True
+        self.scanIndex = None
+        self.useUdimMode = False
+        self.tileSets = {}
+        # Point byte-identical textures at one canonical file
+        self.dedupContent = False
+        self.dedupCount = 0
+        self.dedupBytesSaved = 0
+        # Convert found textures to .tx and use those, convertProgressCallback(done, total)
+        self.convertToTx = False
+        self.txCommand = None
+        self.txWorkers = None
+        self.convertProgressCallback = None
+        self.txConverter = None
+        # Downscaled viewport copies of found textures, {fullPath: proxyPath}
+        self.makeProxies = False
+        self.proxySize = proxyGenerator.DEFAULT_SIZE
+        self.proxyCommand = None
+        self.proxies = {}
+        self.proxyGenerator = None
+        # Phase timings, see ArnoldShaderCreator.enableStats
+        self.stats = phaseStats.DISABLED
+        self._classifier = None
+        self._classifierSignature = None
+
+    @phaseStats.timed('findTextures')
+    def findTextures(self, directory, progressCallback=None, cancelEvent=None):
+        # progressCallback(filesSeen, matchesFound) runs once per listed directory
+        # firstMatchOnly stops walking once every type is filled or covered by a packed map,
+        # results then follow walk order
+        textures = dict(self.iterTextures(directory, ordered=not self.firstMatchOnly,
+                                          progressCallback=progressCallback, cancelEvent=cancelEvent))
+        if self.dedupContent:
+            with self.stats.phase('dedup'):
+                textures = self.dedupTextures({'': textures})['']
+        if self.convertToTx and not (cancelEvent and cancelEvent.is_set()):
+            with self.stats.phase('convertTx'):
+                textures = self.convertTextures({'': textures}, cancelEvent)['']
+        if self.makeProxies and not (cancelEvent and cancelEvent.is_set()):
+            with self.stats.phase('proxies'):
+                self.createProxies(textures.values(), cancelEvent)
+        self.stats.count('texturesFound', len(textures))
+        return textures
+
+    def iterTextures(self, directory, types=None, ordered=False, progressCallback=None, cancelEvent=None):
+        """Yields (texType, path) as files are classified.
 
-    def findTextures(self, directory):
+        Stops walking as soon as every requested type is found; a packed
+        map counts for its channels, separate maps for their packed type
+        and a normal map for bump.
+        Assignment follows findTextures rules; with ordered=True the whole
+        tree is walked and sorted first, giving exactly findTextures'
+        results.
+        """
         if not os.path.exists(directory):
-            return {}
+            return
+
+        classifier = self.getClassifier()
+        wanted = set(classifier.typeOrder if types is None else types).intersection(classifier.typeOrder)
+        if not wanted:
+            return
+
+        scanner, memo = self._prepareScan(directory)
+        walk = self._iterBatches(directory, scanner, memo, progressCallback, cancelEvent)
+        batches = walk
+        if ordered:
+            allFiles = []
+            with self.stats.phase('walk'):
+                for files in walk:
+                    allFiles.extend(files)
+            batches = [allFiles]
 
         textures = {}
+        complete = False
+        try:
+            for files in batches:
+                # Classified before yielding so the time excludes the consumer
+                start = self.stats.clock()
+                files = self._collapseTiles(files)
+                files.sort()
+                found = []
+                for filename, filePath in files:
+                    texType = classifier.classify(os.path.splitext(filename.lower())[0], textures, memo)
+                    if not texType:
+                        continue
+                    textures[texType] = filePath
+                    if texType in wanted:
+                        found.append((texType, filePath))
+                    # Sorted results keep looking, a separate map wins over the packed channel
+                    complete = wanted.issubset(textures if ordered else classifier.coveredTypes(textures))
+                    if complete:
+                        break
+                self.stats.addTime('classify', start)
+                for texType, filePath in found:
+                    yield texType, filePath
+                if complete:
+                    return
+        finally:
+            walk.close()
+
+    @phaseStats.timed('groupTextures')
+    def groupTextures(self, directory):
+        # One scan, textures clustered per asset prefix: {assetName: {texType: path}}
+        if not os.path.exists(directory):
+            return {}
+
+        scanner, memo = self._prepareScan(directory)
+        with self.stats.phase('walk'):
+            allFiles = self._scanFiles(directory, scanner, memo)
+        with self.stats.phase('classify'):
+            allFiles = self._collapseTiles(allFiles)
+            allFiles.sort()
+            textureGroups = self.getClassifier().groupFiles(allFiles, memo)
+        if self.dedupContent:
+            with self.stats.phase('dedup'):
+                textureGroups = self.dedupTextures(textureGroups)
+        if self.convertToTx:
+            with self.stats.phase('convertTx'):
+                textureGroups = self.convertTextures(textureGroups)
+        if self.makeProxies:
+            with self.stats.phase('proxies'):
+                self.createProxies(path for textures in textureGroups.values() for path in textures.values())
+        self.stats.count('texturesFound', sum(len(textures) for textures in textureGroups.values()))
+        return textureGroups
+
+    def dedupTextures(self, textureGroups):
+        # Identical files across groups resolve to one path, dedupCount/dedupBytesSaved report it
+        deduplicator = textureDedup.TextureDeduplicator(textureDedup.getDefaultHashCache(), self.scanWorkers)
+        textureGroups = deduplicator.dedupGroups(textureGroups)
+        self.dedupCount = deduplicator.duplicateCount
+        self.dedupBytesSaved = deduplicator.bytesSaved
+        return textureGroups
+
+    def _scanFiles(self, directory, scanner, memo, progressCallback=None, cancelEvent=None):
         allFiles = []
-        
-        for root, _, files in os.walk(directory):
-            for filename in files:
-                if any(filename.lower().endswith(ext) for ext in self.validExtensions):
-                    allFiles.append((filename, os.path.join(root, filename)))
+        for files in self._iterBatches(directory, scanner, memo, progressCallback, cancelEvent):
+            allFiles.extend(files)
+        return allFiles
+
+    def _iterBatches(self, directory, scanner, memo, progressCallback=None, cancelEvent=None):
+        # Listed (filename, path) batches, the scan index is updated once the walk ends
+        allFiles = []
+        matchCount = 0
+        complete = False
+        classifier = self.getClassifier()
+        try:
+            for files in scanner.iterFiles(directory, cancelEvent):
+                allFiles.extend(files)
+                self.stats.count('filesScanned', len(files))
+                if progressCallback:
+                    matchCount += sum(1 for filename, _ in files
+                                      if classifier.matchedTypes(os.path.splitext(filename.lower())[0], memo))
+                    progressCallback(len(allFiles), matchCount)
+                yield files
+            complete = cancelEvent is None or not cancelEvent.is_set()
+        finally:
+            # Walks stopped early are not pruned from the index
+            self._finishScan(directory, scanner, allFiles if complete else None)
 
-        allFiles.sort()
+    def convertTextures(self, textureGroups, cancelEvent=None):
+        # Paths replaced by their .tx once converted, failures keep the source image
+        self.txConverter = txConverter.TxConverter(self.txCommand, self.txWorkers)
+        paths = [path for textures in textureGroups.values() for path in textures.values()]
+        converted = self.txConverter.convertPaths(paths, self.convertProgressCallback, cancelEvent)
+        for path, convertedPath in converted.items():
+            tileSet = self.tileSets.get(path)
+            if tileSet is not None:
+                txTileSet = textureScanner.UdimTileSet(convertedPath, tileSet.tilingMode, tileSet.uvBase)
+                txTileSet.tiles = tileSet.tiles
+                self.tileSets[convertedPath] = txTileSet
+        return dict((name, dict((texType, converted.get(path, path)) for texType, path in textures.items()))
+                    for name, textures in textureGroups.items())
 
-        for filename, filePath in allFiles:
-            nameLower = os.path.splitext(filename.lower())[0]
-            for texType, patterns in self.texturePatterns.items():
-                if texType in textures:
-                    continue
-                if any(self._patternMatch(pattern, nameLower) for pattern in patterns):
-                    textures[texType] = filePath
-                    break
+    def createProxies(self, paths, cancelEvent=None):
+        # Adds {path: proxyPath} for every path whose proxy could be made
+        self.proxyGenerator = proxyGenerator.ProxyGenerator(self.proxySize, self.proxyCommand, self.txWorkers)
+        proxies = self.proxyGenerator.convertPaths(list(paths), self.convertProgressCallback, cancelEvent)
+        self.proxies.update(proxies)
+        return proxies
 
-        return textures
+    def clone(self):
+        # Same settings and scan index, separate state, for scans on worker threads
+        manager = ArnoldTextureManager()
+        manager.textureDirectory = self.textureDirectory
+        manager.texturePatterns = dict((texType, list(patterns)) for texType, patterns in self.texturePatterns.items())
+        manager.validExtensions = list(self.validExtensions)
+        manager.ignorePatterns = list(self.ignorePatterns)
+        manager.maxScanDepth = self.maxScanDepth
+        manager.scanWorkers = self.scanWorkers
+        manager.firstMatchOnly = self.firstMatchOnly
+        manager.useScanIndex = self.useScanIndex
+        manager.scanIndex = self.scanIndex
+        manager.useUdimMode = self.useUdimMode
+        manager.dedupContent = self.dedupContent
+        manager.convertToTx = self.convertToTx
+        manager.txCommand = self.txCommand
+        manager.txWorkers = self.txWorkers
+        manager.makeProxies = self.makeProxies
+        manager.proxySize = self.proxySize
+        manager.proxyCommand = self.proxyCommand
+        return manager
+
+    def _collapseTiles(self, files):
+        # UDIM mode: one (plain name, tokenized path) entry per tile set
+        if not self.useUdimMode:
+            return files
+        return textureScanner.collapseTiles(files, self.tileSets)
+
+    def getTilingMode(self, texturePath, useUdim=None):
+        # uvTilingMode for a path, tokenized paths know their own numbering
+        if useUdim is None:
+            useUdim = self.useUdimMode
+        tileSet = self.tileSets.get(texturePath)
+        if tileSet is not None:
+            return tileSet.tilingMode
+        if textureScanner.UDIM_TOKEN in texturePath:
+            return 3
+        if textureScanner.UVTILE_TOKEN in texturePath:
+            return 2
+        return 3 if useUdim else 0
+
+    def _prepareScan(self, directory):
+        scanner = self.getScanner()
+        classifier = self.getClassifier()
+        index = self.getScanIndex()
+        if index is None:
+            return scanner, None
+        entry = index.openRoot(directory, scanner.signature(), repr(self._classifierSignature))
+        scanner.attachIndex(index, entry)
+        return scanner, index.typeMemo(entry)
+
+    def _finishScan(self, directory, scanner, allFiles):
+        # allFiles is None when the walk stopped early, nothing is pruned then. A walk
+        # served entirely from the index leaves nothing to prune or write.
+        index = scanner.index
+        if index is None:
+            return
+        relisted = index.misses != scanner.indexMisses
+        if len(scanner.indexEntry['types']) != scanner.indexTypes:
+            index.markDirty()
+        if allFiles is not None and relisted:
+            seenNames = set()
+            for filename, _ in allFiles:
+                seenNames.add(os.path.splitext(filename.lower())[0])
+                tile = textureScanner.splitTile(filename)
+                if tile:
+                    seenNames.add(os.path.splitext(tile[0].lower())[0])
+            index.prune(scanner.indexEntry, scanner.visitedDirs, seenNames)
+        index.save(directory)
+
+    def getScanner(self):
+        return textureScanner.DirectoryScanner(self.validExtensions, self.ignorePatterns,
+                                               self.maxScanDepth, self.scanWorkers)
+
+    def getScanIndex(self):
+        if not self.useScanIndex:
+            return None
+        if self.scanIndex is None:
+            self.scanIndex = scanIndex.getDefaultIndex()
+        return self.scanIndex
+
+    def invalidateScanIndex(self, directory=None):
+        # Forget cached listings under directory, or everything when None
+        index = self.scanIndex or scanIndex.getDefaultIndex()
+        index.invalidate(directory)
+
+    def getClassifier(self):
+        # Rebuilt only when texturePatterns was changed (the UI updates it in place)
+        signature = textureScanner.patternSignature(self.texturePatterns)
+        if self._classifier is None or signature != self._classifierSignature:
+            self._classifier = textureScanner.TextureClassifier(self.texturePatterns)
+            self._classifierSignature = signature
+        return self._classifier
 
     def _patternMatch(self, pattern, filename):
         p, f = pattern.lower(), filename.lower()
@@ -82,146 +391,674 @@ class ArnoldShaderCreator:
     def __init__(self):
         self.textureManager = ArnoldTextureManager()
         self.useUdimMode = False
+        # 'cmds' runs one command per node/attribute, 'api' commits one MDGModifier
+        self.builderBackend = 'cmds'
+        # One place2dTexture per material instead of one per file node
+        self.sharePlace2d = True
+        # Connect to an existing file node with the same path, colorSpace and tiling
+        self.reuseFileNodes = True
+        self.reusedFileNodes = 0
+        self.fileNodeIndex = nodeBuilder.FileNodeIndex()
+        self.nameAllocator = nodeBuilder.NameAllocator()
+        # Read image headers to pick colorSpace, alphaIsLuminance and output channel
+        self.probeImages = True
+        self._imageInfo = {}
+        # Set uniform maps as attribute values instead of file nodes (needs numpy)
+        self.detectConstants = False
+        self.constantTolerance = textureStats.DEFAULT_TOLERANCE
+        self.constantMaps = 0
+        self._constants = {}
+        self._linearColorSpace = None
+        self._nodeTypes = None
+        # Objects per sets call when assigning, (item, error) of the last operation's failures
+        self.assignChunkSize = 5000
+        self.failedAssignments = []
+        self.stats = phaseStats.DISABLED
     
-    def createShaderNetwork(self, shaderName, selection):
+    @phaseStats.timed('createShaderNetwork')
+    def createShaderNetwork(self, shaderName, selection, textures=None):
         if not selection:
             raise RuntimeError("No objects selected")
         
-        if not cmds.pluginInfo('mtoa', query=True, loaded=True):
-            cmds.loadPlugin('mtoa')
+        self._ensureArnold()
+        self.reusedFileNodes = 0
+        self.failedAssignments = []
+        self.nameAllocator.refresh()
+        
+        if textures is None:
+            textureDir = self.textureManager.getTextureDirectory()
+            if not textureDir:
+                raise RuntimeError("No texture directory selected")
+            
+            textures = self.textureManager.findTextures(textureDir)
+            if not textures:
+                raise RuntimeError(f"No textures found in: {textureDir}")
+        
+        material, shadingGroup, textureCount = self._buildMaterial(shaderName, textures)
+
+        # Assign to objects
+        with self.stats.phase('assign'):
+            self._assignToShadingGroup(selection, shadingGroup)
         
-        textureDir = self.textureManager.getTextureDirectory()
-        if not textureDir:
-            raise RuntimeError("No texture directory selected")
+        modeText = "UDIM" if self.useUdimMode else "Standard"
+        message = f"Material '{material}' created successfully with {textureCount} textures ({modeText})"
+        if self.failedAssignments:
+            message += f", {len(self.failedAssignments)} objects could not be assigned"
+        if self.reusedFileNodes:
+            message += f", reused {self.reusedFileNodes} file nodes"
+        if self.constantMaps:
+            message += f", {self.constantMaps} uniform maps set as values"
+        with self.stats.phase('inViewMessage'):
+            cmds.inViewMessage(amg=message, pos='midCenter', fade=True)
+        return material
+
+    @phaseStats.timed('createShaderNetworks')
+    def createShaderNetworks(self, textureGroups, assignByName=False, namePrefix=""):
+        # Builds one material per asset group, {assetName: material}
+        if not textureGroups:
+            raise RuntimeError("No texture groups to create")
+        
+        self._ensureArnold()
+        self.reusedFileNodes = 0
+        self.failedAssignments = []
+        self.nameAllocator.refresh()
+        meshTransforms = self._getMeshTransforms() if assignByName else []
         
-        textures = self.textureManager.findTextures(textureDir)
-        if not textures:
-            raise RuntimeError(f"No textures found in: {textureDir}")
+        self._probeTextures(textureGroups.values())
+        
+        # Everything is planned first so the api backend commits the batch at once
+        plans = []
+        with self.stats.phase('plan'):
+            for assetName, textures in textureGroups.items():
+                shaderName = self._sanitizeName(namePrefix + assetName)
+                plans.append(self._planMaterial(shaderName, textures)[0])
+        nodeNames = self._commitPlans(plans)
+        
+        materials = {}
+        assignedCount = 0
+        for assetName, names in zip(textureGroups, nodeNames):
+            materials[assetName] = names['material']
+            shadingGroup = names['shadingGroup']
+            
+            if assignByName:
+                targets = [path for path, shortName in meshTransforms
+                           if self.textureManager._patternMatch(assetName, shortName)]
+                if targets:
+                    with self.stats.phase('assign'):
+                        failed = self._assignToShadingGroup(targets, shadingGroup)
+                    assignedCount += len(targets) - len(failed)
+        
+        modeText = "UDIM" if self.useUdimMode else "Standard"
+        message = f"Created {len(materials)} materials ({modeText})"
+        if assignByName:
+            message += f", assigned to {assignedCount} meshes"
+            if self.failedAssignments:
+                message += f" ({len(self.failedAssignments)} failed)"
+        if self.reusedFileNodes:
+            message += f", reused {self.reusedFileNodes} file nodes"
+        if self.constantMaps:
+            message += f", {self.constantMaps} uniform maps set as values"
+        manager = self.textureManager
+        if manager.dedupContent and manager.dedupCount:
+            message += f", {manager.dedupCount} duplicate textures ({manager.dedupBytesSaved / 1048576.0:.1f} MB) shared"
+        with self.stats.phase('inViewMessage'):
+            cmds.inViewMessage(amg=message, pos='midCenter', fade=True)
+        return materials
+
+    def enableStats(self, enabled=True):
+        """Starts recording phase timings, returns the PhaseStats (None when disabled).
+
+        The texture manager shares the same stats, so scans run by the
+        creator show up nested under its operations. Disabled, every
+        phase costs one no-op call.
+        """
+        if enabled:
+            if not self.stats.enabled:
+                self.stats = phaseStats.PhaseStats([sys.modules[__name__], nodeBuilder])
+        else:
+            self.stats = phaseStats.DISABLED
+        self.textureManager.stats = self.stats
+        return self.stats if enabled else None
+
+    def _ensureArnold(self):
+        if not cmds.pluginInfo('mtoa', query=True, loaded=True):
+            cmds.loadPlugin('mtoa')
+
+    def getBuilder(self):
+        return nodeBuilder.getBuilder(self.builderBackend)
+
+    def _buildMaterial(self, shaderName, textures):
+        self._probeTextures([textures])
+        with self.stats.phase('plan'):
+            plan, textureCount = self._planMaterial(shaderName, textures)
+        names = self._commitPlans([plan])[0]
+        return names['material'], names['shadingGroup'], textureCount
+
+    @phaseStats.timed('commit')
+    def _commitPlans(self, plans):
+        try:
+            results = self.getBuilder().commit(plans)
+        except:
+            self.fileNodeIndex.discard()
+            raise
+        self.fileNodeIndex.resolve(plans, results)
+        # Maya may still have renamed a node created outside the snapshot
+        self.nameAllocator.reserve(name for names in results for name in names.values())
+        self.stats.count('materials', len(plans))
+        self.stats.count('nodesCreated', sum(len(plan.nodes()) for plan in plans))
+        return results
+
+    def _planMaterial(self, shaderName, textures):
+        plan = nodeBuilder.ShaderNetworkPlan()
         
         # Create material
-        materialName = self._getUniqueName(shaderName + "_SHD")
-        material = cmds.shadingNode('aiStandardSurface', asShader=True, name=materialName)
-        shadingGroup = cmds.sets(renderable=True, noSurfaceShader=True, empty=True, name=shaderName + "_SG")
-        cmds.connectAttr(material + ".outColor", shadingGroup + ".surfaceShader")
+        plan.createNode('material', 'aiStandardSurface', shaderName + "_SHD", 'shader')
+        plan.addAttr('material', TOOL_ATTR)
+        plan.setAttr('material', TOOL_ATTR, TOOL_VERSION, "string")
+        plan.createNode('shadingGroup', 'shadingEngine', shaderName + "_SG", 'shadingGroup')
+        plan.connect('material', 'outColor', 'shadingGroup', 'surfaceShader')
         
         # Connect textures
         textureCount = 0
         for texType, texturePath in textures.items():
-            if self._connectTexture(texType, texturePath, shaderName, material, shadingGroup):
+            if self._connectTexture(plan, texType, texturePath, shaderName, textures):
                 textureCount += 1
+        
+        # One free stem for the material, SG and helper nodes together
+        suffixes = [op[3][len(shaderName):] for op in plan.nodes()]
+        stem = self.nameAllocator.allocate(shaderName, suffixes)
+        if stem != shaderName:
+            plan.renamePrefix(shaderName, stem)
+        return plan, textureCount
 
-        # Assign to objects
-        for obj in selection:
+    @phaseStats.timed('probe')
+    def _probeTextures(self, textureSets):
+        textureSets = list(textureSets)
+        self._imageInfo = {}
+        self._constants = {}
+        self.constantMaps = 0
+        if self.probeImages:
+            paths = [path for textures in textureSets for path in textures.values()]
+            self._imageInfo = imageProbe.probeImages(paths, self.textureManager.scanWorkers)
+        if self.detectConstants and textureStats.isAvailable():
+            paths = [path for textures in textureSets for texType, path in textures.items() if texType in CONSTANT_TYPES]
+            detector = textureStats.ConstantDetector(self.constantTolerance, textureStats.getDefaultStatsCache(),
+                                                     self.textureManager.scanWorkers)
+            self._constants = detector.findConstants(paths)
+
+    def _getColorSpace(self, texType, info):
+        colorSpace = COLOR_SPACES.get(texType)
+        if colorSpace == 'sRGB' and info is not None and info.dataType != 'uint':
+            if self._linearColorSpace is None:
+                available = cmds.colorManagementPrefs(query=True, inputSpaceNames=True) or []
+                self._linearColorSpace = next((name for name in LINEAR_COLOR_SPACES if name in available),
+                                              LINEAR_COLOR_SPACES[0])
+            return self._linearColorSpace
+        return colorSpace
+
+    def _hasNodeType(self, nodeType):
+        if self._nodeTypes is None:
+            self._nodeTypes = set(cmds.ls(nodeTypes=True) or [])
+        return nodeType in self._nodeTypes
+
+    def _assignToShadingGroup(self, objects, shadingGroup):
+        # Objects and components go in assignChunkSize at a time. A chunk that fails is
+        # split in halves until the bad items are alone, so a few bad names cost a few
+        # extra calls. Returns the [(item, error)] that could not be assigned
+        objects = list(objects)
+        chunks = [objects[start:start + self.assignChunkSize]
+                  for start in range(0, len(objects), self.assignChunkSize)]
+        chunks.reverse()
+        failed = []
+        while chunks:
+            chunk = chunks.pop()
             try:
-                cmds.sets(obj, e=True, forceElement=shadingGroup)
-            except:
-                pass
+                cmds.sets(chunk, e=True, forceElement=shadingGroup)
+                self.stats.count('assigned', len(chunk))
+            except Exception as e:
+                if len(chunk) == 1:
+                    failed.append((chunk[0], str(e).strip()))
+                else:
+                    middle = len(chunk) // 2
+                    chunks.extend((chunk[middle:], chunk[:middle]))
         
-        modeText = "UDIM" if self.useUdimMode else "Standard"
-        cmds.inViewMessage(amg=f"Material '{material}' created successfully with {textureCount} textures ({modeText})",
-                          pos='midCenter', fade=True)
-        return material
+        if failed:
+            self.stats.count('assignFailed', len(failed))
+            self.failedAssignments.extend(failed)
+            names = ", ".join(obj for obj, _ in failed[:10])
+            if len(failed) > 10:
+                names += f" and {len(failed) - 10} more"
+            cmds.warning(f"Could not assign {shadingGroup} to {len(failed)} objects: {names}")
+        return failed
+
+    def _getMeshTransforms(self):
+        # (long path, lowercase short name without namespace) of every mesh transform
+        meshes = cmds.ls(type='mesh', noIntermediate=True, long=True)
+        if not meshes:
+            return []
+        transforms = cmds.listRelatives(meshes, parent=True, fullPath=True) or []
+        result = []
+        for path in sorted(set(transforms)):
+            shortName = path.split('|')[-1].split(':')[-1].lower()
+            result.append((path, shortName))
+        return result
 
-    def _connectTexture(self, texType, texturePath, shaderName, material, shadingGroup):
-        # Create file node
-        fileNode = cmds.shadingNode('file', asTexture=True, name=f"{shaderName}_{texType}")
-        cmds.setAttr(fileNode + ".fileTextureName", texturePath, type="string")
-        cmds.setAttr(fileNode + ".uvTilingMode", 3 if self.useUdimMode else 0)
+    def _sanitizeName(self, name):
+        name = re.sub(r'[^A-Za-z0-9_]', '_', name)
+        if not name or name[0].isdigit():
+            name = '_' + name
+        return name
+
+    def _connectTexture(self, plan, texType, texturePath, shaderName, otherTextures=()):
+        # Adds the file node network for one map to plan, wired to 'material'/'shadingGroup'
+        # Packed map channels only drive inputs that have no map of their own in otherTextures
+        fileNode = texType + "_file"
+        info = self._imageInfo.get(texturePath)
+        hasAlpha = info is not None and info.channels in (2, 4)
+        # Maps without an alpha channel drive outAlpha from their luminance
+        alphaIsLuminance = texType == 'displacement' and info is not None and not hasAlpha
+        colorSpace = self._getColorSpace(texType, info)
+        
+        constant = self._constants.get(texturePath)
+        if constant is not None and self._setConstant(plan, texType, constant, colorSpace, otherTextures):
+            self.constantMaps += 1
+            return True
+        tilingMode = self.textureManager.getTilingMode(texturePath, self.useUdimMode)
         
-        # Direct connection 
-        place2d = cmds.shadingNode('place2dTexture', asUtility=True, name=f"{shaderName}_{texType}_place2d")
-        cmds.connectAttr(place2d + ".outUV", fileNode + ".uvCoord")
-        cmds.connectAttr(place2d + ".outUvFilterSize", fileNode + ".uvFilterSize")
+        existing = None
+        if self.reuseFileNodes and colorSpace:
+            existing = self.fileNodeIndex.find(texturePath, colorSpace, tilingMode, alphaIsLuminance)
+        
+        if existing is None:
+            # Create file node
+            plan.createNode(fileNode, 'file', f"{shaderName}_{texType}", 'texture')
+            # Tiling mode first so Maya resolves <UDIM>/<UVTILE> tokens on assignment
+            plan.setAttr(fileNode, "uvTilingMode", tilingMode)
+            proxyPath = self.textureManager.proxies.get(texturePath)
+            if proxyPath:
+                # Viewport shows the proxy until switchTextureResolution(proxy=False)
+                self._tagFullPath(plan, fileNode, texturePath, proxyPath)
+            plan.setAttr(fileNode, "fileTextureName", proxyPath or texturePath, "string")
+            if colorSpace:
+                plan.setAttr(fileNode, "colorSpace", colorSpace, "string")
+                self.fileNodeIndex.addPending(texturePath, colorSpace, tilingMode, plan, fileNode, bool(proxyPath),
+                                              alphaIsLuminance)
+            if alphaIsLuminance:
+                plan.setAttr(fileNode, "alphaIsLuminance", True)
+            
+            # Direct connection 
+            if self.sharePlace2d:
+                place2d = 'place2d'
+                if not plan.hasNode(place2d):
+                    plan.createNode(place2d, 'place2dTexture', f"{shaderName}_place2d", 'utility')
+            else:
+                place2d = plan.createNode(texType + "_place2d", 'place2dTexture', f"{shaderName}_{texType}_place2d", 'utility')
+            plan.connect(place2d, "outUV", fileNode, "uvCoord")
+            plan.connect(place2d, "outUvFilterSize", fileNode, "uvFilterSize")
+        elif isinstance(existing, str):
+            plan.useNode(fileNode, existing)
+            self.reusedFileNodes += 1
+        else:
+            plan.shareNode(fileNode, *existing)
+            self.reusedFileNodes += 1
         
         # Connection based on texture type
         if texType == 'baseColor':
-            cmds.setAttr(fileNode + ".colorSpace", "sRGB", type="string")
-            cmds.connectAttr(fileNode + ".outColor", material + ".baseColor")
+            plan.connect(fileNode, "outColor", 'material', "baseColor")
         elif texType == 'emission':
-            cmds.setAttr(fileNode + ".colorSpace", "sRGB", type="string")
-            cmds.connectAttr(fileNode + ".outColor", material + ".emissionColor")
+            plan.connect(fileNode, "outColor", 'material', "emissionColor")
         elif texType in ['metalness', 'roughness', 'specular', 'opacity']:
-            cmds.setAttr(fileNode + ".colorSpace", "Raw", type="string")
-            attrMap = {'metalness': 'metalness', 'roughness': 'specularRoughness', 
-                      'specular': 'specular', 'opacity': 'opacity'}
-            cmds.connectAttr(fileNode + ".outColorR", material + "." + attrMap[texType])
+            channel = "outAlpha" if texType == 'opacity' and hasAlpha else "outColorR"
+            plan.connect(fileNode, channel, 'material', SCALAR_INPUTS[texType])
+        elif texType in textureScanner.PACKED_LAYOUTS:
+            connected = False
+            for channel, channelType in zip("RGB", textureScanner.PACKED_LAYOUTS[texType]):
+                if channelType in SCALAR_INPUTS and channelType not in otherTextures:
+                    plan.connect(fileNode, "outColor" + channel, 'material', SCALAR_INPUTS[channelType])
+                    connected = True
+            return connected
         elif texType == 'normal':
-            cmds.setAttr(fileNode + ".colorSpace", "Raw", type="string")
-            try:
-                normalNode = cmds.shadingNode('aiNormalMap', asUtility=True, name=f"{shaderName}_normal_normalMap")
-                cmds.connectAttr(fileNode + ".outColor", normalNode + ".input")
-                cmds.connectAttr(normalNode + ".outValue", material + ".normalCamera")
-            except:
-                bumpNode = cmds.shadingNode('aiBump2d', asUtility=True, name=f"{shaderName}_normal_bump2d")
-                cmds.setAttr(bumpNode + ".bumpHeight", 1.0)
-                cmds.connectAttr(fileNode + ".outColor", bumpNode + ".bumpMap", force=True)
-                cmds.connectAttr(bumpNode + ".outValue", material + ".normalCamera")
+            if self._hasNodeType('aiNormalMap'):
+                normalNode = plan.createNode('normalMap', 'aiNormalMap', f"{shaderName}_normal_normalMap", 'utility')
+                plan.connect(fileNode, "outColor", normalNode, "input")
+                plan.connect(normalNode, "outValue", 'material', "normalCamera")
+            else:
+                bumpNode = plan.createNode('normalBump', 'aiBump2d', f"{shaderName}_normal_bump2d", 'utility')
+                plan.setAttr(bumpNode, "bumpHeight", 1.0)
+                plan.connect(fileNode, "outColor", bumpNode, "bumpMap", force=True)
+                plan.connect(bumpNode, "outValue", 'material', "normalCamera")
         elif texType == 'bump':
-            cmds.setAttr(fileNode + ".colorSpace", "Raw", type="string")
-            bumpNode = cmds.shadingNode('aiBump2d', asUtility=True, name=f"{shaderName}_bump_bump2d")
-            cmds.setAttr(bumpNode + ".bumpHeight", 0.3)
-            cmds.connectAttr(fileNode + ".outColorR", bumpNode + ".bumpMap")
-            cmds.connectAttr(bumpNode + ".outValue", material + ".normalCamera")
+            bumpNode = plan.createNode('bump', 'aiBump2d', f"{shaderName}_bump_bump2d", 'utility')
+            plan.setAttr(bumpNode, "bumpHeight", 0.3)
+            plan.connect(fileNode, "outColorR", bumpNode, "bumpMap")
+            plan.connect(bumpNode, "outValue", 'material', "normalCamera")
         elif texType == 'displacement':
-            cmds.setAttr(fileNode + ".colorSpace", "Raw", type="string")
-            dispNode = cmds.shadingNode('displacementShader', asShader=True, name=f"{shaderName}_disp_shader")
-            cmds.setAttr(dispNode + ".scale", 0.1)
-            cmds.connectAttr(fileNode + ".outAlpha", dispNode + ".displacement")
-            cmds.connectAttr(dispNode + ".displacement", shadingGroup + ".displacementShader")
+            dispNode = plan.createNode('displacement', 'displacementShader', f"{shaderName}_disp_shader", 'shader')
+            plan.setAttr(dispNode, "scale", 0.1)
+            plan.connect(fileNode, "outAlpha", dispNode, "displacement")
+            plan.connect(dispNode, "displacement", 'shadingGroup', "displacementShader")
         else:
             return False
         
         return True
 
-    def _getUniqueName(self, baseName):
-        if not cmds.objExists(baseName):
-            return baseName
-        counter = 1
-        while cmds.objExists(f"{baseName}_{counter}"):
-            counter += 1
-        return f"{baseName}_{counter}"
+    def _setConstant(self, plan, texType, values, colorSpace, otherTextures=()):
+        # Sets the value of a uniform map on 'material', False when the map still needs a file node
+        gray = values[0]
+        color = tuple(values[:3]) if len(values) >= 3 else (gray, gray, gray)
+        if texType in ['baseColor', 'emission']:
+            if colorSpace == 'sRGB':
+                color = tuple(_srgbToLinear(value) for value in color)
+            plan.setAttr('material', "baseColor" if texType == 'baseColor' else "emissionColor", color)
+        elif texType == 'opacity':
+            alpha = values[-1] if len(values) in (2, 4) else gray
+            plan.setAttr('material', "opacity", (alpha, alpha, alpha))
+        elif texType in SCALAR_INPUTS:
+            plan.setAttr('material', SCALAR_INPUTS[texType], gray)
+        elif texType in textureScanner.PACKED_LAYOUTS:
+            channels = [(value, channelType) for value, channelType in zip(color, textureScanner.PACKED_LAYOUTS[texType])
+                        if channelType in SCALAR_INPUTS and channelType not in otherTextures]
+            for value, channelType in channels:
+                plan.setAttr('material', SCALAR_INPUTS[channelType], value)
+            return bool(channels)
+        elif texType == 'normal':
+            # Only a flat tangent space normal has no effect
+            if len(values) < 3 or abs(color[0] - 0.5) > 0.01 or abs(color[1] - 0.5) > 0.01 or color[2] < 0.99:
+                return False
+        elif texType != 'bump':
+            return False
+        return True
+
+    def _tagFullPath(self, plan, fileNode, fullPath, proxyPath):
+        plan.addAttr(fileNode, nodeBuilder.FULL_PATH_ATTR)
+        plan.addAttr(fileNode, nodeBuilder.PROXY_PATH_ATTR)
+        plan.setAttr(fileNode, nodeBuilder.FULL_PATH_ATTR, fullPath, "string")
+        plan.setAttr(fileNode, nodeBuilder.PROXY_PATH_ATTR, proxyPath, "string")
+
+    def switchTextureResolution(self, proxy=True, materials=None):
+        """Points the file nodes of tool materials at their proxies or full resolution maps.
+
+        Missing proxies are generated first. File nodes seen for the first
+        time get the full/proxy path attributes. Every change goes through
+        one builder commit. Returns the number of file nodes switched.
+        """
+        if materials is None:
+            materials = self.getToolMaterials()
+        fileNodes = sorted(set(node for textures in self.getMaterialFileNodes(materials).values()
+                               for node in textures.values()))
+        proxied = nodeBuilder.listProxiedFileNodes()
+        
+        fullPaths = {}
+        proxyPaths = {}
+        for node in fileNodes:
+            if node in proxied:
+                fullPaths[node] = cmds.getAttr(f"{node}.{nodeBuilder.FULL_PATH_ATTR}")
+                proxyPaths[node] = cmds.getAttr(f"{node}.{nodeBuilder.PROXY_PATH_ATTR}")
+            else:
+                fullPaths[node] = cmds.getAttr(node + ".fileTextureName")
+        
+        if proxy:
+            missing = [fullPaths[node] for node in fileNodes if not proxyPaths.get(node) and fullPaths[node]]
+            generated = self.textureManager.createProxies(missing) if missing else {}
+            for node in fileNodes:
+                if not proxyPaths.get(node) and fullPaths[node] in generated:
+                    proxyPaths[node] = generated[fullPaths[node]]
+        
+        plan = nodeBuilder.ShaderNetworkPlan()
+        switched = 0
+        for node in fileNodes:
+            proxyPath = proxyPaths.get(node)
+            if not proxyPath:
+                continue
+            plan.useNode(node, node)
+            if node not in proxied:
+                self._tagFullPath(plan, node, fullPaths[node], proxyPath)
+            plan.setAttr(node, "fileTextureName", proxyPath if proxy else fullPaths[node], "string")
+            switched += 1
+        if switched:
+            self.getBuilder().commit([plan])
+            self.fileNodeIndex.nodes = None
+        return switched
+
+    def getToolMaterials(self):
+        # Materials tagged by this tool, in any namespace
+        return cmds.ls('*.' + TOOL_ATTR, objectsOnly=True, recursive=True) or []
+
+    def consolidatePlace2dNodes(self, materials=None):
+        """Merges identical place2dTexture nodes driving a tool material.
+
+        File nodes of each material that are driven by place2d nodes with the
+        same settings are moved onto one of them; place2d nodes left without
+        outgoing connections are deleted. Returns the number removed.
+        """
+        if materials is None:
+            materials = self.getToolMaterials()
+        
+        removed = 0
+        cmds.undoInfo(openChunk=True, chunkName='autoShaderTool')
+        try:
+            for material in materials:
+                shadingGroups = cmds.listConnections(material + ".outColor", source=False, type='shadingEngine') or []
+                history = cmds.listHistory(shadingGroups or material) or []
+                place2ds = sorted(set(cmds.ls(history, type='place2dTexture') or []))
+                
+                keepers = {}
+                for place2d in place2ds:
+                    settings = tuple(repr(cmds.getAttr(f"{place2d}.{attr}")) for attr in PLACE2D_ATTRS)
+                    keeper = keepers.setdefault(settings, place2d)
+                    if keeper == place2d:
+                        continue
+                    
+                    outputs = cmds.listConnections(place2d, source=False, destination=True,
+                                                   connections=True, plugs=True) or []
+                    for srcPlug, dstPlug in zip(outputs[0::2], outputs[1::2]):
+                        if cmds.nodeType(dstPlug.split('.')[0]) != 'file':
+                            continue
+                        srcAttr = srcPlug.split('.', 1)[1]
+                        cmds.connectAttr(f"{keeper}.{srcAttr}", dstPlug, force=True)
+                    
+                    remaining = cmds.listConnections(place2d, source=False, destination=True, plugs=True) or []
+                    if not [plug for plug in remaining if not plug.startswith('defaultRenderUtilityList')]:
+                        cmds.delete(place2d)
+                        removed += 1
+        finally:
+            cmds.undoInfo(closeChunk=True)
+        return removed
 
     def setUdimMode(self, enableUdim):
         self.useUdimMode = enableUdim
+        self.textureManager.useUdimMode = enableUdim
 
-    def updateMaterialTextures(self, materialName, textureUpdates, useUdim=False):
+    @phaseStats.timed('updateMaterialTextures')
+    def updateMaterialTextures(self, materialName, textureUpdates, useUdim=False, reload=False):
+        # reload also resets file nodes already on the new path so Maya rereads re-exported files
         if not cmds.objExists(materialName):
             raise RuntimeError(f"Material '{materialName}' does not exist")
         
-        updatedCount = 0
-        for texType, texturePath in textureUpdates.items():
-            if not os.path.exists(texturePath):
-                continue
-            
-            # Find existing file node
-            existingFileNode = self._findConnectedFileNode(materialName, texType)
-            if existingFileNode:
-                cmds.setAttr(existingFileNode + ".fileTextureName", texturePath, type="string")
-                cmds.setAttr(existingFileNode + ".uvTilingMode", 3 if useUdim else 0)
-                updatedCount += 1
+        changes = self.planRelink({'': textureUpdates}, [materialName], useUdim, reload=reload)
+        updatedCount = self.applyRelink(changes)
         
-        cmds.inViewMessage(amg=f"Updated {updatedCount} texture maps on '{materialName}'",
-                          pos='midCenter', fade=True)
+        with self.stats.phase('inViewMessage'):
+            cmds.inViewMessage(amg=f"Updated {updatedCount} texture maps on '{materialName}'",
+                              pos='midCenter', fade=True)
 
-    def _findConnectedFileNode(self, material, texType):
-        attrMap = {'baseColor': 'baseColor', 'metalness': 'metalness',
-                  'roughness': 'specularRoughness', 'normal': 'normalCamera',
-                  'specular': 'specular', 'emission': 'emissionColor', 'opacity': 'opacity'}
+    @phaseStats.timed('relinkMaterials')
+    def relinkMaterials(self, directory, materials=None, useUdim=False, dryRun=False, namePrefix=""):
+        # One scan of directory matched against every material, returns the list of RelinkChange
+        self.setUdimMode(useUdim)
+        textureGroups = self.textureManager.groupTextures(directory)
+        if not textureGroups:
+            raise RuntimeError(f"No textures found in: {directory}")
         
-        if texType not in attrMap:
-            return None
+        changes = self.planRelink(textureGroups, materials, useUdim, namePrefix)
+        if not dryRun:
+            self.applyRelink(changes)
+        return changes
+
+    @phaseStats.timed('planRelink')
+    def planRelink(self, textureGroups, materials=None, useUdim=False, namePrefix="", reload=False):
+        """Lists the file node changes needed to point materials at textureGroups.
+
+        textureGroups is {assetName: {texType: path}}; each material takes the
+        group of the asset it was created from (name without namespace,
+        namePrefix, _SHD and allocator suffix), materials without a match
+        are left alone. An unnamed '' group (updateMaterialTextures) applies
+        to every material. File nodes already on the right path are left out
+        unless reload is set. Nothing is changed in the scene.
+        """
+        fileNodes = self.getMaterialFileNodes(materials)
+        proxied = self.fileNodeIndex.proxied = nodeBuilder.listProxiedFileNodes()
+        groupsByName = dict((self._sanitizeName(namePrefix + name).lower(), textures)
+                            for name, textures in textureGroups.items())
+        singleGroup = textureGroups[''] if list(textureGroups) == [''] else None
+        materialTextures = []
+        for material in sorted(fileNodes):
+            textures = singleGroup or self._matchTextureGroup(material, groupsByName)
+            if textures:
+                materialTextures.append((material, textures))
         
-        connections = cmds.listConnections(f"{material}.{attrMap[texType]}", source=True, destination=False)
-        if connections:
-            for node in connections:
-                if cmds.nodeType(node) == 'file':
-                    return node
-                upstream = cmds.listConnections(node, source=True, destination=False)
-                if upstream:
-                    for upNode in upstream:
-                        if cmds.nodeType(upNode) == 'file':
-                            return upNode
-        return None
+        # Current path and tiling of every file node involved, in one pass
+        nodes = sorted(set(node for material, textures in materialTextures
+                           for texType, node in fileNodes[material].items() if texType in textures))
+        current = dict(zip(nodes, nodeBuilder.queryFileNodes(nodes, ('path', 'uvTilingMode'), proxied)))
+        
+        changes = []
+        seenNodes = set()
+        for material, textures in materialTextures:
+            connected = fileNodes[material]
+            for texType, texturePath in sorted(textures.items()):
+                fileNode = connected.get(texType)
+                # Shared file nodes are changed once
+                if fileNode is None or fileNode in seenNodes:
+                    continue
+                if useUdim:
+                    texturePath = textureScanner.tokenizePath(texturePath)
+                if not textureScanner.textureExists(texturePath):
+                    continue
+                tilingMode = self.textureManager.getTilingMode(texturePath, useUdim)
+                oldPath, oldTilingMode = current[fileNode]
+                if (not reload and nodeBuilder.normalizePath(oldPath) == nodeBuilder.normalizePath(texturePath)
+                        and oldTilingMode == tilingMode):
+                    continue
+                seenNodes.add(fileNode)
+                changes.append(RelinkChange(material, texType, fileNode, oldPath, texturePath, tilingMode))
+        return changes
+
+    @phaseStats.timed('applyRelink')
+    def applyRelink(self, changes):
+        # All changes in one builder commit, a single undo step
+        plan = nodeBuilder.ShaderNetworkPlan()
+        usedNodes = set()
+        proxied = nodeBuilder.listProxiedFileNodes() if changes else set()
+        for change in changes:
+            if change.fileNode not in usedNodes:
+                plan.useNode(change.fileNode, change.fileNode)
+                usedNodes.add(change.fileNode)
+            plan.setAttr(change.fileNode, "uvTilingMode", change.tilingMode)
+            plan.setFilePath(change.fileNode, change.newPath, change.fileNode in proxied)
+        if changes:
+            self.getBuilder().commit([plan])
+        return len(changes)
+
+    def _matchTextureGroup(self, material, groupsByName):
+        name = material.split('|')[-1].split(':')[-1]
+        if name.endswith('_SHD'):
+            name = name[:-4]
+        name = name.lower()
+        return groupsByName.get(name) or groupsByName.get(re.sub(r'_\d+$', '', name))
+
+    def getMaterialFileNodes(self, materials=None):
+        """Maps aiStandardSurface materials to their file nodes: {material: {texType: fileNode}}.
+
+        Uses the same few scene-wide queries whatever the number of
+        materials: material and shading group inputs, normal/bump/
+        displacement helper inputs, and the node types of every source.
+        """
+        if materials is None:
+            materials = cmds.ls(type='aiStandardSurface') or []
+        materials = list(materials)
+        result = dict((material, {}) for material in materials)
+        if not materials:
+            return result
+        
+        # (material, material attr, source node, source attr)
+        inputs = [(dst, attr, src, srcAttr) for dst, attr, src, srcAttr in self._listInputs(materials)
+                  if attr in MATERIAL_INPUTS]
+        pairs = cmds.listConnections(materials, source=False, destination=True, connections=True,
+                                     plugs=True, type='shadingEngine') or []
+        sgMaterials = {}
+        for materialPlug, sgPlug in zip(pairs[0::2], pairs[1::2]):
+            if sgPlug.endswith('.surfaceShader'):
+                sgMaterials[sgPlug.split('.')[0]] = materialPlug.split('.')[0]
+        if sgMaterials:
+            for sg, attr, src, srcAttr in self._listInputs(list(sgMaterials)):
+                if attr == 'displacementShader':
+                    inputs.append((sgMaterials[sg], attr, src, srcAttr))
+        
+        nodeTypes = self._listNodeTypes([src for _, _, src, _ in inputs])
+        helpers = {}
+        channels = {}
+        for material, attr, src, srcAttr in inputs:
+            if nodeTypes.get(src) == 'file':
+                texType = MATERIAL_INPUTS[attr]
+                result[material].setdefault(texType, src)
+                if texType in SCALAR_INPUTS and srcAttr in ('outColorR', 'outColorG', 'outColorB'):
+                    channels.setdefault((material, src), {})[srcAttr[-1]] = texType
+            elif nodeTypes.get(src) in HELPER_TYPES:
+                helpers.setdefault(src, []).append(material)
+        
+        # A file node feeding several channels or a G/B channel is a packed map
+        for (material, src), used in channels.items():
+            if len(used) < 2 and 'R' in used:
+                continue
+            for packedType, layout in textureScanner.PACKED_LAYOUTS.items():
+                if all(layout["RGB".index(channel)] == texType for channel, texType in used.items()):
+                    result[material][packedType] = src
+            for texType in used.values():
+                if result[material].get(texType) == src:
+                    del result[material][texType]
+        
+        if helpers:
+            helperInputs = self._listInputs(list(helpers))
+            nodeTypes = self._listNodeTypes([src for _, _, src, _ in helperInputs])
+            for helper, attr, src, srcAttr in helperInputs:
+                if nodeTypes.get(src) != 'file':
+                    continue
+                if attr == 'displacement':
+                    texType = 'displacement'
+                elif attr == 'bumpValue' or (attr == 'bumpMap' and srcAttr != 'outColor'):
+                    texType = 'bump'
+                elif attr in ('input', 'bumpMap'):
+                    texType = 'normal'
+                else:
+                    continue
+                for material in helpers[helper]:
+                    result[material].setdefault(texType, src)
+        
+        # AO maps are not connected, the tool names them after the material
+        aoNames = dict((material[:-4] + '_ao', material) for material in materials if material.endswith('_SHD'))
+        for fileNode in cmds.ls(list(aoNames), type='file') or []:
+            result[aoNames[fileNode]]['ao'] = fileNode
+        return result
+
+    def _listInputs(self, nodes):
+        # [(node, attr, sourceNode, sourceAttr)] for every incoming connection of nodes
+        pairs = cmds.listConnections(nodes, source=True, destination=False, connections=True, plugs=True) or []
+        inputs = []
+        for dstPlug, srcPlug in zip(pairs[0::2], pairs[1::2]):
+            dst, _, attr = dstPlug.partition('.')
+            src, _, srcAttr = srcPlug.partition('.')
+            inputs.append((dst, attr, src, srcAttr))
+        return inputs
+
+    def _listNodeTypes(self, nodes):
+        if not nodes:
+            return {}
+        flat = cmds.ls(sorted(set(nodes)), showType=True) or []
+        return dict(zip(flat[0::2], flat[1::2]))
+
+    def _findConnectedFileNode(self, material, texType):
+        return self.getMaterialFileNodes([material])[material].get(texType)
 
 #------------------------------------------------
 # Global functions
@@ -237,6 +1074,50 @@ def createArnoldMaterial(materialName, textureDirectory=None, selection=None, us
     
     return creator.createShaderNetwork(materialName, selection)
 
-def findTexturesInDirectory(directory):
+def createArnoldMaterials(textureDirectory, assignByName=False, useUdim=False, namePrefix="", dedupContent=False,
+                          convertToTx=False):
+    # One material per asset found in textureDirectory, {assetName: material}
+    creator = ArnoldShaderCreator()
+    creator.setUdimMode(useUdim)
+    creator.textureManager.textureDirectory = textureDirectory
+    creator.textureManager.dedupContent = dedupContent
+    creator.textureManager.convertToTx = convertToTx
+    
+    textureGroups = creator.textureManager.groupTextures(textureDirectory)
+    if not textureGroups:
+        raise RuntimeError(f"No textures found in: {textureDirectory}")
+    
+    return creator.createShaderNetworks(textureGroups, assignByName, namePrefix)
+
+def relinkMaterials(directory, materials=None, useUdim=False, dryRun=False, namePrefix=""):
+    # Points existing materials at a new texture delivery, dryRun only prints the diff
+    creator = ArnoldShaderCreator()
+    changes = creator.relinkMaterials(directory, materials, useUdim, dryRun, namePrefix)
+    for change in changes:
+        print(f"{change.material}.{change.texType} ({change.fileNode}): {change.oldPath} -> {change.newPath}")
+    action = "Would update" if dryRun else "Updated"
+    cmds.inViewMessage(amg=f"{action} {len(changes)} texture maps", pos='midCenter', fade=True)
+    return changes
+
+def setTextureResolution(proxy=True, materials=None):
+    # Scene-wide proxy/full resolution switch for tool materials, e.g. before render submission
+    switched = ArnoldShaderCreator().switchTextureResolution(proxy, materials)
+    modeText = "proxy" if proxy else "full resolution"
+    cmds.inViewMessage(amg=f"Switched {switched} file nodes to {modeText}", pos='midCenter', fade=True)
+    return switched
+
+def findTexturesInDirectory(directory, types=None, ordered=True):
+    # ordered=False returns as soon as the requested types are found
+    manager = ArnoldTextureManager()
+    return dict(manager.iterTextures(directory, types, ordered))
+
+def consolidatePlace2d(materials=None):
+    # Scene-wide: merge redundant place2dTexture nodes on materials this tool created
+    removed = ArnoldShaderCreator().consolidatePlace2dNodes(materials)
+    cmds.inViewMessage(amg=f"Removed {removed} redundant place2dTexture nodes", pos='midCenter', fade=True)
+    return removed
+
+def groupTexturesInDirectory(directory, dedupContent=False):
     manager = ArnoldTextureManager()
-    return manager.findTextures(directory)
+    manager.dedupContent = dedupContent
+    return manager.groupTextures(directory)
@@ -8,14 +8,22 @@ Version: 1.0
 
 import maya.cmds as cmds
 from PySide2.QtWidgets import *
-from PySide2.QtCore import Qt, QUrl
+from PySide2.QtCore import Qt, QUrl, QObject, QRunnable, QThreadPool, QTimer, Signal
 from PySide2.QtGui import QDragEnterEvent, QDropEvent
 import os
+import threading
+import time
 from shiboken2 import wrapInstance
 try:
     from . import shaderMain as main
+    from . import sceneAudit
+    from . import textureScanner
+    from . import textureWatcher
 except ImportError:
     import shaderMain as main
+    import sceneAudit
+    import textureScanner
+    import textureWatcher
 
 #------------------------------------------------
 
@@ -63,6 +71,53 @@ class DragDropLineEdit(QLineEdit):
                     return
         event.ignore()
 
+class ScanSignals(QObject):
+    progress = Signal(str, int, int, int)
+    converting = Signal(str, int, int, int)
+    finished = Signal(str, int, object)
+    cancelled = Signal(str, int)
+    failed = Signal(str, int, str)
+
+class TextureScanWorker(QRunnable):
+    """Runs findTextures off the Qt main thread.
+
+    Results carry the scan generation so the dialog can drop anything that
+    finishes after a newer scan was started.
+    """
+
+    def __init__(self, manager, directory, target, generation, signals):
+        super().__init__()
+        self.manager = manager
+        self.directory = directory
+        self.target = target
+        self.generation = generation
+        self.signals = signals
+        self.cancelEvent = threading.Event()
+        # (materialName, selection, useUdim) to build once the scan is done
+        self.pendingMaterial = None
+        self._lastProgress = 0.0
+
+    def onProgress(self, filesSeen, matchesFound):
+        now = time.time()
+        if now - self._lastProgress > 0.1:
+            self._lastProgress = now
+            self.signals.progress.emit(self.target, self.generation, filesSeen, matchesFound)
+
+    def onConvertProgress(self, done, total):
+        self.signals.converting.emit(self.target, self.generation, done, total)
+
+    def run(self):
+        self.manager.convertProgressCallback = self.onConvertProgress
+        try:
+            textures = self.manager.findTextures(self.directory, self.onProgress, self.cancelEvent)
+        except Exception as e:
+            self.signals.failed.emit(self.target, self.generation, str(e))
+            return
+        if self.cancelEvent.is_set():
+            self.signals.cancelled.emit(self.target, self.generation)
+        else:
+            self.signals.finished.emit(self.target, self.generation, textures)
+
 class AutoShaderTool(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent or getMayaWindow())
@@ -74,10 +129,19 @@ class AutoShaderTool(QDialog):
         self.textureDirectory = ""
         self.useUdim = False
         self.updateUseUdim = False
+        self.auditor = None
+        self.auditIssues = []
+        self.scanGeneration = 0
+        self.activeScans = {}
+        self.scanPool = QThreadPool()
+        self.scanPool.setMaxThreadCount(1)
+        self.scanSignals = ScanSignals()
         
         # Initialize shader creator
         try:
             self.shaderCreator = main.ArnoldShaderCreator()
+            # Phase timings for the details panel
+            self.shaderCreator.enableStats()
         except:
             self.shaderCreator = None
         
@@ -106,15 +170,33 @@ class AutoShaderTool(QDialog):
             QRadioButton::indicator:checked { border: 2px solid #4682B4; border-radius: 8px; 
                                             background-color: #4682B4; }
             QLabel#dragHint { color: #888; font-style: italic; font-size: 11px; padding: 2px; }
+            QToolButton { color: white; border: none; font-weight: bold; }
+            QPlainTextEdit { background-color: #3a3a3a; color: #ccc; border: 1px solid #5a5a5a; 
+                            font-family: monospace; font-size: 11px; }
         """)
         
         layout = QVBoxLayout(self)
         
-        # Tabs
-        tabs = QTabWidget()
-        tabs.addTab(self.createMaterialTab(), "Create material")
-        tabs.addTab(self.createUpdateTab(), "Update textures")
-        layout.addWidget(tabs)
+        # Tabs, the update tab is only built the first time it is shown
+        self.tabs = QTabWidget()
+        self.tabs.addTab(self.createMaterialTab(), "Create material")
+        self.updatePage = QWidget()
+        QVBoxLayout(self.updatePage).setContentsMargins(0, 0, 0, 0)
+        self.updateTabBuilt = False
+        self.tabs.addTab(self.updatePage, "Update textures")
+        layout.addWidget(self.tabs)
+        layout.addWidget(self.createDetailsPanel())
+
+    def onTabChanged(self, index):
+        if self.tabs.widget(index) is self.updatePage:
+            self.buildUpdateTab()
+
+    def buildUpdateTab(self):
+        if self.updateTabBuilt:
+            return
+        self.updateTabBuilt = True
+        self.updatePage.layout().addWidget(self.createUpdateTab())
+        self.setupUpdateConnections()
 
     def createMaterialTab(self):
         widget = QWidget()
@@ -151,8 +233,21 @@ class AutoShaderTool(QDialog):
         uvLayout.addStretch()
         dirLayout.addWidget(uvGroup)
         
+        detectRow = QHBoxLayout()
         self.autoDetectBtn = QPushButton("Auto Detect Textures")
-        dirLayout.addWidget(self.autoDetectBtn)
+        self.cancelScanBtn = QPushButton("Cancel")
+        self.cancelScanBtn.setMaximumWidth(100)
+        self.cancelScanBtn.setEnabled(False)
+        detectRow.addWidget(self.autoDetectBtn)
+        detectRow.addWidget(self.cancelScanBtn)
+        dirLayout.addLayout(detectRow)
+        
+        self.convertTxCheck = QCheckBox("Convert found textures to .tx (maketx)")
+        self.proxyCheck = QCheckBox("Use 1K viewport proxies")
+        convertRow = QHBoxLayout()
+        convertRow.addWidget(self.convertTxCheck)
+        convertRow.addWidget(self.proxyCheck)
+        dirLayout.addLayout(convertRow)
         layout.addWidget(dirGroup)
         
         # Material creation
@@ -254,7 +349,32 @@ class AutoShaderTool(QDialog):
         
         self.autoDetectUpdateBtn = QPushButton("Auto Detect New Textures")
         self.autoDetectUpdateBtn.setStyleSheet("background-color: #5A9BD5; padding: 10px;")
-        updateDirLayout.addWidget(self.autoDetectUpdateBtn)
+        self.cancelUpdateScanBtn = QPushButton("Cancel")
+        self.cancelUpdateScanBtn.setMaximumWidth(100)
+        self.cancelUpdateScanBtn.setEnabled(False)
+        updateDetectRow = QHBoxLayout()
+        updateDetectRow.addWidget(self.autoDetectUpdateBtn)
+        updateDetectRow.addWidget(self.cancelUpdateScanBtn)
+        updateDirLayout.addLayout(updateDetectRow)
+        
+        # Whole scene relink, materials matched to assets by name
+        relinkRow = QHBoxLayout()
+        self.previewRelinkBtn = QPushButton("Preview Scene Relink")
+        self.relinkSceneBtn = QPushButton("Relink Scene Materials")
+        relinkRow.addWidget(self.previewRelinkBtn)
+        relinkRow.addWidget(self.relinkSceneBtn)
+        updateDirLayout.addLayout(relinkRow)
+        self.liveRelinkCheck = QCheckBox("Live relink tool materials when their textures change on disk")
+        updateDirLayout.addWidget(self.liveRelinkCheck)
+        
+        # Missing files, color spaces and .tx across every file node, the directory is searched for moved files
+        auditRow = QHBoxLayout()
+        self.auditSceneBtn = QPushButton("Audit Scene Textures")
+        self.fixAuditBtn = QPushButton("Fix Audit Problems")
+        self.fixAuditBtn.setEnabled(False)
+        auditRow.addWidget(self.auditSceneBtn)
+        auditRow.addWidget(self.fixAuditBtn)
+        updateDirLayout.addLayout(auditRow)
         layout.addWidget(updateDirGroup)
         
         # Update textures
@@ -277,7 +397,7 @@ class AutoShaderTool(QDialog):
         # Update buttons 
         updateBtnRow = QHBoxLayout()
         self.clearUpdatePathsBtn = QPushButton("Clear All")
-        self.updateMaterialBtn = QPushButton("Update Material")
+        self.updateMaterialBtn = QPushButton("Update Materials")
         self.updateMaterialBtn.setObjectName("createButton")
         updateBtnRow.addWidget(self.clearUpdatePathsBtn)
         updateBtnRow.addWidget(self.updateMaterialBtn)
@@ -287,6 +407,40 @@ class AutoShaderTool(QDialog):
         
         return widget
 
+    def createDetailsPanel(self):
+        # Timings of the last operation, collapsed by default
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        layout.setContentsMargins(0, 0, 0, 0)
+        
+        self.detailsToggle = QToolButton()
+        self.detailsToggle.setText("Details")
+        self.detailsToggle.setCheckable(True)
+        self.detailsToggle.setArrowType(Qt.RightArrow)
+        self.detailsToggle.setToolButtonStyle(Qt.ToolButtonTextBesideIcon)
+        layout.addWidget(self.detailsToggle)
+        
+        self.detailsBox = QWidget()
+        detailsLayout = QVBoxLayout(self.detailsBox)
+        detailsLayout.setContentsMargins(0, 0, 0, 0)
+        self.detailsText = QPlainTextEdit()
+        self.detailsText.setReadOnly(True)
+        self.detailsText.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.detailsText.setMaximumHeight(180)
+        self.detailsText.setPlainText("No timings recorded yet")
+        detailsLayout.addWidget(self.detailsText)
+        
+        exportRow = QHBoxLayout()
+        exportRow.addStretch()
+        self.exportStatsBtn = QPushButton("Export JSON")
+        self.exportTraceBtn = QPushButton("Export Chrome Trace")
+        exportRow.addWidget(self.exportStatsBtn)
+        exportRow.addWidget(self.exportTraceBtn)
+        detailsLayout.addLayout(exportRow)
+        self.detailsBox.setVisible(False)
+        layout.addWidget(self.detailsBox)
+        return widget
+
     def createTextureField(self, labelText, parentLayout, fieldName):
         row = QHBoxLayout()
         label = QLabel(labelText)
@@ -309,22 +463,54 @@ class AutoShaderTool(QDialog):
         # Create tab connections
         self.browseDirBtn.clicked.connect(self.browseDirectory)
         self.autoDetectBtn.clicked.connect(self.autoDetectTextures)
+        self.cancelScanBtn.clicked.connect(lambda: self.cancelTextureScan('create'))
         self.createMaterialBtn.clicked.connect(self.createMaterial)
         self.clearPathsBtn.clicked.connect(self.clearAllPaths)
         self.uvButtonGroup.buttonClicked.connect(self.onUvModeChanged)
+        self.convertTxCheck.toggled.connect(self.onTextureOptionsChanged)
+        self.proxyCheck.toggled.connect(self.onTextureOptionsChanged)
+        self.tabs.currentChanged.connect(self.onTabChanged)
+        for texType in self.textureTypes:
+            getattr(self, f"{texType}BrowseBtn").clicked.connect(
+                lambda checked=False, t=texType: self.browseTexture(getattr(self, f"{t}PathEdit")))
         
-        # Update tab connections
+        # Details panel
+        self.detailsToggle.toggled.connect(self.toggleDetails)
+        self.exportStatsBtn.clicked.connect(lambda: self.exportStats(trace=False))
+        self.exportTraceBtn.clicked.connect(lambda: self.exportStats(trace=True))
+        
+        # Background scans
+        self.scanSignals.progress.connect(self.onScanProgress)
+        self.scanSignals.converting.connect(self.onConvertProgress)
+        self.scanSignals.finished.connect(self.onScanFinished)
+        self.scanSignals.cancelled.connect(self.onScanCancelled)
+        self.scanSignals.failed.connect(self.onScanFailed)
+        
+        # Repeated drops only scan once things settle
+        self.dropTimers = {}
+        for target, callback in (('create', self.autoDetectTextures), ('update', self.autoDetectForUpdate)):
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.setInterval(300)
+            timer.timeout.connect(callback)
+            self.dropTimers[target] = timer
+
+    def setupUpdateConnections(self):
         self.refreshSelectionBtn.clicked.connect(self.refreshSelectedObject)
         self.updateBrowseDirBtn.clicked.connect(self.browseUpdateDirectory)
         self.autoDetectUpdateBtn.clicked.connect(self.autoDetectForUpdate)
+        self.cancelUpdateScanBtn.clicked.connect(lambda: self.cancelTextureScan('update'))
         self.clearUpdatePathsBtn.clicked.connect(self.clearUpdatePaths)
         self.updateMaterialBtn.clicked.connect(self.updateExistingMaterial)
+        self.previewRelinkBtn.clicked.connect(lambda: self.relinkSceneMaterials(dryRun=True))
+        self.relinkSceneBtn.clicked.connect(self.relinkSceneMaterials)
         self.updateUvButtonGroup.buttonClicked.connect(self.onUpdateUvModeChanged)
-        
-        # Browse buttons
+        # The watcher outlives the window, a reopened tool shows its state
+        self.liveRelinkCheck.setChecked(textureWatcher.isWatching())
+        self.liveRelinkCheck.toggled.connect(self.toggleLiveRelink)
+        self.auditSceneBtn.clicked.connect(self.auditSceneTextures)
+        self.fixAuditBtn.clicked.connect(self.fixAuditProblems)
         for texType in self.textureTypes:
-            getattr(self, f"{texType}BrowseBtn").clicked.connect(
-                lambda checked=False, t=texType: self.browseTexture(getattr(self, f"{t}PathEdit")))
             getattr(self, f"update_{texType}BrowseBtn").clicked.connect(
                 lambda checked=False, t=texType: self.browseTexture(getattr(self, f"update_{t}PathEdit"), True))
 
@@ -334,13 +520,13 @@ class AutoShaderTool(QDialog):
         self.updateStatus(f"Directory: {os.path.basename(directory)}")
         # Auto-detectar texturas si el shader creator está disponible
         if self.shaderCreator:
-            self.autoDetectTextures()
+            self.dropTimers['create'].start()
 
     def onUpdateDirectoryDropped(self, directory):
         self.updateUpdateStatus(f"Update directory: {os.path.basename(directory)}")
         # Auto-detectar textures para update si el shader creator está disponible
         if self.shaderCreator:
-            self.autoDetectForUpdate()
+            self.dropTimers['update'].start()
 
     # Main functionality methods 
     def browseDirectory(self):
@@ -381,28 +567,7 @@ class AutoShaderTool(QDialog):
             return
         
         self.enhanceTexturePatterns()
-        textures = self.shaderCreator.textureManager.findTextures(self.textureDirectory)
-        
-        # Map texture types
-        typeMap = {'baseColor': 'diffuse', 'metalness': 'metallic'}
-        found = []
-        
-        # Clear all fields first
-        for field in self.textureTypes:
-            getattr(self, f"{field}PathEdit").clear()
-        
-        # Fill found textures
-        for texType, path in textures.items():
-            fieldName = typeMap.get(texType, texType)
-            if hasattr(self, f"{fieldName}PathEdit"):
-                getattr(self, f"{fieldName}PathEdit").setText(path)
-                found.append(texType)
-        
-        # Error management
-        if found:
-            self.updateStatus(f"Found {len(found)} textures")
-        else:
-            self.updateStatus("No textures found in directory")
+        self.startTextureScan('create', self.textureDirectory, self.useUdim)
 
     def autoDetectForUpdate(self):
         updateDir = self.updateDirectoryEdit.text().strip()
@@ -411,27 +576,112 @@ class AutoShaderTool(QDialog):
             return
         
         self.enhanceTexturePatterns()
-        textures = self.shaderCreator.textureManager.findTextures(updateDir)
-        
+        self.startTextureScan('update', updateDir, self.updateUseUdim)
+
+    # Background texture scans
+    def startTextureScan(self, target, directory, useUdim):
+        # A new scan replaces whatever is still running for the same tab
+        self.cancelTextureScan(target, quiet=True)
+        self.scanGeneration += 1
+        
+        self.onTextureOptionsChanged()
+        manager = self.shaderCreator.textureManager.clone()
+        manager.useUdimMode = useUdim
+        worker = TextureScanWorker(manager, directory, target, self.scanGeneration, self.scanSignals)
+        self.activeScans[target] = worker
+        self.getCancelButton(target).setEnabled(True)
+        self.setScanStatus(target, f"Scanning {os.path.basename(directory)}...")
+        self.scanPool.start(worker)
+        return worker
+
+    def onTextureOptionsChanged(self):
+        # Create Material and scene relinks scan again with the creator's own manager
+        if self.shaderCreator:
+            self.shaderCreator.textureManager.convertToTx = self.convertTxCheck.isChecked()
+            self.shaderCreator.textureManager.makeProxies = self.proxyCheck.isChecked()
+
+    def cancelTextureScan(self, target, quiet=False):
+        worker = self.activeScans.pop(target, None)
+        if worker:
+            worker.cancelEvent.set()
+            if not quiet:
+                self.setScanStatus(target, "Scan cancelled")
+        self.getCancelButton(target).setEnabled(False)
+
+    def isCurrentScan(self, target, generation):
+        worker = self.activeScans.get(target)
+        return worker is not None and worker.generation == generation
+
+    def onScanProgress(self, target, generation, filesSeen, matchesFound):
+        if self.isCurrentScan(target, generation):
+            self.setScanStatus(target, f"Scanning... {filesSeen} files, {matchesFound} matches")
+
+    def onConvertProgress(self, target, generation, done, total):
+        if self.isCurrentScan(target, generation):
+            self.setScanStatus(target, f"Converting textures... {done}/{total}")
+
+    def onScanFinished(self, target, generation, textures):
+        if not self.isCurrentScan(target, generation):
+            return
+        worker = self.activeScans.pop(target)
+        self.getCancelButton(target).setEnabled(False)
+        # Tile sets found by the worker decide uvTilingMode later on
+        self.shaderCreator.textureManager.tileSets.update(worker.manager.tileSets)
+        self.shaderCreator.textureManager.proxies.update(worker.manager.proxies)
+        
+        converter = worker.manager.txConverter
+        failedText = f", {len(converter.failed)} .tx conversions failed" if converter and converter.failed else ""
+        
+        if worker.pendingMaterial:
+            self.finishMaterial(textures, failedText, *worker.pendingMaterial)
+        elif target == 'create':
+            found = self.fillTextureFields("", textures)
+            self.updateStatus(f"Found {found} textures{failedText}" if found else "No textures found in directory")
+        else:
+            found = self.fillTextureFields("update_", textures)
+            self.updateUpdateStatus(f"Found {found} textures for update{failedText}" if found else "No textures found for update")
+
+    def onScanCancelled(self, target, generation):
+        if self.isCurrentScan(target, generation):
+            self.activeScans.pop(target, None)
+            self.getCancelButton(target).setEnabled(False)
+
+    def onScanFailed(self, target, generation, message):
+        if self.isCurrentScan(target, generation):
+            self.activeScans.pop(target, None)
+            self.getCancelButton(target).setEnabled(False)
+            self.setScanStatus(target, f"Error: {message}")
+
+    def fillTextureFields(self, prefix, textures):
+        # Map texture types
         typeMap = {'baseColor': 'diffuse', 'metalness': 'metallic'}
-        found = []
+        found = 0
         
-        # Clear all update fields first
+        # Clear all fields first
         for field in self.textureTypes:
-            getattr(self, f"update_{field}PathEdit").clear()
+            getattr(self, f"{prefix}{field}PathEdit").clear()
         
         # Fill found textures
         for texType, path in textures.items():
             fieldName = typeMap.get(texType, texType)
-            if hasattr(self, f"update_{fieldName}PathEdit"):
-                getattr(self, f"update_{fieldName}PathEdit").setText(path)
-                found.append(texType)
-        
-        # Error management
-        if found:
-            self.updateUpdateStatus(f"Found {len(found)} textures for update")
+            if hasattr(self, f"{prefix}{fieldName}PathEdit"):
+                getattr(self, f"{prefix}{fieldName}PathEdit").setText(path)
+                found += 1
+        return found
+
+    def getCancelButton(self, target):
+        return self.cancelScanBtn if target == 'create' else self.cancelUpdateScanBtn
+
+    def setScanStatus(self, target, message):
+        if target == 'create':
+            self.updateStatus(message)
         else:
-            self.updateUpdateStatus("No textures found for update")
+            self.updateUpdateStatus(message)
+
+    def closeEvent(self, event):
+        for target in list(self.activeScans):
+            self.cancelTextureScan(target, quiet=True)
+        super().closeEvent(event)
 
     def clearAllPaths(self):
         for field in self.textureTypes:
@@ -459,18 +709,36 @@ class AutoShaderTool(QDialog):
             self.updateStatus("Please choose texture directory")
             return
         
+        # Scan and .tx conversion run on the scan pool, the network is built in finishMaterial
+        self.shaderCreator.textureManager.textureDirectory = self.textureDirectory
+        worker = self.startTextureScan('create', self.textureDirectory, self.useUdim)
+        worker.pendingMaterial = (materialName, selection, self.useUdim)
+
+    def finishMaterial(self, textures, failedText, materialName, selection, useUdim):
+        if not textures:
+            self.updateStatus(f"No textures found in: {self.textureDirectory}")
+            return
+        
+        self.shaderCreator.stats.reset()
         try:
             if not cmds.pluginInfo('mtoa', query=True, loaded=True):
                 cmds.loadPlugin('mtoa')
             
-            self.shaderCreator.useUdimMode = self.useUdim
-            self.shaderCreator.textureManager.textureDirectory = self.textureDirectory
-            material = self.shaderCreator.createShaderNetwork(materialName, selection)
+            self.shaderCreator.setUdimMode(useUdim)
+            material = self.shaderCreator.createShaderNetwork(materialName, selection, textures)
+            
+            if textureWatcher.isWatching():
+                textureWatcher.startWatching()
             
             # Success message 
-            self.updateStatus(f"Material '{material}' created successfully!")
+            failed = self.shaderCreator.failedAssignments
+            if failed:
+                self.updateStatus(f"Material '{material}' created, {len(failed)} objects could not be assigned (see Script Editor){failedText}")
+            else:
+                self.updateStatus(f"Material '{material}' created successfully!{failedText}")
         except Exception as e:
             self.updateStatus(f"Error: {str(e)}")
+        self.showStats()
 
     def refreshSelectedObject(self):
         selection = cmds.ls(selection=True)
@@ -480,15 +748,16 @@ class AutoShaderTool(QDialog):
             self.updateUpdateStatus("Please select an object with a material")
             return
         
-        obj = selection[0]
-        self.selectedObjectLabel.setText(obj)
+        objectText = selection[0] if len(selection) == 1 else f"{len(selection)} objects"
+        self.selectedObjectLabel.setText(objectText)
         self.selectedObjectLabel.setStyleSheet("color: #4682B4; font-weight: bold;")
         
-        material = self.getObjectMaterial(obj)
-        if material:
-            self.currentMaterialLabel.setText(f"Material: {material}")
+        materials = self.getSelectedMaterials(selection)
+        if materials:
+            materialText = materials[0] if len(materials) == 1 else f"{len(materials)} materials"
+            self.currentMaterialLabel.setText(f"Material: {materialText}")
             self.currentMaterialLabel.setStyleSheet("color: #5A9BD5; font-weight: bold;")
-            self.updateUpdateStatus(f"Ready to update '{material}'")
+            self.updateUpdateStatus(f"Ready to update {materialText}")
         else:
             self.currentMaterialLabel.setText("Material: None detected")
             self.currentMaterialLabel.setStyleSheet("color: #ff6b6b; font-weight: bold;")
@@ -504,9 +773,9 @@ class AutoShaderTool(QDialog):
             self.updateUpdateStatus("Please select an object")
             return
         
-        material = self.getObjectMaterial(selection[0])
-        if not material:
-            self.updateUpdateStatus("No material found on selected object")
+        materials = self.getSelectedMaterials(selection)
+        if not materials:
+            self.updateUpdateStatus("No material found on selected objects")
             return
         
         # Collect texture updates
@@ -515,7 +784,7 @@ class AutoShaderTool(QDialog):
         
         for field in self.textureTypes:
             path = getattr(self, f"update_{field}PathEdit").text().strip()
-            if path and os.path.exists(path):
+            if path and textureScanner.textureExists(path):
                 texType = typeMap.get(field, field)
                 textureUpdates[texType] = path
         
@@ -523,13 +792,94 @@ class AutoShaderTool(QDialog):
             self.updateUpdateStatus("No valid texture paths specified")
             return
         
+        self.shaderCreator.stats.reset()
         try:
-            self.shaderCreator.updateMaterialTextures(material, textureUpdates, self.updateUdimRadio.isChecked())
+            changes = self.shaderCreator.planRelink({'': textureUpdates}, materials, self.updateUdimRadio.isChecked())
+            updatedCount = self.shaderCreator.applyRelink(changes)
     
-            self.updateUpdateStatus(f"Material '{material}' updated successfully!")
+            self.updateUpdateStatus(f"Updated {updatedCount} texture maps on {len(materials)} materials")
             self.clearUpdatePaths()
         except Exception as e:
             self.updateUpdateStatus(f"Error: {str(e)}")
+        self.showStats()
+
+    def relinkSceneMaterials(self, dryRun=False):
+        directory = self.updateDirectoryEdit.text().strip()
+        if not directory or not os.path.exists(directory):
+            self.updateUpdateStatus("Please select a valid texture directory")
+            return
+        
+        self.shaderCreator.stats.reset()
+        try:
+            changes = self.shaderCreator.relinkMaterials(directory, None, self.updateUdimRadio.isChecked(), dryRun)
+        except Exception as e:
+            self.updateUpdateStatus(f"Error: {str(e)}")
+            return
+        finally:
+            self.showStats()
+        
+        # Full diff goes to the Script Editor
+        for change in changes:
+            print(f"{change.material}.{change.texType}: {change.oldPath} -> {change.newPath}")
+        materialCount = len(set(change.material for change in changes))
+        if dryRun:
+            self.updateUpdateStatus(f"{len(changes)} texture maps on {materialCount} materials would change (see Script Editor)")
+        else:
+            self.updateUpdateStatus(f"Relinked {len(changes)} texture maps on {materialCount} materials")
+
+    def auditSceneTextures(self):
+        directory = self.updateDirectoryEdit.text().strip()
+        self.shaderCreator.stats.reset()
+        self.auditor = sceneAudit.SceneAuditor(self.shaderCreator)
+        self.auditor.searchDirectories = [directory] if directory and os.path.isdir(directory) else []
+        try:
+            self.auditIssues = self.auditor.audit()
+        except Exception as e:
+            self.updateUpdateStatus(f"Error: {str(e)}")
+            return
+        finally:
+            self.showStats()
+        
+        # Full report goes to the Script Editor
+        print(sceneAudit.formatReport(self.auditIssues))
+        fixable = sum(1 for issue in self.auditIssues if issue.fix)
+        materialCount = len(sceneAudit.groupByMaterial(self.auditIssues))
+        self.fixAuditBtn.setEnabled(bool(fixable))
+        self.updateUpdateStatus(f"{len(self.auditIssues)} problems on {materialCount} materials, "
+                                f"{fixable} fixable (see Script Editor)")
+
+    def fixAuditProblems(self):
+        self.shaderCreator.stats.reset()
+        try:
+            count = self.auditor.applyFixes(self.auditIssues)
+        except Exception as e:
+            self.updateUpdateStatus(f"Error: {str(e)}")
+            return
+        finally:
+            self.showStats()
+        self.fixAuditBtn.setEnabled(False)
+        self.updateUpdateStatus(f"Fixed {count} file node attributes")
+
+    def toggleLiveRelink(self, checked):
+        if not checked:
+            textureWatcher.stopWatching()
+            self.updateUpdateStatus("Live relink stopped")
+            return
+        try:
+            watcher = textureWatcher.startWatching(self.shaderCreator)
+            self.updateUpdateStatus(f"Watching {len(watcher.watchedDirectories())} texture folders")
+        except Exception as e:
+            self.liveRelinkCheck.setChecked(False)
+            self.updateUpdateStatus(f"Error: {str(e)}")
+
+    def getSelectedMaterials(self, selection):
+        # Unique materials of every selected object, in selection order
+        materials = []
+        for obj in selection:
+            material = self.getObjectMaterial(obj)
+            if material and material not in materials:
+                materials.append(material)
+        return materials
 
     def getObjectMaterial(self, obj):
         try:
@@ -558,6 +908,31 @@ class AutoShaderTool(QDialog):
             }
             self.shaderCreator.textureManager.texturePatterns.update(enhancedPatterns)
 
+    def toggleDetails(self, checked):
+        self.detailsToggle.setArrowType(Qt.DownArrow if checked else Qt.RightArrow)
+        self.detailsBox.setVisible(checked)
+
+    def showStats(self):
+        stats = self.shaderCreator.stats if self.shaderCreator else None
+        if stats and stats.enabled:
+            self.detailsText.setPlainText(stats.report() or "No timings recorded")
+
+    def exportStats(self, trace=False):
+        stats = self.shaderCreator.stats if self.shaderCreator else None
+        if not stats or not stats.enabled or not stats.phases:
+            return
+        fileFilter = "Chrome trace (*.json)" if trace else "JSON (*.json)"
+        path, _ = QFileDialog.getSaveFileName(self, "Export timings", "", fileFilter)
+        if not path:
+            return
+        try:
+            if trace:
+                stats.writeChromeTrace(path)
+            else:
+                stats.writeJson(path)
+        except OSError as e:
+            self.updateStatus(f"Error: {str(e)}")
+
     def updateStatus(self, message):
         self.statusLabel.setText(message)
 
@@ -0,0 +1,179 @@
+"""
+Content deduplication module for Auto Shader Tool
+
+Author: Nieves Yashuang Lopez
+Version: 1.0
+
+"""
+#------------------------------------------------
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+try:
+    from . import scanIndex
+    from . import textureScanner
+except ImportError:
+    import scanIndex
+    import textureScanner
+
+PARTIAL_SIZE = 64 * 1024
+CHUNK_SIZE = 1024 * 1024
+HASH_CACHE_VERSION = 1
+
+_defaultCache = None
+
+#------------------------------------------------
+def getDefaultHashCache():
+    global _defaultCache
+    if _defaultCache is None:
+        _defaultCache = HashCache(os.path.join(scanIndex.getCacheDir(), 'textureHashes.json'))
+    return _defaultCache
+
+def hashFile(path, partial=False):
+    # partial hashes the first and last PARTIAL_SIZE bytes only
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        if partial:
+            digest.update(f.read(PARTIAL_SIZE))
+            f.seek(0, os.SEEK_END)
+            if f.tell() > 2 * PARTIAL_SIZE:
+                f.seek(-PARTIAL_SIZE, os.SEEK_END)
+                digest.update(f.read(PARTIAL_SIZE))
+        else:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+#------------------------------------------------
+class HashCache:
+    """On-disk record of partial and full hashes keyed on (path, size, mtime)."""
+
+    def __init__(self, cachePath, maxEntries=100000):
+        self.cachePath = cachePath
+        self.maxEntries = maxEntries
+        self.entries = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self.entries is not None:
+            return
+        self.entries = {}
+        try:
+            with open(self.cachePath, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == HASH_CACHE_VERSION:
+                self.entries = data.get('entries', {})
+        except (OSError, ValueError):
+            pass
+
+    def get(self, path, size, mtime, partial):
+        with self._lock:
+            self._load()
+            record = self.entries.get(path)
+            if record is None or record[0] != size or record[1] != mtime:
+                return None
+            return record[2] if partial else record[3]
+
+    def put(self, path, size, mtime, partial, value):
+        with self._lock:
+            self._load()
+            record = self.entries.get(path)
+            if record is None or record[0] != size or record[1] != mtime:
+                record = self.entries[path] = [size, mtime, None, None]
+            record[2 if partial else 3] = value
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty or self.entries is None:
+                return
+            # Oldest insertions go first, dicts keep insertion order
+            excess = len(self.entries) - self.maxEntries
+            for path in list(self.entries)[:max(excess, 0)]:
+                del self.entries[path]
+            try:
+                scanIndex.writeJson(self.cachePath, {'version': HASH_CACHE_VERSION, 'entries': self.entries})
+                self._dirty = False
+            except OSError:
+                pass
+
+#------------------------------------------------
+class TextureDeduplicator:
+    """Finds byte-identical texture files.
+
+    Files are grouped by size, then by a partial hash, then by a full hash;
+    only files still colliding at a stage are read for the next one. Each
+    group of identical files maps to its first path in sorted order.
+    """
+
+    def __init__(self, hashCache=None, maxWorkers=8):
+        self.hashCache = hashCache
+        self.maxWorkers = maxWorkers
+        self.duplicateCount = 0
+        self.bytesSaved = 0
+
+    def _hash(self, stat, partial):
+        path, size, mtime = stat
+        if self.hashCache is not None:
+            value = self.hashCache.get(path, size, mtime, partial)
+            if value is not None:
+                return value
+        try:
+            value = hashFile(path, partial)
+        except OSError:
+            return None
+        if self.hashCache is not None:
+            self.hashCache.put(path, size, mtime, partial, value)
+        return value
+
+    def _split(self, pool, groups, partial):
+        # Splits every group further by hash, keeping groups with more than one file
+        stats = [stat for group in groups for stat in group]
+        hashes = pool.map(lambda stat: self._hash(stat, partial), stats)
+        result = {}
+        for stat, value in zip(stats, hashes):
+            if value is not None:
+                result.setdefault((stat[1], value), []).append(stat)
+        return [group for group in result.values() if len(group) > 1]
+
+    def findDuplicates(self, paths):
+        # {path: canonicalPath} for every path with an identical earlier copy
+        bySize = {}
+        for path in sorted(set(paths)):
+            # <UDIM>/<UVTILE> paths stand for several files, they are left alone
+            if textureScanner.isTokenizedPath(path):
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if stat.st_size:
+                bySize.setdefault(stat.st_size, []).append((path, stat.st_size, stat.st_mtime_ns))
+        groups = [group for group in bySize.values() if len(group) > 1]
+
+        if groups:
+            with ThreadPoolExecutor(max_workers=self.maxWorkers) as pool:
+                groups = self._split(pool, groups, True)
+                groups = self._split(pool, groups, False)
+            if self.hashCache is not None:
+                self.hashCache.save()
+
+        canonical = {}
+        self.duplicateCount = 0
+        self.bytesSaved = 0
+        for group in groups:
+            group.sort()
+            for path, size, _ in group[1:]:
+                canonical[path] = group[0][0]
+                self.duplicateCount += 1
+                self.bytesSaved += size
+        return canonical
+
+    def dedupGroups(self, textureGroups):
+        # Same structure as textureGroups with duplicates pointing at the canonical copy
+        canonical = self.findDuplicates(path for textures in textureGroups.values() for path in textures.values())
+        return dict((name, dict((texType, canonical.get(path, path)) for texType, path in textures.items()))
+                    for name, textures in textureGroups.items())
@@ -0,0 +1,420 @@
+"""
+Texture scanning module for Auto Shader Tool
+
+Author: Nieves Yashuang Lopez
+Version: 1.0
+
+"""
+#------------------------------------------------
+import fnmatch
+import glob
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+SEPARATORS = re.compile(r'([_-])')
+# Tile number as the last token before the extension: albedo.1001.exr, albedo_1001.exr
+UDIM_TILE = re.compile(r'([._-])(1\d{3})(\.[^.]*)$')
+# Mudbox/ZBrush style tiles: albedo_u1_v1.exr, albedo.u0_v0.exr
+UV_TILE = re.compile(r'([._-])u(\d+)_v(\d+)(\.[^.]*)$', re.IGNORECASE)
+UDIM_TOKEN = '<UDIM>'
+UVTILE_TOKEN = '<UVTILE>'
+# Packed maps, texture type stored in the R, G and B channels
+PACKED_LAYOUTS = {'orm': ('ao', 'roughness', 'metalness'),
+                  'arm': ('ao', 'roughness', 'metalness'),
+                  'mrao': ('metalness', 'roughness', 'ao')}
+# Types wired to the same material input, one of them is enough
+SHARED_INPUTS = [('normal', 'bump')]
+
+#------------------------------------------------
+class TextureClassifier:
+    """Precompiled lookup of texturePatterns.
+
+    Built once per texturePatterns change. Gives the same answers as
+    ArnoldTextureManager._patternMatch looped over every type and pattern:
+    a pattern matches a whole name, its first or last token, or a middle
+    token wrapped by the same separator on both sides ('_p_' or '-p-').
+    The exception is packed types: their short tokens are also common
+    words ('hero_arm_BaseColor'), so they only count as the last token or
+    as the file's only match, and never take a file whose other type is
+    already filled.
+    """
+
+    def __init__(self, texturePatterns):
+        self.typeOrder = list(texturePatterns)
+        self.packedTypes = set(i for i, texType in enumerate(self.typeOrder) if texType in PACKED_LAYOUTS)
+        self.tokenIndex = {}
+        self.complexPatterns = []
+        # Longest first, used to cut the type token out of asset names
+        self.typePatterns = dict((texType, sorted(set(p.lower() for p in patterns), key=len, reverse=True))
+                                 for texType, patterns in texturePatterns.items())
+
+        for typeIndex, texType in enumerate(self.typeOrder):
+            for pattern in texturePatterns[texType]:
+                p = pattern.lower()
+                if p and not SEPARATORS.search(p):
+                    self.tokenIndex.setdefault(p, set()).add(typeIndex)
+                else:
+                    # Patterns holding separators are checked the slow way
+                    probes = (p + '_', p + '-', '_' + p, '-' + p, '_' + p + '_', '-' + p + '-')
+                    self.complexPatterns.append((typeIndex, p, probes))
+
+    def _candidateTokens(self, name):
+        parts = SEPARATORS.split(name)
+        if len(parts) == 1:
+            return parts
+
+        tokens = parts[0::2]
+        seps = parts[1::2]
+        candidates = [tokens[0], tokens[-1]]
+        for i in range(1, len(tokens) - 1):
+            if seps[i - 1] == seps[i]:
+                candidates.append(tokens[i])
+        return candidates
+
+    def matchTypes(self, name):
+        # Indices into typeOrder whose patterns match the lowercase base name
+        matched = set()
+        tokenIndex = self.tokenIndex
+        for token in self._candidateTokens(name):
+            types = tokenIndex.get(token)
+            if types:
+                matched.update(types)
+
+        for typeIndex, p, probes in self.complexPatterns:
+            if typeIndex in matched:
+                continue
+            if (p == name or name.startswith(probes[0]) or name.startswith(probes[1]) or
+                    name.endswith(probes[2]) or name.endswith(probes[3]) or
+                    probes[4] in name or probes[5] in name):
+                matched.add(typeIndex)
+
+        packed = matched & self.packedTypes
+        if packed and len(packed) < len(matched):
+            for typeIndex in packed:
+                if not self._endsWithType(name, typeIndex):
+                    matched.discard(typeIndex)
+        return matched
+
+    def _endsWithType(self, name, typeIndex):
+        for p in self.typePatterns[self.typeOrder[typeIndex]]:
+            if p and (name == p or name.endswith('_' + p) or name.endswith('-' + p)):
+                return True
+        return False
+
+    def matchedTypes(self, name, memo=None):
+        # Sorted matchTypes, looked up in memo first when one is given
+        if memo is None:
+            return sorted(self.matchTypes(name))
+        matched = memo.get(name)
+        if matched is None:
+            matched = memo[name] = sorted(self.matchTypes(name))
+        return matched
+
+    def classify(self, name, filled=(), memo=None):
+        # First type in pattern order that matches and is not filled yet
+        matched = self.matchedTypes(name, memo)
+        if not matched:
+            return None
+        return self._firstOpenType(matched, filled)
+
+    def _firstOpenType(self, matched, filled):
+        for typeIndex in matched:
+            texType = self.typeOrder[typeIndex]
+            if texType in filled:
+                continue
+            # A file whose map is already taken by another file is a duplicate, not a packed map
+            if typeIndex in self.packedTypes and any(self.typeOrder[i] in filled for i in matched
+                                                     if i not in self.packedTypes):
+                continue
+            return texType
+        return None
+
+    def coveredTypes(self, filled):
+        # filled plus the channels of filled packed maps, packed types whose channels are
+        # all filled and types sharing an input with a filled one
+        covered = set(filled)
+        for packedType, layout in PACKED_LAYOUTS.items():
+            if packedType in filled:
+                covered.update(layout)
+        for types in SHARED_INPUTS:
+            if covered.intersection(types):
+                covered.update(types)
+        covered.update(packedType for packedType, layout in PACKED_LAYOUTS.items() if covered.issuperset(layout))
+        return covered
+
+    def classifyFiles(self, files, memo=None):
+        # files: sorted (filename, path) pairs, first match per type wins
+        textures = {}
+        typeCount = len(self.typeOrder)
+        for filename, filePath in files:
+            nameLower = os.path.splitext(filename.lower())[0]
+            texType = self.classify(nameLower, textures, memo)
+            if texType:
+                textures[texType] = filePath
+                if len(textures) == typeCount:
+                    break
+        return textures
+
+    def assetPrefix(self, filename, texType):
+        # Base name with the texture type token removed, 'chair_BaseColor' -> 'chair'
+        base = os.path.splitext(filename)[0]
+        name = base.lower()
+        if len(name) != len(base):
+            base = name
+        for p in self.typePatterns.get(texType, ()):
+            if not p:
+                continue
+            if name == p:
+                return ''
+            if name.endswith('_' + p) or name.endswith('-' + p):
+                return base[:-len(p) - 1]
+            if name.startswith(p + '_') or name.startswith(p + '-'):
+                return base[len(p) + 1:]
+            for middle in ('_' + p + '_', '-' + p + '-'):
+                i = name.rfind(middle)
+                if i >= 0:
+                    return base[:i] + base[i + len(middle) - 1:]
+        return base
+
+    def groupFiles(self, files, memo=None):
+        # files: sorted (filename, path) pairs -> {assetName: {texType: path}}
+        groups = {}
+        groupNames = {}
+        for filename, filePath in files:
+            matched = self.matchedTypes(os.path.splitext(filename.lower())[0], memo)
+            if not matched:
+                continue
+            prefix = self.assetPrefix(filename, self.typeOrder[matched[0]])
+            # Files named only by type ('BaseColor.png') group by their folder
+            assetName = prefix or os.path.basename(os.path.dirname(filePath))
+            key = assetName.lower()
+            group = groups.setdefault(key, {})
+            groupNames.setdefault(key, assetName)
+            texType = self._firstOpenType(matched, group)
+            if texType:
+                group[texType] = filePath
+        return dict((groupNames[key], groups[key]) for key in sorted(groups))
+
+#------------------------------------------------
+class DirectoryScanner:
+    """os.scandir based replacement for the os.walk loop in findTextures.
+
+    Subdirectories are listed in a bounded thread pool, which keeps slow
+    network mounts busy instead of waiting on one directory at a time.
+    Symlinked directories are not followed, same as os.walk.
+    """
+
+    def __init__(self, validExtensions, ignorePatterns=(), maxDepth=None, maxWorkers=8):
+        extensions = [ext.lower() for ext in validExtensions]
+        # Suffix set lookup when every extension is a plain '.ext'
+        if all(ext.startswith('.') and ext.count('.') == 1 for ext in extensions):
+            self.extensionSet = frozenset(extensions)
+            self.extensionTuple = None
+        else:
+            self.extensionSet = None
+            self.extensionTuple = tuple(extensions)
+        self.ignorePatterns = list(ignorePatterns or ())
+        self.maxDepth = maxDepth
+        self.maxWorkers = max(1, maxWorkers)
+        self.index = None
+        self.indexEntry = None
+        self.visitedDirs = set()
+
+    def signature(self):
+        # Identifies what listDirectory keeps, cached listings depend on it
+        extensions = sorted(self.extensionSet or self.extensionTuple)
+        return repr((extensions, self.ignorePatterns))
+
+    def attachIndex(self, index, indexEntry):
+        self.index = index
+        self.indexEntry = indexEntry
+        # Compared after the walk to tell whether anything was listed or classified again
+        self.indexMisses = index.misses
+        self.indexTypes = len(indexEntry['types'])
+
+    def isTexture(self, filename):
+        nameLower = filename.lower()
+        if self.extensionSet is None:
+            return nameLower.endswith(self.extensionTuple)
+        dot = nameLower.rfind('.')
+        return dot >= 0 and nameLower[dot:] in self.extensionSet
+
+    def isIgnored(self, name):
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.ignorePatterns)
+
+    def listDirectory(self, path):
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if self.ignorePatterns and self.isIgnored(entry.name):
+                        continue
+                    try:
+                        isDir = entry.is_dir()
+                    except OSError:
+                        isDir = False
+                    if isDir:
+                        try:
+                            if not entry.is_symlink():
+                                subdirs.append(entry.path)
+                        except OSError:
+                            pass
+                    elif self.isTexture(entry.name):
+                        files.append((entry.name, entry.path))
+        except OSError:
+            pass
+        return files, subdirs
+
+    def _list(self, path):
+        if self.index is None:
+            return self.listDirectory(path)
+        return self.index.listDirectory(self.indexEntry, path, self.listDirectory)
+
+    def iterFiles(self, directory, cancelEvent=None):
+        # Yields one list of (filename, path) per directory as listings finish
+        self.visitedDirs = set()
+        pool = ThreadPoolExecutor(max_workers=self.maxWorkers)
+        pending = {pool.submit(self._list, directory): (0, directory)}
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    depth, path = pending.pop(future)
+                    files, subdirs = future.result()
+                    self.visitedDirs.add(path)
+                    if cancelEvent is not None and cancelEvent.is_set():
+                        return
+                    if self.maxDepth is None or depth < self.maxDepth:
+                        for subdir in subdirs:
+                            pending[pool.submit(self._list, subdir)] = (depth + 1, subdir)
+                    if files:
+                        yield files
+        finally:
+            # Early exit (first match, cancel) drops whatever is still queued and waits for
+            # the listings already running, they may still be writing to the scan index
+            for future in pending:
+                future.cancel()
+            pool.shutdown(wait=True)
+
+    def scan(self, directory, cancelEvent=None):
+        allFiles = []
+        for files in self.iterFiles(directory, cancelEvent):
+            allFiles.extend(files)
+        return allFiles
+
+#------------------------------------------------
+class UdimTileSet:
+    """Tiles of one UDIM texture, stored as 1001 based tile numbers.
+
+    path is the tokenized path ('albedo.<UDIM>.exr' or 'albedo_<UVTILE>.exr')
+    that goes into fileTextureName, tilingMode the matching uvTilingMode.
+    """
+
+    __slots__ = ('path', 'tilingMode', 'tiles', 'uvBase')
+
+    def __init__(self, path, tilingMode, uvBase=0):
+        self.path = path
+        self.tilingMode = tilingMode
+        self.uvBase = uvBase
+        self.tiles = ()
+
+    def bounds(self):
+        # (uMin, vMin, uMax, vMax) in 0 based tile coordinates
+        us = [(tile - 1001) % 10 for tile in self.tiles]
+        vs = [(tile - 1001) // 10 for tile in self.tiles]
+        return min(us), min(vs), max(us), max(vs)
+
+    def tilePath(self, tile):
+        if self.tilingMode == 3:
+            return self.path.replace(UDIM_TOKEN, str(tile))
+        u = (tile - 1001) % 10 + self.uvBase
+        v = (tile - 1001) // 10 + self.uvBase
+        return self.path.replace(UVTILE_TOKEN, f"u{u}_v{v}")
+
+    def tilePaths(self):
+        return [self.tilePath(tile) for tile in self.tiles]
+
+    def __repr__(self):
+        return f"UdimTileSet({self.path!r}, tiles={len(self.tiles)})"
+
+#------------------------------------------------
+def splitTile(filename):
+    # (name without tile token, tokenized name, tile number, uvTilingMode) or None
+    match = UDIM_TILE.search(filename)
+    if match:
+        start, ext = match.start(), match.group(3)
+        return (filename[:start] + ext, filename[:start] + match.group(1) + UDIM_TOKEN + ext,
+                int(match.group(2)), 3)
+    match = UV_TILE.search(filename)
+    if match:
+        u, v = int(match.group(2)), int(match.group(3))
+        start, ext = match.start(), match.group(4)
+        return (filename[:start] + ext, filename[:start] + match.group(1) + UVTILE_TOKEN + ext,
+                (u, v), 2)
+    return None
+
+def collapseTiles(files, tileSets=None):
+    """Replaces per-tile files by one entry per tile set.
+
+    files are (filename, path) pairs. Tile sets come back as
+    (name without tile token, tokenized path) so they classify once under
+    their plain name; tileSets is filled with {tokenized path: UdimTileSet}.
+    """
+    collapsed = []
+    found = {}
+    tileNumbers = {}
+    for filename, filePath in files:
+        tile = splitTile(filename)
+        if tile is None:
+            collapsed.append((filename, filePath))
+            continue
+
+        plainName, tokenName, number, tilingMode = tile
+        tokenPath = os.path.join(os.path.dirname(filePath), tokenName)
+        if tokenPath not in found:
+            found[tokenPath] = UdimTileSet(tokenPath, tilingMode)
+            tileNumbers[tokenPath] = []
+            collapsed.append((plainName, tokenPath))
+        tileNumbers[tokenPath].append(number)
+
+    for tokenPath, numbers in tileNumbers.items():
+        tileSet = found[tokenPath]
+        if tileSet.tilingMode != 3:
+            # u0_v0 tiles mean ZBrush style 0 based numbering (uvTilingMode 1)
+            tileSet.uvBase = 0 if any(u == 0 or v == 0 for u, v in numbers) else 1
+            tileSet.tilingMode = 1 if tileSet.uvBase == 0 else 2
+            numbers = [1001 + (u - tileSet.uvBase) + 10 * (v - tileSet.uvBase) for u, v in numbers]
+        tileSet.tiles = tuple(sorted(set(numbers)))
+
+    if tileSets is not None:
+        tileSets.update(found)
+    return collapsed
+
+def isTokenizedPath(path):
+    return UDIM_TOKEN in path or UVTILE_TOKEN in path
+
+def tokenizePath(path):
+    # Literal tile path -> tokenized path, other paths are returned unchanged
+    tile = splitTile(os.path.basename(path))
+    if tile is None:
+        return path
+    return os.path.join(os.path.dirname(path), tile[1])
+
+def expandTiles(path):
+    # Files behind a path: every tile of a tokenized path, else the path itself if it exists
+    if not isTokenizedPath(path):
+        return [path] if os.path.exists(path) else []
+    pattern = glob.escape(path).replace(glob.escape(UDIM_TOKEN), '1[0-9][0-9][0-9]')
+    pattern = pattern.replace(glob.escape(UVTILE_TOKEN), '[uU]*_[vV]*')
+    return sorted(glob.glob(pattern))
+
+def textureExists(path):
+    # Tokenized paths exist when at least one tile does
+    if not isTokenizedPath(path):
+        return os.path.exists(path)
+    return bool(expandTiles(path))
+
+def patternSignature(texturePatterns):
+    return tuple((texType, tuple(patterns)) for texType, patterns in texturePatterns.items())
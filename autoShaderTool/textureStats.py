@@ -0,0 +1,247 @@
+"""
+Texture statistics module for Auto Shader Tool
+
+Reads pixel data in row chunks to find maps that hold a single value,
+so the value can be set on the material instead of sampling a texture.
+OpenImageIO decodes one chunk of scanlines at a time, Pillow decodes the
+whole image once and only the statistics are computed in chunks.
+
+Author: Nieves Yashuang Lopez
+Version: 1.0
+
+"""
+#------------------------------------------------
+import json
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+try:
+    from . import scanIndex
+    from . import textureScanner
+except ImportError:
+    import scanIndex
+    import textureScanner
+
+# numpy and an image library are optional, without them no map is reported constant.
+# They are imported on first use, numpy alone is slower to import than the whole tool
+np = None
+oiio = None
+Image = None
+_librariesLoaded = False
+
+# Per channel values normalized to 0-1 for integer images
+ChannelStats = namedtuple('ChannelStats', 'minimum maximum mean variance')
+
+CHUNK_ROWS = 256
+DEFAULT_TOLERANCE = 1.0 / 255
+STATS_CACHE_VERSION = 2
+
+_defaultCache = None
+
+#------------------------------------------------
+def _loadLibraries():
+    global np, oiio, Image, _librariesLoaded
+    if _librariesLoaded:
+        return
+    _librariesLoaded = True
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+    try:
+        import OpenImageIO as oiio
+    except ImportError:
+        oiio = None
+    try:
+        from PIL import Image
+    except ImportError:
+        Image = None
+
+def isAvailable():
+    _loadLibraries()
+    return np is not None and (oiio is not None or Image is not None)
+
+def getDefaultStatsCache():
+    global _defaultCache
+    if _defaultCache is None:
+        _defaultCache = StatsCache(os.path.join(scanIndex.getCacheDir(), 'textureStats.json'))
+    return _defaultCache
+
+def _iterChunks(path):
+    # (rows, width, channels) float arrays, CHUNK_ROWS rows at a time
+    if oiio is not None:
+        image = oiio.ImageInput.open(path)
+        if image is None:
+            raise OSError(oiio.geterror())
+        try:
+            spec = image.spec()
+            for y in range(spec.y, spec.y + spec.height, CHUNK_ROWS):
+                end = min(y + CHUNK_ROWS, spec.y + spec.height)
+                pixels = image.read_scanlines(0, 0, y, end, 0, 0, spec.nchannels, oiio.FLOAT)
+                if pixels is None:
+                    raise OSError(image.geterror())
+                yield np.asarray(pixels).reshape(end - y, spec.width, spec.nchannels)
+        finally:
+            image.close()
+        return
+
+    with Image.open(path) as image:
+        if image.mode == 'P':
+            image = image.convert('RGBA')
+        if image.mode in ('I', 'I;16', 'I;16B'):
+            scale = 65535.0
+        elif image.mode == 'F':
+            scale = 1.0
+        else:
+            scale = 255.0
+        # Pillow cannot decode part of an image, crop() would decode all of it per chunk
+        data = np.asarray(image)
+        for y in range(0, data.shape[0], CHUNK_ROWS):
+            pixels = data[y:y + CHUNK_ROWS].astype(np.float32) / scale
+            yield pixels.reshape(pixels.shape[0], pixels.shape[1], -1)
+
+def computeStats(path, tolerance=None):
+    """Per channel ChannelStats of one image file.
+
+    With a tolerance, reading stops as soon as every channel varies by
+    more than it; the stats then cover the rows read so far, which is
+    enough to tell the map is not constant.
+    """
+    _loadLibraries()
+    count = 0
+    for pixels in _iterChunks(path):
+        flat = pixels.reshape(-1, pixels.shape[-1]).astype(np.float64)
+        if count == 0:
+            minimum, maximum = flat.min(axis=0), flat.max(axis=0)
+            total, totalSquared = flat.sum(axis=0), np.square(flat).sum(axis=0)
+        else:
+            minimum = np.minimum(minimum, flat.min(axis=0))
+            maximum = np.maximum(maximum, flat.max(axis=0))
+            total += flat.sum(axis=0)
+            totalSquared += np.square(flat).sum(axis=0)
+        count += flat.shape[0]
+        if tolerance is not None and np.all(maximum - minimum > tolerance):
+            break
+    if count == 0:
+        return None
+    mean = total / count
+    variance = np.maximum(totalSquared / count - np.square(mean), 0.0)
+    return [ChannelStats(*map(float, values)) for values in zip(minimum, maximum, mean, variance)]
+
+def constantValue(stats, tolerance=DEFAULT_TOLERANCE):
+    # Mean of every channel when all of them stay within tolerance, else None
+    if not stats or any(channel.maximum - channel.minimum > tolerance for channel in stats):
+        return None
+    return tuple(channel.mean for channel in stats)
+
+#------------------------------------------------
+class StatsCache:
+    """On-disk ChannelStats keyed on (path, size, mtime, tolerance).
+
+    Stats computed with a tolerance may cover only the first rows of the
+    image, they are only reused for that same tolerance.
+    """
+
+    def __init__(self, cachePath, maxEntries=100000):
+        self.cachePath = cachePath
+        self.maxEntries = maxEntries
+        self.entries = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self.entries is not None:
+            return
+        self.entries = {}
+        try:
+            with open(self.cachePath, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == STATS_CACHE_VERSION:
+                self.entries = data.get('entries', {})
+        except (OSError, ValueError):
+            pass
+
+    def get(self, path, size, mtime, tolerance=None):
+        # (found, stats); stats is None for files that could not be read
+        with self._lock:
+            self._load()
+            record = self.entries.get(path)
+            if record is None or record[0] != size or record[1] != mtime or record[2] != tolerance:
+                return False, None
+            return True, record[3] and [ChannelStats(*channel) for channel in record[3]]
+
+    def put(self, path, size, mtime, stats, tolerance=None):
+        with self._lock:
+            self._load()
+            self.entries.pop(path, None)
+            self.entries[path] = [size, mtime, tolerance, stats and [list(channel) for channel in stats]]
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty or self.entries is None:
+                return
+            excess = len(self.entries) - self.maxEntries
+            for path in list(self.entries)[:max(excess, 0)]:
+                del self.entries[path]
+            try:
+                scanIndex.writeJson(self.cachePath, {'version': STATS_CACHE_VERSION, 'entries': self.entries})
+                self._dirty = False
+            except OSError:
+                pass
+
+#------------------------------------------------
+class ConstantDetector:
+    """Finds texture maps whose pixels all hold one value.
+
+    Stats are computed on a thread pool and cached per file, a map stops
+    being read once every channel is known to vary. Tokenized UDIM paths
+    are constant only when every tile holds the same value.
+    """
+
+    def __init__(self, tolerance=DEFAULT_TOLERANCE, statsCache=None, maxWorkers=8):
+        self.tolerance = tolerance
+        self.statsCache = statsCache
+        self.maxWorkers = maxWorkers
+
+    def _fileStats(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if self.statsCache is not None:
+            found, stats = self.statsCache.get(path, stat.st_size, stat.st_mtime_ns, self.tolerance)
+            if found:
+                return stats
+        try:
+            stats = computeStats(path, self.tolerance)
+        except Exception:
+            stats = None
+        if self.statsCache is not None:
+            self.statsCache.put(path, stat.st_size, stat.st_mtime_ns, stats, self.tolerance)
+        return stats
+
+    def findConstants(self, paths):
+        # {path: per channel values} for every constant map among paths
+        if not isAvailable():
+            return {}
+        files = dict((path, textureScanner.expandTiles(path)) for path in set(paths))
+        allFiles = sorted(set(f for tiles in files.values() for f in tiles))
+        if not allFiles:
+            return {}
+        with ThreadPoolExecutor(max_workers=self.maxWorkers) as pool:
+            values = dict(zip(allFiles, pool.map(lambda f: constantValue(self._fileStats(f), self.tolerance), allFiles)))
+        if self.statsCache is not None:
+            self.statsCache.save()
+
+        constants = {}
+        for path, tiles in files.items():
+            tileValues = [values[f] for f in tiles]
+            if not tileValues or any(value is None for value in tileValues):
+                continue
+            first = tileValues[0]
+            if all(len(value) == len(first) and max(abs(a - b) for a, b in zip(value, first)) <= self.tolerance
+                   for value in tileValues):
+                constants[path] = first
+        return constants
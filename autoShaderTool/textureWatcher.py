@@ -0,0 +1,411 @@
+"""
+Texture watcher module for Auto Shader Tool
+
+Watches the texture folders of the materials made by the tool and relinks
+the materials when maps are re-exported.
+
+Author: Nieves Yashuang Lopez
+Version: 1.0
+
+"""
+#------------------------------------------------
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+import maya.cmds as cmds
+try:
+    from . import nodeBuilder
+    from . import textureScanner
+except ImportError:
+    import nodeBuilder
+    import textureScanner
+
+# inotify flags from <sys/inotify.h>, a file counts as changed once it is closed or moved in
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0o2000000)
+EVENT_HEADER = struct.Struct('iIII')
+
+_watcher = None
+
+#------------------------------------------------
+def deferToIdle(func):
+    # Runs func on Maya's idle queue, batch Maya runs it right away
+    import maya.utils
+    maya.utils.executeDeferred(func)
+
+def _plainName(path):
+    # File name without its tile token, 'chair_BaseColor.<UDIM>.png' -> 'chair_BaseColor.png'
+    name = os.path.basename(path)
+    for token in (textureScanner.UDIM_TOKEN, textureScanner.UVTILE_TOKEN):
+        i = name.find(token)
+        if i >= 0:
+            name = name[:max(i - 1, 0)] + name[i + len(token):]
+    return name
+
+#------------------------------------------------
+class InotifyBackend:
+    """Linux kernel change notifications for a set of directories."""
+
+    def __init__(self, callback):
+        self.callback = callback
+        libraryName = ctypes.util.find_library('c') or 'libc.so.6'
+        self._libc = ctypes.CDLL(libraryName, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._watches = {}   # watch descriptor -> directory
+        self._lock = threading.Lock()
+        self._stopEvent = threading.Event()
+        self._thread = None
+
+    def setDirectories(self, directories):
+        with self._lock:
+            current = dict((directory, wd) for wd, directory in self._watches.items())
+            for directory in set(current) - set(directories):
+                self._libc.inotify_rm_watch(self._fd, current[directory])
+                del self._watches[current[directory]]
+            for directory in set(directories) - set(current):
+                wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO)
+                if wd < 0:
+                    errno = ctypes.get_errno()
+                    raise OSError(errno, f"Cannot watch {directory}: {os.strerror(errno)}")
+                self._watches[wd] = directory
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='autoShaderInotify', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopEvent.set()
+        if self._thread:
+            self._thread.join()
+        os.close(self._fd)
+
+    def _run(self):
+        while not self._stopEvent.is_set():
+            ready, _, _ = select.select([self._fd], [], [], 0.5)
+            if not ready:
+                continue
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                continue
+            paths = set()
+            offset = 0
+            with self._lock:
+                while offset < len(data):
+                    wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                    offset += EVENT_HEADER.size
+                    name = data[offset:offset + length].rstrip(b'\0')
+                    offset += length
+                    if mask & IN_Q_OVERFLOW:
+                        # Events were dropped, everything watched is rechecked
+                        paths.update(self._watches.values())
+                    elif mask & IN_IGNORED:
+                        self._watches.pop(wd, None)
+                    elif wd in self._watches and name:
+                        paths.add(os.path.join(self._watches[wd], os.fsdecode(name)))
+            if paths:
+                self.callback(paths)
+
+class PollingBackend:
+    """Compares (size, mtime) of every file in the directories every interval seconds."""
+
+    def __init__(self, callback, interval=2.0):
+        self.callback = callback
+        self.interval = interval
+        self._directories = set()
+        self._snapshots = {}
+        self._lock = threading.Lock()
+        self._stopEvent = threading.Event()
+        self._thread = None
+
+    def setDirectories(self, directories):
+        with self._lock:
+            self._directories = set(directories)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='autoShaderPolling', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopEvent.set()
+        if self._thread:
+            self._thread.join()
+
+    def _snapshot(self, directory):
+        files = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file():
+                            stat = entry.stat()
+                            files[entry.name] = (stat.st_size, stat.st_mtime_ns)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return files
+
+    def _run(self):
+        while not self._stopEvent.is_set():
+            with self._lock:
+                directories = set(self._directories)
+            paths = set()
+            for directory in directories:
+                files = self._snapshot(directory)
+                previous = self._snapshots.get(directory)
+                # A directory's first snapshot is only a baseline
+                if previous is not None:
+                    paths.update(os.path.join(directory, name) for name, state in files.items()
+                                 if previous.get(name) != state)
+                self._snapshots[directory] = files
+            for directory in set(self._snapshots) - directories:
+                del self._snapshots[directory]
+            if paths:
+                self.callback(paths)
+            self._stopEvent.wait(self.interval)
+
+#------------------------------------------------
+class TextureWatcher:
+    """Relinks tool materials whose texture files change on disk.
+
+    The folders of every file node of the tool's materials are watched
+    with inotify on Linux, or polled elsewhere. Changes are collected on
+    the backend thread and released once no new event came for debounce
+    seconds (or maxDelay after the first one), then only the changed
+    files are classified on a background thread. The resulting updates
+    go through updateMaterialTextures on Maya's idle queue, batchSize
+    materials per idle callback, so the main thread never waits on the
+    filesystem.
+    """
+
+    def __init__(self, creator, debounce=1.0, maxDelay=10.0, pollInterval=2.0, batchSize=20, usePolling=None):
+        self.creator = creator
+        self.debounce = debounce
+        self.maxDelay = maxDelay
+        self.pollInterval = pollInterval
+        self.batchSize = batchSize
+        self.usePolling = usePolling if usePolling is not None else not sys.platform.startswith('linux')
+        self.backend = None
+        self.updatedCount = 0
+        self.failedCount = 0
+        # directory -> {asset prefix: {material: {texType: current path}}}, replaced whole on refresh
+        self._watched = {}
+        self._pending = set()
+        self._firstEvent = None
+        self._lastEvent = None
+        self._updates = {}
+        self._scheduled = False
+        self._condition = threading.Condition()
+        self._updatesLock = threading.Lock()
+        self._stopEvent = threading.Event()
+        self._thread = None
+
+    def isRunning(self):
+        return self._thread is not None
+
+    def watchedDirectories(self):
+        return sorted(self._watched)
+
+    def start(self):
+        # Main thread: reads the scene, then hands off to the backend and debounce threads
+        if self.isRunning():
+            return
+        self._stopEvent.clear()
+        if not self.usePolling:
+            try:
+                self.backend = InotifyBackend(self._onChanges)
+            except (OSError, AttributeError):
+                self.backend = None
+        if self.backend is None:
+            self.backend = PollingBackend(self._onChanges, self.pollInterval)
+        self.refresh()
+        self.backend.start()
+        self._thread = threading.Thread(target=self._run, name='autoShaderWatcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self.isRunning():
+            return
+        self._stopEvent.set()
+        with self._condition:
+            self._condition.notify_all()
+        self._thread.join()
+        self._thread = None
+        self.backend.stop()
+        self.backend = None
+        with self._updatesLock:
+            self._updates.clear()
+
+    def refresh(self):
+        """Rereads which folders and materials to watch, call it after creating materials."""
+        creator = self.creator
+        creator.fileNodeIndex.proxied = nodeBuilder.listProxiedFileNodes()
+        classifier = creator.textureManager.getClassifier()
+        watched = {}
+        fileNodes = creator.getMaterialFileNodes(creator.getToolMaterials())
+        for material, textures in fileNodes.items():
+            for texType, fileNode in textures.items():
+                path = creator.fileNodeIndex.fullPath(fileNode)
+                if not path:
+                    continue
+                directory = os.path.normpath(os.path.dirname(path))
+                prefix = self._assetKey(classifier, _plainName(path), texType, directory)
+                assets = watched.setdefault(directory, {})
+                assets.setdefault(prefix, {}).setdefault(material, {})[texType] = path
+        self._watched = watched
+        try:
+            self.backend.setDirectories([directory for directory in watched if os.path.isdir(directory)])
+        except OSError:
+            # Out of inotify watches, polling has no limit
+            if isinstance(self.backend, PollingBackend):
+                raise
+            self.backend.stop()
+            self.backend = PollingBackend(self._onChanges, self.pollInterval)
+            self.backend.setDirectories([directory for directory in watched if os.path.isdir(directory)])
+            if self.isRunning():
+                self.backend.start()
+        return len(watched)
+
+    def _assetKey(self, classifier, filename, texType, directory):
+        # Files named only by type ('BaseColor.png') belong to their folder's asset
+        prefix = classifier.assetPrefix(filename, texType)
+        return (prefix or os.path.basename(directory)).lower()
+
+    #------------------------------------------------
+    def _onChanges(self, paths):
+        # Backend thread
+        with self._condition:
+            now = time.monotonic()
+            self._pending.update(paths)
+            if self._firstEvent is None:
+                self._firstEvent = now
+            self._lastEvent = now
+            self._condition.notify_all()
+
+    def _run(self):
+        while not self._stopEvent.is_set():
+            with self._condition:
+                if not self._pending:
+                    self._condition.wait(0.5)
+                    continue
+                now = time.monotonic()
+                wait = min(self._lastEvent + self.debounce, self._firstEvent + self.maxDelay) - now
+                if wait > 0:
+                    self._condition.wait(wait)
+                    continue
+                paths = self._pending
+                self._pending = set()
+                self._firstEvent = self._lastEvent = None
+            updates = self.classifyChanges(paths)
+            if updates:
+                self._queueUpdates(updates)
+
+    def classifyChanges(self, paths):
+        """{material: {texType: path}} for changed files of watched materials.
+
+        Only the changed files are classified. A file belongs to the
+        materials whose current maps in the same folder share its asset
+        prefix; tile files resolve to the tokenized path when the material
+        uses one.
+        """
+        manager = self.creator.textureManager
+        classifier = manager.getClassifier()
+        scanner = manager.getScanner()
+        watched = self._watched
+        updates = {}
+        for path in sorted(paths):
+            directory = os.path.normpath(os.path.dirname(path))
+            assets = watched.get(directory)
+            filename = os.path.basename(path)
+            if not assets or not scanner.isTexture(filename) or scanner.isIgnored(filename):
+                continue
+            tile = textureScanner.splitTile(filename)
+            plainName = tile[0] if tile else filename
+            matched = classifier.matchedTypes(os.path.splitext(plainName.lower())[0])
+            if not matched:
+                continue
+            texType = classifier.typeOrder[matched[0]]
+            materials = assets.get(self._assetKey(classifier, plainName, texType, directory))
+            if not materials:
+                continue
+            for material, textures in materials.items():
+                # Packed and single channel maps share tokens, the type the material uses wins
+                types = [classifier.typeOrder[index] for index in matched if classifier.typeOrder[index] in textures]
+                if not types:
+                    continue
+                current = textures[types[0]]
+                newPath = path
+                if tile and textureScanner.isTokenizedPath(current):
+                    newPath = os.path.join(os.path.dirname(path), tile[1])
+                updates.setdefault(material, {})[types[0]] = newPath
+        return updates
+
+    def _queueUpdates(self, updates):
+        with self._updatesLock:
+            for material, textures in updates.items():
+                self._updates.setdefault(material, {}).update(textures)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        deferToIdle(self._applyPending)
+
+    def _applyPending(self):
+        # Main thread, one batch per idle callback
+        with self._updatesLock:
+            materials = sorted(self._updates)[:self.batchSize]
+            batch = [(material, self._updates.pop(material)) for material in materials]
+        for material, textures in batch:
+            useUdim = any(textureScanner.isTokenizedPath(path) for path in textures.values())
+            try:
+                self.creator.updateMaterialTextures(material, textures, useUdim, reload=True)
+                self.updatedCount += 1
+            except Exception as e:
+                self.failedCount += 1
+                cmds.warning(f"Could not relink {material}: {e}")
+        with self._updatesLock:
+            if not self._updates or not self.isRunning():
+                self._scheduled = False
+                return
+        deferToIdle(self._applyPending)
+
+#------------------------------------------------
+def startWatching(creator=None, **kwargs):
+    """Starts the watcher over the scene's tool materials, returns it.
+
+    kwargs go to TextureWatcher. A running watcher is refreshed instead.
+    """
+    global _watcher
+    if _watcher is not None and _watcher.isRunning():
+        _watcher.refresh()
+        return _watcher
+    if creator is None:
+        try:
+            from . import shaderMain
+        except ImportError:
+            import shaderMain
+        creator = shaderMain.ArnoldShaderCreator()
+    _watcher = TextureWatcher(creator, **kwargs)
+    _watcher.start()
+    return _watcher
+
+def stopWatching():
+    global _watcher
+    if _watcher is not None:
+        _watcher.stop()
+        _watcher = None
+
+def isWatching():
+    return _watcher is not None and _watcher.isRunning()
@@ -0,0 +1,173 @@
+"""
+.tx conversion module for Auto Shader Tool
+
+Author: Nieves Yashuang Lopez
+Version: 1.0
+
+"""
+#------------------------------------------------
+import os
+import shlex
+import subprocess
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+try:
+    from . import scanIndex
+    from . import textureScanner
+except ImportError:
+    import scanIndex
+    import textureScanner
+
+# {input} and {output} are replaced per file, AUTOSHADER_MAKETX overrides the whole command
+DEFAULT_COMMAND = ['maketx', '--oiio', '--monochrome-detect', '{input}', '-o', '{output}']
+
+#------------------------------------------------
+def getConverterCommand():
+    command = os.environ.get('AUTOSHADER_MAKETX')
+    if command:
+        return shlex.split(command, posix=(os.name != 'nt'))
+    return list(DEFAULT_COMMAND)
+
+def txPath(path):
+    return os.path.splitext(path)[0] + '.tx'
+
+def findCollisions(paths, targetFunc=txPath):
+    # {path: [other paths with the same target]}, chair_BaseColor.png and .exr share chair_BaseColor.tx
+    targets = {}
+    for path in sorted(set(paths)):
+        targets.setdefault(os.path.normcase(targetFunc(path)), []).append(path)
+    return dict((path, [other for other in group if other != path])
+                for group in targets.values() if len(group) > 1 for path in group)
+
+def isUpToDate(source, target):
+    try:
+        return os.stat(target).st_mtime_ns >= os.stat(source).st_mtime_ns
+    except OSError:
+        return False
+
+#------------------------------------------------
+class ExternalConverter(ABC):
+    """Runs a command line tool once per texture file, in parallel.
+
+    Each file is converted by its own process, at most maxWorkers at a
+    time. Files whose target is newer than the source are skipped, output
+    goes to a temporary name first so an interrupted run never leaves a
+    target that looks up to date. Subclasses pick the target path.
+    """
+
+    def __init__(self, command, maxWorkers=None, timeout=None):
+        self.command = list(command)
+        self.maxWorkers = maxWorkers or max(1, (os.cpu_count() or 2) // 2)
+        self.timeout = timeout
+        self.converted = 0
+        self.skipped = 0
+        self.failed = {}
+
+    @abstractmethod
+    def targetPath(self, path):
+        pass
+
+    def buildCommand(self, source, target):
+        args = [arg.replace('{input}', source).replace('{output}', target) for arg in self.command]
+        if not any('{input}' in arg for arg in self.command):
+            args += [source, '-o', target]
+        return args
+
+    def convertFile(self, source):
+        # Returns 'skipped', 'converted' or an error message
+        target = self.targetPath(source)
+        if isUpToDate(source, target):
+            return 'skipped'
+
+        tempTarget = None
+        startupInfo = None
+        if os.name == 'nt':
+            startupInfo = subprocess.STARTUPINFO()
+            startupInfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        try:
+            # Unique per writer, scans in other threads or sessions may convert the same file.
+            # The extension stays last, converters pick the output format from it
+            fd, tempTarget = scanIndex.makeTempFile(target, '.tmp' + os.path.splitext(target)[1])
+            os.close(fd)
+            result = subprocess.run(self.buildCommand(source, tempTarget), stdout=subprocess.PIPE,
+                                    stderr=subprocess.STDOUT, timeout=self.timeout, startupinfo=startupInfo)
+            if result.returncode != 0 or not os.path.getsize(tempTarget):
+                output = result.stdout.decode('utf-8', 'replace').strip()
+                return output.splitlines()[-1] if output else f"exit code {result.returncode}"
+            os.replace(tempTarget, target)
+            return 'converted'
+        except (OSError, subprocess.SubprocessError) as e:
+            return str(e)
+        finally:
+            if tempTarget and os.path.exists(tempTarget):
+                try:
+                    os.remove(tempTarget)
+                except OSError:
+                    pass
+
+    def convertPaths(self, paths, progressCallback=None, cancelEvent=None):
+        """Converts every file behind paths, returns {path: target} for paths fully converted.
+
+        Tokenized UDIM paths map to their tokenized target once every tile
+        is converted. progressCallback(done, total) runs as files finish.
+        """
+        sources = {}
+        for path in set(paths):
+            if self.skipPath(path):
+                continue
+            files = textureScanner.expandTiles(path)
+            if files:
+                sources[path] = files
+
+        allFiles = sorted(set(f for files in sources.values() for f in files))
+        self.converted = 0
+        self.skipped = 0
+        self.failed = {}
+        if not allFiles:
+            return {}
+
+        # Sources sharing a target would overwrite each other, only the first is converted
+        for source, others in findCollisions(allFiles, self.targetPath).items():
+            if others[0] < source:
+                self.failed[source] = f"same target as {others[0]}"
+        allFiles = [source for source in allFiles if source not in self.failed]
+
+        done = 0
+        with ThreadPoolExecutor(max_workers=self.maxWorkers) as pool:
+            futures = dict((pool.submit(self.convertFile, source), source) for source in allFiles)
+            for future in as_completed(futures):
+                if cancelEvent is not None and cancelEvent.is_set():
+                    for pending in futures:
+                        pending.cancel()
+                    break
+                status = future.result()
+                if status == 'converted':
+                    self.converted += 1
+                elif status == 'skipped':
+                    self.skipped += 1
+                else:
+                    self.failed[futures[future]] = status
+                done += 1
+                if progressCallback:
+                    progressCallback(done, len(allFiles))
+
+        if cancelEvent is not None and cancelEvent.is_set():
+            return {}
+        return dict((path, self.targetPath(path)) for path, files in sources.items()
+                    if not any(f in self.failed for f in files))
+
+    def skipPath(self, path):
+        return False
+
+#------------------------------------------------
+class TxConverter(ExternalConverter):
+    """Converts textures to tiled, mipmapped .tx files next to the source."""
+
+    def __init__(self, command=None, maxWorkers=None, timeout=None):
+        super().__init__(command or getConverterCommand(), maxWorkers, timeout)
+
+    def targetPath(self, path):
+        return txPath(path)
+
+    def skipPath(self, path):
+        return os.path.splitext(path)[1].lower() == '.tx'
@@ -0,0 +1,86 @@
+"""
+Benchmark: legacy per-file pattern loop vs the compiled TextureClassifier
+
+Usage:
+python benchmarks/benchClassifier.py [fileCount ...]
+
+"""
+#------------------------------------------------
+import os
+import random
+import sys
+import time
+
+import mayaStub
+mayaStub.install()
+
+import shaderMain
+
+ASSETS = ['chair', 'table', 'lamp', 'sofa', 'shelf', 'rug', 'door', 'window', 'crate', 'barrel']
+MAPS = ['BaseColor', 'Albedo', 'Metallic', 'Roughness', 'Normal', 'NormalGL', 'Height', 'AO',
+        'Opacity', 'Emissive', 'Specular', 'Bump', 'Mask', 'preview', 'render', 'thumb']
+EXTENSIONS = ['.png', '.jpg', '.exr', '.tif', '.tx']
+
+def makeFiles(count, seed=1):
+    rng = random.Random(seed)
+    files = []
+    for i in range(count):
+        name = "%s%d_%s%s%s" % (rng.choice(ASSETS), i, rng.choice(MAPS),
+                               rng.choice(['', '_4k', '-v2', '.1001']), rng.choice(EXTENSIONS))
+        files.append((name, os.path.join('/textures', 'set%d' % (i % 50), name)))
+    # Keep the legacy loop from finishing early on the first few files
+    files.sort()
+    return files
+
+def legacyClassify(manager, allFiles):
+    textures = {}
+    for filename, filePath in allFiles:
+        nameLower = os.path.splitext(filename.lower())[0]
+        for texType, patterns in manager.texturePatterns.items():
+            if texType in textures:
+                continue
+            if any(manager._patternMatch(pattern, nameLower) for pattern in patterns):
+                textures[texType] = filePath
+                break
+    return textures
+
+def legacyMatchAll(manager, allFiles):
+    # Worst case: every file checked against every type (nothing ever filled)
+    return [[t for t, patterns in manager.texturePatterns.items()
+             if any(manager._patternMatch(p, os.path.splitext(f.lower())[0]) for p in patterns)]
+            for f, _ in allFiles]
+
+def classifierMatchAll(classifier, allFiles):
+    order = classifier.typeOrder
+    return [[order[i] for i in sorted(classifier.matchTypes(os.path.splitext(f.lower())[0]))]
+            for f, _ in allFiles]
+
+def checkPackedNames(classifier):
+    # Packed tokens that are also words ('arm') must not turn a color map into a packed map
+    files = [('hero_arm_BaseColor.png', '/textures/hero_arm_BaseColor.png')]
+    assert classifier.classifyFiles(files) == {'baseColor': files[0][1]}
+    assert classifier.classify('hero_arm_basecolor', {'baseColor': ''}) is None
+    assert list(classifier.groupFiles(files + [('hero_BaseColor.png', '/textures/hero_BaseColor.png')])) == ['hero', 'hero_arm']
+    assert classifier.classifyFiles([('rock_ARM.png', '/textures/rock_ARM.png')]) == {'arm': '/textures/rock_ARM.png'}
+    assert classifier.classifyFiles([('rock_arm_4k.png', '/textures/rock_arm_4k.png')]) == {'arm': '/textures/rock_arm_4k.png'}
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def run(counts):
+    manager = shaderMain.ArnoldTextureManager()
+    classifier = manager.getClassifier()
+    checkPackedNames(classifier)
+    print("%10s %12s %12s %8s" % ("files", "legacy (s)", "compiled (s)", "speedup"))
+    for count in counts:
+        allFiles = makeFiles(count)
+        legacy, legacyTime = timed(legacyMatchAll, manager, allFiles)
+        compiled, compiledTime = timed(classifierMatchAll, classifier, allFiles)
+        assert legacy == compiled, "classifier disagrees with _patternMatch"
+        assert legacyClassify(manager, allFiles) == classifier.classifyFiles(allFiles)
+        print("%10d %12.4f %12.4f %7.1fx" % (count, legacyTime, compiledTime, legacyTime / max(compiledTime, 1e-9)))
+
+if __name__ == "__main__":
+    run([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 50000])
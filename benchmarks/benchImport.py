@@ -0,0 +1,55 @@
+"""
+Benchmark: package import time with Maya stubbed
+
+Imports each target in a fresh interpreter with the Maya stand-in
+installed and reports the median time and the heavy optional modules
+(Qt, numpy, image libraries) the import pulled in. Headless targets must
+not load any of them.
+
+Usage:
+python benchmarks/benchImport.py [runs]
+
+"""
+#------------------------------------------------
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+TARGETS = ['autoShaderTool', 'autoShaderTool.shaderMain', 'autoShaderTool.batchBuild']
+HEAVY_MODULES = ['PySide2', 'shiboken2', 'numpy', 'OpenImageIO', 'PIL']
+
+# Runs in the child, the stub is set up before the clock starts
+CHILD = """
+import json, sys, time
+sys.path[:0] = [{root!r}, {bench!r}]
+import mayaStub
+mayaStub.install()
+sys.path.remove(mayaStub.PACKAGE_DIR)
+start = time.perf_counter()
+import {target}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'heavy': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def importOnce(target):
+    code = CHILD.format(root=ROOT_DIR, bench=BENCH_DIR, target=target, heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, '-c', code], stdout=subprocess.PIPE, check=True, cwd=BENCH_DIR)
+    return json.loads(output.stdout.decode().strip().splitlines()[-1])
+
+def run(runs):
+    failed = False
+    print("%-28s %10s  %s" % ("target", "median ms", "heavy modules"))
+    for target in TARGETS:
+        results = [importOnce(target) for _ in range(runs)]
+        median = statistics.median(result['seconds'] for result in results) * 1000.0
+        heavy = results[0]['heavy']
+        print("%-28s %10.2f  %s" % (target, median, ", ".join(heavy) or "-"))
+        failed = failed or bool(heavy)
+    assert not failed, "headless import loaded Qt or an optional image library"
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
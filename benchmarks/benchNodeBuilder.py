@@ -0,0 +1,57 @@
+"""
+Benchmark: cmds vs MDGModifier shader network backends
+
+Builds the same materials with both builders against the in-memory Maya
+stand-in, checks that the resulting graphs match and that the api backend
+needs one doIt() per batch.
+
+Usage:
+python benchmarks/benchNodeBuilder.py [materialCount]
+
+"""
+#------------------------------------------------
+import sys
+import time
+
+import mayaStub
+mayaStub.install()
+
+import nodeBuilder
+import shaderMain
+
+TEXTURES = {'baseColor': '/tex/{0}_BaseColor.png', 'metalness': '/tex/{0}_Metalness.png',
+            'roughness': '/tex/{0}_Roughness.png', 'normal': '/tex/{0}_Normal.png',
+            'displacement': '/tex/{0}_Height.exr',
+            'specular': '/tex/{0}_Specular.png', 'emission': '/tex/{0}_Emissive.png',
+            'opacity': '/tex/{0}_Opacity.png', 'ao': '/tex/{0}_AO.png'}
+
+def makeGroups(count):
+    return dict((f"asset{i}", dict((t, p.format(f"asset{i}")) for t, p in TEXTURES.items())) for i in range(count))
+
+def build(backend, groups):
+    mayaStub.reset()
+    creator = shaderMain.ArnoldShaderCreator()
+    creator.builderBackend = backend
+    start = time.perf_counter()
+    creator.createShaderNetworks(groups)
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(mayaStub.scene.calls.values()), mayaStub.MDGModifier.doItCalls, mayaStub.scene.graph()
+
+def run(count):
+    groups = makeGroups(count)
+    # Loaded once per session in Maya, not part of a build
+    mayaStub.loadPlugin(nodeBuilder.COMMIT_PLUGIN)
+    cmdsTime, cmdsCalls, _, cmdsGraph = build('cmds', groups)
+    apiTime, apiCalls, doItCalls, apiGraph = build('api', groups)
+
+    assert cmdsGraph == apiGraph, "api backend built a different graph"
+    assert doItCalls == 1, f"expected one MDGModifier.doIt per batch, got {doItCalls}"
+    # api: ls(nodeTypes), ls(file), ls(proxied), ls(names), pluginInfo x2, autoShaderCommit, inViewMessage
+    assert apiCalls <= 8, f"api backend made {apiCalls} cmds calls"
+
+    print(f"{count} materials")
+    print(f"  cmds: {cmdsTime:8.4f}s  {cmdsCalls:6d} cmds calls ({cmdsCalls / count:.1f} per material)")
+    print(f"  api:  {apiTime:8.4f}s  {apiCalls:6d} cmds calls, {doItCalls} doIt")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
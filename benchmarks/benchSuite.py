@@ -0,0 +1,267 @@
+"""
+Benchmark suite: scans and shader builds on synthetic texture trees
+
+Generates delivery-like trees on disk (see syntheticTree), then times the
+main operations against the in-memory Maya stand-in with an optional
+simulated cost per command. Each result records wall time, peak Python
+memory and the cmds calls made, and the whole run is written as JSON so
+runs from different commits can be compared.
+
+Usage:
+python benchmarks/benchSuite.py [--sizes 1000,10000] [--latency 0.00005] [--output results.json]
+python benchmarks/benchSuite.py --compare before.json after.json
+
+"""
+#------------------------------------------------
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import mayaStub
+mayaStub.install()
+
+WORK_DIR = os.path.join(tempfile.gettempdir(), 'autoShaderBench')
+# Keep the tool's caches away from the user's
+os.environ.setdefault('AUTOSHADER_CACHE_DIR', os.path.join(WORK_DIR, 'cache'))
+
+import nodeBuilder
+import scanIndex
+import sceneAudit
+import shaderMain
+import syntheticTree
+
+RESULTS_VERSION = 1
+
+#------------------------------------------------
+def measure(setup, func, memory=True):
+    """Runs func(setup()) and returns (seconds, peak bytes or None, cmds calls, result).
+
+    Time and memory come from separate runs, tracemalloc slows the code
+    it watches too much to time it at the same time.
+    """
+    state = setup()
+    mayaStub.scene.calls.clear()
+    mayaStub.MDGModifier.doItCalls = 0
+    start = time.perf_counter()
+    result = func(state)
+    seconds = time.perf_counter() - start
+    calls = dict(mayaStub.scene.calls)
+    if mayaStub.MDGModifier.doItCalls:
+        calls['MDGModifier.doIt'] = mayaStub.MDGModifier.doItCalls
+
+    peak = None
+    if memory:
+        state = setup()
+        tracemalloc.start()
+        try:
+            func(state)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return seconds, peak, calls, result
+
+def freshIndexPath(name):
+    path = os.path.join(WORK_DIR, 'index', name + '.json')
+    if os.path.exists(path):
+        os.remove(path)
+    return path
+
+def makeManager(indexPath):
+    manager = shaderMain.ArnoldTextureManager()
+    manager.scanIndex = scanIndex.ScanIndex(indexPath)
+    manager.useUdimMode = True
+    return manager
+
+def prepareScene(meshCount):
+    mayaStub.reset()
+    return [mayaStub.scene.addMesh(f"mesh{i}") for i in range(meshCount)]
+
+def makeCreator(backend):
+    creator = shaderMain.ArnoldShaderCreator()
+    creator.builderBackend = backend
+    creator.setUdimMode(True)
+    return creator
+
+#------------------------------------------------
+def scanOperations(treeDir, files, memory):
+    results = []
+    for operation in ('findTextures', 'groupTextures'):
+        indexPath = freshIndexPath(f"{operation}_{files}")
+
+        def cold():
+            if os.path.exists(indexPath):
+                os.remove(indexPath)
+            return makeManager(indexPath)
+
+        run = lambda manager: getattr(manager, operation)(treeDir)
+        # Warm runs load the index written by the cold run from disk
+        for phase, setup in (('cold', cold), ('warm', lambda: makeManager(indexPath))):
+            seconds, peak, calls, found = measure(setup, run, memory)
+            results.append(record(f"{operation}.{phase}", files, None, seconds, peak, calls,
+                                  groups=len(found) if operation == 'groupTextures' else None))
+    return results
+
+def sceneOperations(groups, files, options):
+    results = []
+    names = sorted(groups)[:options.materials]
+    batch = dict((name, groups[name]) for name in names)
+    if not batch:
+        return results
+    firstTextures = batch[names[0]]
+
+    for backend in options.backends:
+        def single(state):
+            creator, selection = state
+            return creator.createShaderNetwork(names[0], selection, firstTextures)
+        seconds, peak, calls, _ = measure(lambda: (makeCreator(backend), prepareScene(options.meshes)),
+                                          single, options.memory)
+        results.append(record('createShaderNetwork', files, backend, seconds, peak, calls,
+                              meshes=options.meshes))
+
+        def many(creator):
+            return creator.createShaderNetworks(batch)
+        seconds, peak, calls, materials = measure(lambda: (prepareScene(0), makeCreator(backend))[1],
+                                                  many, options.memory)
+        results.append(record('createShaderNetworks', files, backend, seconds, peak, calls,
+                              materials=len(batch)))
+
+        # Every material is pointed at the textures of the next asset
+        def relinkSetup():
+            prepareScene(0)
+            creator = makeCreator(backend)
+            built = creator.createShaderNetworks(batch)
+            return creator, built
+
+        def update(state):
+            creator, built = state
+            for i, name in enumerate(names):
+                creator.updateMaterialTextures(built[name], batch[names[(i + 1) % len(names)]])
+        seconds, peak, calls, _ = measure(relinkSetup, update, options.memory)
+        results.append(record('updateMaterialTextures', files, backend, seconds, peak, calls,
+                              materials=len(batch)))
+
+        def audit(state):
+            creator, built = state
+            return sceneAudit.SceneAuditor(creator).audit()
+        seconds, peak, calls, issues = measure(relinkSetup, audit, options.memory)
+        results.append(record('SceneAuditor.audit', files, backend, seconds, peak, calls,
+                              materials=len(batch), issues=len(issues)))
+    return results
+
+def nameOperations(files, options):
+    # NameAllocator replaced the per-name objExists loop of _getUniqueName
+    bases = [f"asset{i}" for i in range(50)]
+    perBase = max(1, options.names // len(bases))
+
+    def setup():
+        mayaStub.reset()
+        for base in bases:
+            for i in range(perBase):
+                mayaStub.scene.createNode('aiStandardSurface', f"{base}_{i}_SHD" if i else f"{base}_SHD")
+        return nodeBuilder.NameAllocator()
+
+    def allocate(allocator):
+        allocator.refresh()
+        for i in range(perBase):
+            for base in bases:
+                allocator.allocate(base, ('_SHD', '_SG'))
+    seconds, peak, calls, _ = measure(setup, allocate, options.memory)
+    return [record('NameAllocator.allocate', files, None, seconds, peak, calls,
+                   names=perBase * len(bases), existing=perBase * len(bases))]
+
+def record(operation, files, backend, seconds, peak, calls, **extra):
+    result = {'operation': operation, 'files': files, 'backend': backend, 'seconds': round(seconds, 6),
+              'peakBytes': peak, 'cmdsCalls': sum(calls.values()), 'calls': calls}
+    result.update((key, value) for key, value in extra.items() if value is not None)
+    return result
+
+#------------------------------------------------
+def gitCommit():
+    try:
+        output = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=10)
+        return output.stdout.decode().strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def resultKey(result):
+    return (result['operation'], result['files'], result['backend'])
+
+def printResults(results):
+    print("%-28s %9s %6s %10s %10s %9s" % ("operation", "files", "backend", "seconds", "peak MB", "cmds"))
+    for result in results:
+        peak = "%10.1f" % (result['peakBytes'] / 1048576.0) if result['peakBytes'] is not None else "%10s" % "-"
+        print("%-28s %9d %6s %10.4f %s %9d" % (result['operation'], result['files'], result['backend'] or "-",
+                                              result['seconds'], peak, result['cmdsCalls']))
+
+def compare(beforePath, afterPath):
+    with open(beforePath, 'r') as f:
+        before = json.load(f)
+    with open(afterPath, 'r') as f:
+        after = json.load(f)
+    print(f"{before.get('commit')} -> {after.get('commit')}")
+    print("%-28s %9s %6s %10s %10s %8s %9s" % ("operation", "files", "backend", "before", "after", "ratio", "cmds"))
+    previous = dict((resultKey(result), result) for result in before['results'])
+    for result in after['results']:
+        old = previous.get(resultKey(result))
+        if old is None:
+            continue
+        ratio = result['seconds'] / max(old['seconds'], 1e-9)
+        print("%-28s %9d %6s %10.4f %10.4f %7.2fx %+9d" % (result['operation'], result['files'],
+                                                          result['backend'] or "-", old['seconds'], result['seconds'],
+                                                          ratio, result['cmdsCalls'] - old['cmdsCalls']))
+
+def run(options):
+    mayaStub.setLatency(options.latency)
+    treeRoot = options.treeDir or os.path.join(WORK_DIR, 'trees')
+    results = []
+    for files in options.sizes:
+        print(f"Preparing {files} file tree...", file=sys.stderr)
+        treeDir = syntheticTree.makeTree(treeRoot, files, options.seed)
+        results.extend(scanOperations(treeDir, files, options.memory))
+        groups = makeManager(freshIndexPath('groups')).groupTextures(treeDir)
+        results.extend(sceneOperations(groups, files, options))
+        results.extend(nameOperations(files, options))
+        if not options.keepTrees and not options.treeDir:
+            shutil.rmtree(treeDir, ignore_errors=True)
+
+    printResults(results)
+    if options.output:
+        data = {'version': RESULTS_VERSION, 'commit': gitCommit(), 'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(), 'platform': platform.platform(),
+                'latency': options.latency, 'seed': options.seed, 'results': results}
+        with open(options.output, 'w') as f:
+            json.dump(data, f, indent=1)
+        print(f"Results written to {options.output}", file=sys.stderr)
+    return results
+
+def parseArgs(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=lambda text: [int(size) for size in text.split(',')], default=[1000, 10000],
+                        help="comma separated file counts per tree (up to 1000000)")
+    parser.add_argument('--latency', type=float, default=0.0, help="simulated seconds per cmds call")
+    parser.add_argument('--materials', type=int, default=200, help="materials built per scene benchmark")
+    parser.add_argument('--meshes', type=int, default=1000, help="selected meshes for createShaderNetwork")
+    parser.add_argument('--names', type=int, default=5000, help="names allocated by the name benchmark")
+    parser.add_argument('--backends', type=lambda text: text.split(','), default=['cmds', 'api'])
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--tree-dir', dest='treeDir', help="reuse trees here instead of a temporary folder")
+    parser.add_argument('--keep-trees', dest='keepTrees', action='store_true')
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help="skip the tracemalloc runs")
+    parser.add_argument('--output', help="JSON results file")
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help="compare two results files")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    arguments = parseArgs()
+    if arguments.compare:
+        compare(*arguments.compare)
+    else:
+        run(arguments)
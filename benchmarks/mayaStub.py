@@ -0,0 +1,542 @@
+"""
+In-memory maya.cmds / maya.api.OpenMaya stand-in for benchmarks
+
+Only the commands the tool uses are implemented. Nodes, attribute values
+and connections live in a FakeScene, every command is counted.
+
+Author: Nieves Yashuang Lopez
+Version: 1.0
+
+"""
+#------------------------------------------------
+import importlib.util
+import os
+import re
+import sys
+import threading
+import time
+import types
+from collections import Counter
+
+PACKAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'autoShaderTool')
+
+DEFAULT_NODES = {'defaultShaderList1': 'defaultShaderList', 'defaultTextureList1': 'defaultTextureList',
+                 'defaultRenderUtilityList1': 'defaultRenderUtilityList', 'renderPartition': 'partition',
+                 'defaultColorMgtGlobals': 'colorManagementGlobals', 'initialShadingGroup': 'shadingEngine'}
+LIST_PLUGS = {'shader': ('defaultShaderList1', 'shaders'), 'texture': ('defaultTextureList1', 'textures'),
+              'utility': ('defaultRenderUtilityList1', 'utilities')}
+COLOR_MANAGEMENT = [('cmEnabled', 'colorManagementEnabled'),
+                    ('configFileEnabled', 'colorManagementConfigFileEnabled'),
+                    ('configFilePath', 'colorManagementConfigFilePath'),
+                    ('workingSpaceName', 'workingSpace')]
+NODE_TYPES = ['aiStandardSurface', 'aiNormalMap', 'aiBump2d', 'file', 'place2dTexture', 'displacementShader',
+              'shadingEngine', 'materialInfo', 'mesh', 'transform']
+
+# Seconds each command (and each MDGModifier.doIt) takes, see setLatency
+latency = 0.0
+
+#------------------------------------------------
+class FakeScene:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.nodes = dict(DEFAULT_NODES)
+        self.attrs = {}
+        self.connections = {}   # destination plug -> source plug
+        self.nodePlugs = {}     # node -> destination plugs of its connections, both directions
+        self.dynamicAttrs = {}  # node -> set of added attribute names
+        self.arrayNext = {}     # array plug -> next free logical index
+        self.members = {}       # shading group -> set of members
+        self.parents = {}       # shape -> transform
+        self.selection = []
+        self.calls = Counter()
+        self.undoChunks = 0
+        self.sceneName = ""
+
+    def uniqueName(self, name):
+        # Maya appends a number when the requested name is taken
+        if name not in self.nodes:
+            return name
+        stem = re.sub(r'\d+$', '', name)
+        counter = 1
+        while f"{stem}{counter}" in self.nodes:
+            counter += 1
+        return f"{stem}{counter}"
+
+    def createNode(self, nodeType, name=None):
+        name = self.uniqueName(name or nodeType + '1')
+        self.nodes[name] = nodeType
+        return name
+
+    def addMesh(self, name):
+        # Transform with a mesh shape under it, returns the transform name
+        transform = self.createNode('transform', name)
+        shape = self.createNode('mesh', transform + 'Shape')
+        self.parents[shape] = transform
+        return transform
+
+    def nextIndex(self, node, attr):
+        return self.arrayNext.get(f"{node}.{attr}", 0)
+
+    def connect(self, src, dst):
+        if dst in self.connections:
+            raise RuntimeError(f"{dst} is already connected")
+        self.connections[dst] = src
+        for plug in (src, dst):
+            self.nodePlugs.setdefault(plug.split('.')[0], {})[dst] = None
+        if dst.endswith(']'):
+            array, _, index = dst[:-1].rpartition('[')
+            self.arrayNext[array] = max(self.arrayNext.get(array, 0), int(index) + 1)
+
+    def disconnect(self, dst):
+        src = self.connections.pop(dst, None)
+        if src is not None:
+            for plug in (src, dst):
+                self.nodePlugs.get(plug.split('.')[0], {}).pop(dst, None)
+
+    def nodeConnections(self, node):
+        # (destination, source) pairs touching node, in connection order
+        return [(dst, self.connections[dst]) for dst in self.nodePlugs.get(node, ())]
+
+    def register(self, name, role):
+        # What shadingNode and sets -renderable add behind the scenes
+        if role == 'shadingGroup':
+            self.connect(f"{name}.partition", f"renderPartition.sets[{self.nextIndex('renderPartition', 'sets')}]")
+            info = self.createNode('materialInfo', 'materialInfo1')
+            self.connect(f"{name}.message", f"{info}.shadingGroup")
+            return
+        listNode, listAttr = LIST_PLUGS[role]
+        self.connect(f"{name}.message", f"{listNode}.{listAttr}[{self.nextIndex(listNode, listAttr)}]")
+        if self.nodes[name] == 'file':
+            for src, dst in COLOR_MANAGEMENT:
+                self.connect(f"defaultColorMgtGlobals.{src}", f"{name}.{dst}")
+
+    def graph(self):
+        # Name independent snapshot: node type counts, typed values and typed connections
+        def typed(plug):
+            node, _, attr = plug.partition('.')
+            return (self.nodes.get(node, '?'), re.sub(r'\[\d+\]', '[]', attr))
+        return (sorted(Counter(self.nodes.values()).items()),
+                sorted((typed(plug), repr(value)) for plug, value in self.attrs.items()),
+                sorted((typed(src), typed(dst)) for dst, src in self.connections.items()))
+
+scene = FakeScene()
+
+#------------------------------------------------
+# maya.cmds
+def _simulateLatency():
+    # Busy wait, sleep() is far too coarse for per-command latencies
+    end = time.perf_counter() + latency
+    while time.perf_counter() < end:
+        pass
+
+def _counted(func):
+    def wrapper(*args, **kwargs):
+        scene.calls[func.__name__] += 1
+        if latency:
+            _simulateLatency()
+        return func(*args, **kwargs)
+    wrapper.__name__ = func.__name__
+    return wrapper
+
+@_counted
+def shadingNode(nodeType, asShader=False, asTexture=False, asUtility=False, name=None, **kwargs):
+    node = scene.createNode(nodeType, name)
+    scene.register(node, 'shader' if asShader else 'texture' if asTexture else 'utility')
+    return node
+
+@_counted
+def createNode(nodeType, name=None, **kwargs):
+    return scene.createNode(nodeType, name)
+
+@_counted
+def sets(*objects, **kwargs):
+    if kwargs.get('renderable') and kwargs.get('empty'):
+        node = scene.createNode('shadingEngine', kwargs.get('name'))
+        scene.register(node, 'shadingGroup')
+        return node
+    target = kwargs.get('forceElement') or kwargs.get('edit') and kwargs.get('addElement')
+    if target:
+        items = []
+        for obj in objects:
+            items.extend(obj if isinstance(obj, (list, tuple)) else [obj])
+        for item in items:
+            if item.split('.')[0].split('|')[-1] not in scene.nodes and item not in scene.nodes:
+                raise ValueError(f"No object matches name: {item}")
+        for members in scene.members.values():
+            members.difference_update(items)
+        scene.members.setdefault(target, set()).update(items)
+        return None
+    return None
+
+@_counted
+def addAttr(node, longName=None, **kwargs):
+    scene.dynamicAttrs.setdefault(node, set()).add(longName)
+
+@_counted
+def delete(*nodes, **kwargs):
+    for node in nodes:
+        scene.nodes.pop(node, None)
+        for dst, _ in scene.nodeConnections(node):
+            scene.disconnect(dst)
+
+@_counted
+def setAttr(plug, *values, **kwargs):
+    node = plug.split('.')[0]
+    if node not in scene.nodes:
+        raise RuntimeError(f"No object matches name: {plug}")
+    scene.attrs[plug] = values[0] if len(values) == 1 else tuple(values)
+
+@_counted
+def getAttr(plug, **kwargs):
+    return scene.attrs.get(plug)
+
+@_counted
+def connectAttr(src, dst, force=False, **kwargs):
+    for plug in (src, dst):
+        if plug.split('.')[0] not in scene.nodes:
+            raise RuntimeError(f"No object matches name: {plug}")
+    if force:
+        scene.disconnect(dst)
+    scene.connect(src, dst)
+
+@_counted
+def objExists(name):
+    return name.split('.')[0] in scene.nodes
+
+@_counted
+def nodeType(name, **kwargs):
+    return scene.nodes.get(name)
+
+@_counted
+def ls(*args, **kwargs):
+    if kwargs.get('nodeTypes'):
+        return list(NODE_TYPES)
+    if kwargs.get('selection'):
+        return list(scene.selection)
+    if args and isinstance(args[0], str) and args[0].startswith('*.'):
+        attr = args[0][2:]
+        return [node for node, attrs in scene.dynamicAttrs.items() if attr in attrs and node in scene.nodes]
+    names = list(args[0]) if args and isinstance(args[0], (list, tuple)) else list(scene.nodes)
+    nodeTypeFilter = kwargs.get('type')
+    if nodeTypeFilter:
+        filters = nodeTypeFilter if isinstance(nodeTypeFilter, (list, tuple)) else [nodeTypeFilter]
+        names = [name for name in names if scene.nodes.get(name) in filters]
+        if kwargs.get('long'):
+            names = [f"|{scene.parents[name]}|{name}" if name in scene.parents else name for name in names]
+    else:
+        names = [name for name in names if name in scene.nodes]
+    if kwargs.get('showType'):
+        return [item for name in names for item in (name, scene.nodes[name])]
+    return names
+
+@_counted
+def listRelatives(nodes, parent=False, **kwargs):
+    if isinstance(nodes, str):
+        nodes = [nodes]
+    result = []
+    for node in nodes:
+        shape = node.split('|')[-1]
+        if parent and shape in scene.parents:
+            result.append(('|' if kwargs.get('fullPath') else '') + scene.parents[shape])
+    return result or None
+
+@_counted
+def listConnections(plug, source=True, destination=True, plugs=False, connections=False, type=None, **kwargs):
+    if isinstance(plug, (list, tuple)):
+        result = []
+        for item in plug:
+            result.extend(listConnections(item, source, destination, plugs, connections, type) or [])
+        scene.calls['listConnections'] -= len(plug)
+        return result or None
+    node, _, attr = plug.partition('.')
+    result = []
+    for dst, src in scene.nodeConnections(node):
+        found = []
+        if source and (dst == plug or (not attr and dst.startswith(node + '.'))):
+            found.append((dst, src))
+        if destination and (src == plug or (not attr and src.startswith(node + '.'))):
+            found.append((src, dst))
+        for own, other in found:
+            if type and scene.nodes.get(other.split('.')[0]) != type:
+                continue
+            if connections:
+                result.append(own)
+            result.append(other if plugs else other.split('.')[0])
+    return result or None
+
+@_counted
+def listHistory(nodes, **kwargs):
+    # Upstream nodes, including the start nodes
+    pending = [nodes] if isinstance(nodes, str) else list(nodes)
+    seen = []
+    while pending:
+        node = pending.pop()
+        if node in seen:
+            continue
+        seen.append(node)
+        for dst, src in scene.nodeConnections(node):
+            if dst.startswith(node + '.') and not src.startswith('default'):
+                pending.append(src.split('.')[0])
+    return seen
+
+# Python plugin files loaded by loadPlugin, other plugins (mtoa) always count as loaded
+loadedPlugins = {}
+
+@_counted
+def pluginInfo(plugin, **kwargs):
+    return not plugin.endswith('.py') or plugin in loadedPlugins
+
+@_counted
+def loadPlugin(plugin, **kwargs):
+    # Python plugins are imported from their file under their own name, like Maya does
+    if not plugin.endswith('.py') or plugin in loadedPlugins:
+        return None
+    name = os.path.splitext(os.path.basename(plugin))[0]
+    spec = importlib.util.spec_from_file_location(name, plugin)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.initializePlugin(MObject(name))
+    loadedPlugins[plugin] = module
+    return [name]
+
+@_counted
+def colorManagementPrefs(*args, **kwargs):
+    return ['Raw', 'sRGB', 'scene-linear Rec.709-sRGB', 'ACEScg']
+
+@_counted
+def inViewMessage(*args, **kwargs):
+    return None
+
+@_counted
+def warning(*args, **kwargs):
+    return None
+
+@_counted
+def undoInfo(*args, **kwargs):
+    if kwargs.get('openChunk'):
+        scene.undoChunks += 1
+
+@_counted
+def file(*args, **kwargs):
+    # new, rename and save; a saved scene is a plain listing of its nodes and connections
+    if kwargs.get('new'):
+        scene.reset()
+    elif kwargs.get('rename'):
+        scene.sceneName = kwargs['rename']
+    elif kwargs.get('save'):
+        with open(scene.sceneName, 'w') as f:
+            f.write("//Maya ASCII scene written by mayaStub\n")
+            for name, nodeType in sorted(scene.nodes.items()):
+                f.write(f"createNode {nodeType} -n \"{name}\";\n")
+            for dst, src in sorted(scene.connections.items()):
+                f.write(f"connectAttr \"{src}\" \"{dst}\";\n")
+        return scene.sceneName
+    elif kwargs.get('query') and kwargs.get('sceneName'):
+        return scene.sceneName
+    return None
+
+#------------------------------------------------
+# maya.api.OpenMaya
+class MObject:
+    def __init__(self, name=None, nodeType=None):
+        self.name = name
+        self.nodeType = nodeType
+
+class MPlug:
+    def __init__(self, obj, attr):
+        self.obj = obj
+        self.attr = attr
+
+    def name(self):
+        return f"{self.obj.name}.{self.attr}"
+
+    @property
+    def isDestination(self):
+        return self.obj.name is not None and self.name() in scene.connections
+
+    def source(self):
+        node, _, attr = scene.connections[self.name()].partition('.')
+        return MPlug(MObject(node), attr)
+
+    def child(self, index):
+        return MPlug(self.obj, self.attr + 'RGB'[index])
+
+    def getExistingArrayAttributeIndices(self):
+        next = scene.nextIndex(self.obj.name, self.attr)
+        return list(range(next))
+
+    def elementByLogicalIndex(self, index):
+        return MPlug(self.obj, f"{self.attr}[{index}]")
+
+    def asString(self):
+        return scene.attrs.get(self.name()) or ""
+
+    def asInt(self):
+        return int(scene.attrs.get(self.name()) or 0)
+
+    def asBool(self):
+        return bool(scene.attrs.get(self.name()))
+
+class MFnDependencyNode:
+    def __init__(self, obj):
+        self.obj = obj
+
+    def findPlug(self, attr, wantNetworkedPlug):
+        return MPlug(self.obj, attr)
+
+    def name(self):
+        return self.obj.name
+
+class MSelectionList:
+    def __init__(self):
+        self.items = []
+
+    def add(self, name):
+        if name not in scene.nodes:
+            raise RuntimeError(f"{name} does not exist")
+        self.items.append(name)
+
+    def getDependNode(self, index):
+        name = self.items[index]
+        return MObject(name, scene.nodes[name])
+
+class MFnData:
+    kString = 'string'
+
+class MFnTypedAttribute:
+    def create(self, longName, shortName, dataType):
+        return longName
+
+class MPxCommand:
+    pass
+
+class MFnPlugin:
+    def __init__(self, plugin, vendor=None, version=None):
+        self.plugin = plugin
+
+    def registerCommand(self, name, creator):
+        # The command shows up in maya.cmds, counted like the built in ones
+        def command(*args, **kwargs):
+            scene.calls[name] += 1
+            return creator().doIt(args)
+        command.__name__ = name
+        setattr(sys.modules['maya.cmds'], name, command)
+
+    def deregisterCommand(self, name):
+        delattr(sys.modules['maya.cmds'], name)
+
+class MDGModifier:
+    """Queues operations and applies them to the FakeScene on doIt()."""
+
+    doItCalls = 0
+
+    def __init__(self):
+        self.queue = []
+
+    def createNode(self, nodeType):
+        obj = MObject(None, nodeType)
+        self.queue.append(('create', obj, nodeType))
+        return obj
+
+    def renameNode(self, obj, name):
+        self.queue.append(('rename', obj, name))
+
+    def connect(self, src, dst):
+        self.queue.append(('connect', src, dst))
+
+    def disconnect(self, src, dst):
+        self.queue.append(('disconnect', src, dst))
+
+    def addAttribute(self, obj, attr):
+        self.queue.append(('addAttr', obj, attr))
+
+    def _value(self, plug, value):
+        self.queue.append(('set', plug, value))
+
+    newPlugValueString = newPlugValueFloat = newPlugValueInt = newPlugValueBool = _value
+
+    def doIt(self):
+        MDGModifier.doItCalls += 1
+        if latency:
+            _simulateLatency()
+        for op in self.queue:
+            kind = op[0]
+            if kind == 'create':
+                op[1].name = scene.createNode(op[2])
+            elif kind == 'rename':
+                obj, name = op[1], op[2]
+                del scene.nodes[obj.name]
+                obj.name = scene.uniqueName(name)
+                scene.nodes[obj.name] = obj.nodeType
+            elif kind == 'addAttr':
+                scene.dynamicAttrs.setdefault(op[1].name, set()).add(op[2])
+            elif kind == 'connect':
+                scene.connect(op[1].name(), op[2].name())
+            elif kind == 'disconnect':
+                scene.disconnect(op[2].name())
+            elif kind == 'set':
+                scene.attrs[op[1].name()] = op[2]
+
+    def undoIt(self):
+        pass
+
+#------------------------------------------------
+def install(api=True):
+    # Registers the fake maya modules and exposes the tool modules flat
+    if 'maya.cmds' not in sys.modules:
+        maya = types.ModuleType('maya')
+        cmds = types.ModuleType('maya.cmds')
+        for name, value in list(globals().items()):
+            if callable(value) and getattr(value, '__module__', None) == __name__ and name[0].islower() \
+                    and name not in ('install', 'reset', 'setLatency', 'executeDeferred', 'processIdleEvents'):
+                setattr(cmds, name, value)
+        maya.cmds = cmds
+        mayaUtils = types.ModuleType('maya.utils')
+        mayaUtils.executeDeferred = executeDeferred
+        maya.utils = mayaUtils
+        sys.modules['maya'] = maya
+        sys.modules['maya.cmds'] = cmds
+        sys.modules['maya.utils'] = mayaUtils
+        if api:
+            mayaApi = types.ModuleType('maya.api')
+            openMaya = types.ModuleType('maya.api.OpenMaya')
+            for cls in (MObject, MPlug, MFnDependencyNode, MSelectionList, MFnData, MFnTypedAttribute, MDGModifier,
+                        MPxCommand, MFnPlugin):
+                setattr(openMaya, cls.__name__, cls)
+            mayaApi.OpenMaya = openMaya
+            maya.api = mayaApi
+            sys.modules['maya.api'] = mayaApi
+            sys.modules['maya.api.OpenMaya'] = openMaya
+    if PACKAGE_DIR not in sys.path:
+        sys.path.insert(0, PACKAGE_DIR)
+    return sys.modules['maya.cmds']
+
+def reset():
+    scene.reset()
+    MDGModifier.doItCalls = 0
+
+# maya.utils idle queue, drained by processIdleEvents on the calling thread
+idleQueue = []
+_idleLock = threading.Lock()
+
+def executeDeferred(func, *args):
+    with _idleLock:
+        idleQueue.append((func, args))
+
+def processIdleEvents():
+    # Runs queued callbacks, including ones they queue, returns how many ran
+    count = 0
+    while True:
+        with _idleLock:
+            if not idleQueue:
+                return count
+            func, args = idleQueue.pop(0)
+        func(*args)
+        count += 1
+
+def setLatency(seconds):
+    # Simulated cost of one command round trip, 0 turns it off
+    global latency
+    latency = seconds
@@ -0,0 +1,28 @@
+"""
+Stand-in for mayapy that runs a script against the Maya stub
+
+Lets the headless batch build run without Maya:
+python -m autoShaderTool build manifest.json --mayapy "python benchmarks/stubMayapy.py"
+
+Takes a script path or -m module, like mayapy.
+
+"""
+#------------------------------------------------
+import os
+import runpy
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import mayaStub
+mayaStub.install()
+
+if __name__ == "__main__":
+    if sys.argv[1] == '-m':
+        module = sys.argv[2]
+        sys.argv = [module] + sys.argv[3:]
+        runpy.run_module(module, run_name='__main__', alter_sys=True)
+    else:
+        script = sys.argv[1]
+        sys.argv = sys.argv[1:]
+        sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+        runpy.run_path(script, run_name='__main__')
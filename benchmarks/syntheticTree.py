@@ -0,0 +1,113 @@
+"""
+Synthetic texture delivery trees for benchmarks
+
+Writes empty files laid out like a vendor delivery: nested category and
+asset folders, several naming conventions, UDIM tile sets, version
+folders and non texture clutter. The same (fileCount, seed) always gives
+the same tree.
+
+Author: Nieves Yashuang Lopez
+Version: 1.0
+
+"""
+#------------------------------------------------
+import json
+import os
+import random
+
+CATEGORIES = ['props', 'furniture', 'vehicles', 'architecture', 'foliage', 'characters']
+ASSETS = ['chair', 'table', 'lamp', 'sofa', 'shelf', 'rug', 'door', 'window', 'crate', 'barrel',
+          'car', 'truck', 'tree', 'bush', 'rock', 'wall', 'pillar', 'hero', 'robot', 'cabinet']
+# Map names per naming convention, roughly what Substance and Megascans exports look like
+CONVENTIONS = [
+    ['BaseColor', 'Metalness', 'Roughness', 'Normal', 'Height', 'AO', 'Opacity', 'Emissive'],
+    ['Albedo', 'Metallic', 'Rough', 'NormalGL', 'Displacement', 'Occlusion'],
+    ['diff', 'spec', 'nor', 'disp'],
+    ['col', 'rough', 'bump', 'height'],
+    ['BaseColor', 'ORM', 'Normal', 'Height'],
+]
+EXTENSIONS = ['.png', '.png', '.png', '.jpg', '.exr', '.tif', '.tx']
+CLUTTER = ['preview.jpg', 'thumbnail.png', 'readme.txt', 'source.spp', 'scene.blend', 'info.json']
+UDIM_RATIO = 0.3
+TREE_VERSION = 1
+
+#------------------------------------------------
+def _assetFiles(rng, assetName):
+    # Relative paths of one asset folder
+    files = []
+    maps = rng.choice(CONVENTIONS)
+    extension = rng.choice(EXTENSIONS)
+    resolution = rng.choice(['', '_2k', '_4k', '_8K'])
+    separator = rng.choice(['_', '-', '_'])
+    versions = ['v%03d' % (i + 1) for i in range(rng.choice([1, 1, 1, 2, 3]))]
+    tiles = [1001 + i for i in range(rng.randint(2, 24))] if rng.random() < UDIM_RATIO else None
+
+    for version in versions:
+        folder = os.path.join('textures', version) if len(versions) > 1 else 'textures'
+        for mapName in maps:
+            stem = f"{assetName}{separator}{mapName}{resolution}"
+            if tiles:
+                files.extend(os.path.join(folder, f"{stem}.{tile}{extension}") for tile in tiles)
+            else:
+                files.append(os.path.join(folder, stem + extension))
+    files.extend(rng.sample(CLUTTER, rng.randint(0, 3)))
+    return files
+
+def iterTreeFiles(fileCount, seed=1):
+    # Relative paths of the tree, stops at fileCount
+    rng = random.Random(seed)
+    count = 0
+    index = 0
+    while True:
+        category = CATEGORIES[index % len(CATEGORIES)]
+        assetName = f"{ASSETS[rng.randrange(len(ASSETS))]}{index:06d}"
+        group = f"set{index // 200:04d}"
+        for relative in _assetFiles(rng, assetName):
+            if count >= fileCount:
+                return
+            yield os.path.join(category, group, assetName, relative)
+            count += 1
+        index += 1
+
+def makeTree(root, fileCount, seed=1):
+    """Creates the tree under root/<fileCount>_<seed>, returns its path.
+
+    An existing, complete tree for the same parameters is reused; a
+    marker file is written last so an interrupted run is redone.
+    """
+    treeDir = os.path.join(root, f"{fileCount}_{seed}")
+    marker = os.path.join(treeDir, '.tree.json')
+    expected = {'version': TREE_VERSION, 'files': fileCount, 'seed': seed}
+    try:
+        with open(marker, 'r') as f:
+            if json.load(f) == expected:
+                return treeDir
+    except (OSError, ValueError):
+        pass
+
+    madeDirs = set()
+    for relative in iterTreeFiles(fileCount, seed):
+        path = os.path.join(treeDir, relative)
+        folder = os.path.dirname(path)
+        if folder not in madeDirs:
+            os.makedirs(folder, exist_ok=True)
+            madeDirs.add(folder)
+        open(path, 'ab').close()
+    os.makedirs(treeDir, exist_ok=True)
+    with open(marker, 'w') as f:
+        json.dump(expected, f)
+    return treeDir
+
+def listAssetFolders(treeDir, limit=None):
+    # Asset folders of a tree in creation order
+    folders = []
+    for category in sorted(os.listdir(treeDir)):
+        categoryDir = os.path.join(treeDir, category)
+        if not os.path.isdir(categoryDir):
+            continue
+        for group in sorted(os.listdir(categoryDir)):
+            for assetName in sorted(os.listdir(os.path.join(categoryDir, group))):
+                folders.append(os.path.join(categoryDir, group, assetName))
+                if limit and len(folders) >= limit:
+                    return folders
+    return folders
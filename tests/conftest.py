@@ -0,0 +1,30 @@
+"""
+Shared setup for the Auto Shader Tool tests
+
+Tests run against the in-memory Maya stub from benchmarks/mayaStub.py and
+import the tool through its package, the way Maya loads it.
+
+"""
+#------------------------------------------------
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, 'benchmarks')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# Caches of this run, worker processes inherit it too
+os.environ['AUTOSHADER_CACHE_DIR'] = tempfile.mkdtemp(prefix='autoShaderTests')
+
+import mayaStub
+mayaStub.install()
+
+#------------------------------------------------
+@pytest.fixture(autouse=True)
+def scene():
+    mayaStub.reset()
+    return mayaStub.scene
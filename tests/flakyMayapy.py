@@ -0,0 +1,51 @@
+"""
+Stand-in mayapy whose builds fail on purpose
+
+Runs the batch worker against the Maya stub. An asset folder may hold a
+behavior.json naming the attempts that fail, kill the worker or never
+answer: {"fail": [1], "crash": [1], "hang": [1]}. Attempts are counted
+in an 'attempts' file next to it, so they add up across workers.
+
+"""
+#------------------------------------------------
+import json
+import os
+import runpy
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+import mayaStub
+mayaStub.install()
+
+from autoShaderTool import batchBuild
+
+_buildAsset = batchBuild.buildAsset
+
+def buildAsset(job, options):
+    behaviorPath = os.path.join(job['path'], 'behavior.json')
+    if os.path.exists(behaviorPath):
+        with open(behaviorPath, 'r') as f:
+            behavior = json.load(f)
+        countPath = os.path.join(job['path'], 'attempts')
+        attempt = 1
+        if os.path.exists(countPath):
+            with open(countPath, 'r') as f:
+                attempt = int(f.read()) + 1
+        with open(countPath, 'w') as f:
+            f.write(str(attempt))
+        if attempt in behavior.get('crash', ()):
+            os._exit(3)
+        if attempt in behavior.get('hang', ()):
+            time.sleep(60)
+        if attempt in behavior.get('fail', ()):
+            raise RuntimeError(f"planned failure on attempt {attempt}")
+    return _buildAsset(job, options)
+
+batchBuild.buildAsset = buildAsset
+
+if __name__ == "__main__":
+    # Called as: flakyMayapy.py -m autoShaderTool worker
+    module = sys.argv[2]
+    sys.argv = [module] + sys.argv[3:]
+    runpy.run_module(module, run_name='__main__', alter_sys=True)
@@ -0,0 +1,159 @@
+"""
+Tests for the headless batch build
+
+Workers run benchmarks/stubMayapy.py style interpreters, so every build
+goes through real worker processes and the real commit plugin.
+
+"""
+#------------------------------------------------
+import json
+import os
+import shlex
+import sys
+
+import pytest
+
+from autoShaderTool import batchBuild
+
+FLAKY_MAYAPY = shlex.join([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'flakyMayapy.py')])
+
+def makeAsset(folder, name, behavior=None):
+    path = os.path.join(folder, name)
+    os.makedirs(path)
+    for mapName in ('BaseColor', 'Roughness', 'Normal'):
+        open(os.path.join(path, f"{name}_{mapName}.png"), 'w').close()
+    if behavior:
+        with open(os.path.join(path, 'behavior.json'), 'w') as f:
+            json.dump(behavior, f)
+    return path
+
+def makeManifest(folder, manifest):
+    path = os.path.join(folder, 'manifest.json')
+    with open(path, 'w') as f:
+        json.dump(manifest, f)
+    return path
+
+def runBuilder(tmp_path, assets, **kwargs):
+    # assets: {name: behavior or None}, returns {name: result}
+    kit = tmp_path / 'kit'
+    jobs = []
+    for name, behavior in assets.items():
+        path = makeAsset(str(kit), name, behavior)
+        jobs.append({'name': name, 'path': path, 'output': str(tmp_path / 'out' / (name + '.ma'))})
+    builder = batchBuild.BatchBuilder(shlex.split(FLAKY_MAYAPY), dict(batchBuild.DEFAULT_OPTIONS), **kwargs)
+    return builder.run(jobs)
+
+#------------------------------------------------
+def testLoadManifest(tmp_path):
+    kit = tmp_path / 'kits' / 'furniture'
+    for name in ('table', 'chair', '.hidden'):
+        (kit / name).mkdir(parents=True)
+    (kit / 'readme.txt').write_text("")
+    (tmp_path / 'props' / 'chair').mkdir(parents=True)
+    (tmp_path / 'props' / 'lamp').mkdir(parents=True)
+    manifestPath = makeManifest(str(tmp_path), {
+        'output': 'lib',
+        'roots': ['kits/furniture'],
+        'assets': ['props/chair', {'path': 'props/lamp', 'name': 'deskLamp'}],
+        'options': {'useUdim': True, 'backend': 'cmds'}})
+
+    jobs, options = batchBuild.loadManifest(manifestPath)
+
+    # Root subfolders sorted, then assets in manifest order; repeated names get a suffix
+    assert [job['name'] for job in jobs] == ['chair', 'table', 'chair_2', 'deskLamp']
+    assert jobs[2]['path'] == str(tmp_path / 'props' / 'chair')
+    assert jobs[3]['path'] == str(tmp_path / 'props' / 'lamp')
+    assert jobs[3]['output'] == str(tmp_path / 'lib' / 'deskLamp.ma')
+    assert options['useUdim'] is True and options['backend'] == 'cmds'
+    assert options['convertToTx'] == batchBuild.DEFAULT_OPTIONS['convertToTx']
+
+def testLoadManifestMissingRoot(tmp_path):
+    manifestPath = makeManifest(str(tmp_path), {'roots': ['missing']})
+    with pytest.raises(RuntimeError):
+        batchBuild.loadManifest(manifestPath)
+
+def testBuildsWithApiBackend(tmp_path):
+    results = runBuilder(tmp_path, {'chair': None, 'lamp': None}, workers=2)
+    assert all(result['ok'] for result in results.values()), results
+    assert results['chair']['materials'] == ['chair_SHD']
+    with open(results['chair']['output'], 'r') as f:
+        assert 'createNode aiStandardSurface -n "chair_SHD"' in f.read()
+
+def testRetriesFailedAsset(tmp_path):
+    results = runBuilder(tmp_path, {'chair': {'fail': [1]}}, workers=1, retries=1)
+    assert results['chair']['ok'] and results['chair']['attempts'] == 2
+
+def testGivesUpAfterRetries(tmp_path):
+    results = runBuilder(tmp_path, {'chair': {'fail': [1, 2, 3]}}, workers=1, retries=1)
+    assert not results['chair']['ok'] and results['chair']['attempts'] == 2
+    assert 'planned failure' in results['chair']['error']
+
+def testAssetErrorIsNotRetried(tmp_path):
+    empty = tmp_path / 'kit' / 'empty'
+    empty.mkdir(parents=True)
+    job = {'name': 'empty', 'path': str(empty), 'output': str(tmp_path / 'out' / 'empty.ma')}
+    builder = batchBuild.BatchBuilder(shlex.split(FLAKY_MAYAPY), dict(batchBuild.DEFAULT_OPTIONS), workers=1, retries=2)
+    result = builder.run([job])['empty']
+    assert not result['ok'] and result['attempts'] == 1
+    assert "No textures found" in result['error']
+
+def testTimeoutKillsAndRestartsWorker(tmp_path):
+    # One worker: the asset after the hung one needs the restarted process
+    results = runBuilder(tmp_path, {'chair': {'hang': [1]}, 'lamp': None}, workers=1, retries=1, timeout=3)
+    assert results['chair']['ok'] and results['chair']['attempts'] == 2
+    assert results['lamp']['ok'] and results['lamp']['attempts'] == 1
+
+def testTimeoutWithoutRetry(tmp_path):
+    results = runBuilder(tmp_path, {'chair': {'hang': [1]}}, workers=1, retries=0, timeout=1)
+    assert not results['chair']['ok']
+    assert 'timed out' in results['chair']['error']
+
+def testCrashedWorkerIsReplaced(tmp_path):
+    results = runBuilder(tmp_path, {'chair': {'crash': [1]}, 'lamp': None, 'sofa': None}, workers=1, retries=1)
+    assert results['chair']['ok'] and results['chair']['attempts'] == 2
+    assert results['lamp']['ok'] and results['sofa']['ok']
+
+#------------------------------------------------
+def testExitCodeAndReport(tmp_path, capsys):
+    kit = str(tmp_path / 'kit')
+    makeAsset(kit, 'chair')
+    makeAsset(kit, 'lamp', {'fail': [1]})
+    makeAsset(kit, 'sofa', {'fail': [1, 2]})
+    manifestPath = makeManifest(str(tmp_path), {'output': 'out', 'roots': ['kit']})
+    reportPath = str(tmp_path / 'report.json')
+
+    code = batchBuild.main(['build', manifestPath, '--mayapy', FLAKY_MAYAPY, '--retries', '1', '-j', '2',
+                            '--report', reportPath])
+
+    assert code == 1
+    with open(reportPath, 'r') as f:
+        report = json.load(f)
+    assert report['built'] == 2 and report['failed'] == 1
+    assert [asset['name'] for asset in report['assets']] == ['chair', 'lamp', 'sofa']
+    chair, lamp, sofa = report['assets']
+    assert chair['ok'] and chair['attempts'] == 1 and os.path.exists(chair['output'])
+    assert lamp['ok'] and lamp['attempts'] == 2
+    assert not sofa['ok'] and sofa['attempts'] == 2 and 'planned failure' in sofa['error']
+    assert "2 built, 1 failed, 2 needed a retry" in capsys.readouterr().out
+
+def testExitCodeWhenEverythingBuilds(tmp_path):
+    makeAsset(str(tmp_path / 'kit'), 'chair')
+    manifestPath = makeManifest(str(tmp_path), {'output': 'out', 'roots': ['kit']})
+    assert batchBuild.main(['build', manifestPath, '--mayapy', FLAKY_MAYAPY]) == 0
+    # Nothing left to do with --skip-existing
+    assert batchBuild.main(['build', manifestPath, '--mayapy', FLAKY_MAYAPY, '--skip-existing']) == 0
+
+def testMissingMayapy(tmp_path):
+    makeAsset(str(tmp_path / 'kit'), 'chair')
+    makeAsset(str(tmp_path / 'kit'), 'lamp')
+    manifestPath = makeManifest(str(tmp_path), {'output': 'out', 'roots': ['kit']})
+    reportPath = str(tmp_path / 'report.json')
+
+    code = batchBuild.main(['build', manifestPath, '--mayapy', str(tmp_path / 'missing' / 'mayapy'),
+                            '--report', reportPath])
+
+    assert code == 1
+    with open(reportPath, 'r') as f:
+        report = json.load(f)
+    assert report['built'] == 0 and report['failed'] == 2
+    assert all('worker error' in asset['error'] for asset in report['assets'])
@@ -0,0 +1,77 @@
+"""
+Tests for channel packing with numpy and Pillow
+
+"""
+#------------------------------------------------
+import os
+import subprocess
+import sys
+import warnings
+
+import pytest
+
+from autoShaderTool import channelPacker
+
+np = pytest.importorskip('numpy')
+Image = pytest.importorskip('PIL.Image')
+
+@pytest.fixture
+def pillowOnly(monkeypatch):
+    channelPacker._loadLibraries()
+    monkeypatch.setattr(channelPacker, 'oiio', None)
+
+def writeGray(path, pixels):
+    Image.fromarray(pixels).save(str(path))
+    return str(path)
+
+def readRgb(path):
+    with Image.open(path) as image:
+        assert image.mode == 'RGB'
+        return np.asarray(image)
+
+#------------------------------------------------
+def testImportLoadsNoImageLibrary():
+    code = "import sys; from autoShaderTool import channelPacker; print('numpy' in sys.modules, 'PIL' in sys.modules)"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, '-c', code], cwd=root, stdout=subprocess.PIPE, check=True)
+    assert output.stdout.split() == [b'False', b'False']
+
+def testPacks8Bit(tmp_path, pillowOnly):
+    ao = writeGray(tmp_path / 'chair_AO.png', np.full((4, 8), 200, np.uint8))
+    roughness = writeGray(tmp_path / 'chair_Roughness.png', np.arange(32, dtype=np.uint8).reshape(4, 8))
+    output = str(tmp_path / 'chair_ORM.png')
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        channelPacker.packChannels({'ao': ao, 'roughness': roughness}, output, 'orm')
+    pixels = readRgb(output)
+    assert (pixels[..., 0] == 200).all()
+    assert (pixels[..., 1] == np.arange(32).reshape(4, 8)).all()
+    # No metalness map: DEFAULT_VALUES
+    assert (pixels[..., 2] == 0).all()
+
+def test16BitFallsBackTo8Bit(tmp_path, pillowOnly):
+    ao = writeGray(tmp_path / 'chair_AO.png', np.full((4, 8), 65535, np.uint16))
+    roughness = writeGray(tmp_path / 'chair_Roughness.png', np.full((4, 8), 32896, np.uint16))
+    metalness = writeGray(tmp_path / 'chair_Metalness.png', np.zeros((4, 8), np.uint8))
+    output = str(tmp_path / 'chair_ARM.png')
+    with pytest.warns(RuntimeWarning, match="packed as 8 bit"):
+        channelPacker.packChannels({'ao': ao, 'roughness': roughness, 'metalness': metalness}, output, 'arm')
+    pixels = readRgb(output)
+    assert (pixels[..., 0] == 255).all() and (pixels[..., 1] == 128).all() and (pixels[..., 2] == 0).all()
+
+def test16BitUdimSetInWorkers(tmp_path, pillowOnly):
+    for tile in (1001, 1002):
+        writeGray(tmp_path / f"chair_AO.{tile}.png", np.full((4, 4), 65535, np.uint16))
+        writeGray(tmp_path / f"chair_Roughness.{tile}.png", np.full((4, 4), 0, np.uint16))
+    output = str(tmp_path / 'chair_ORM.<UDIM>.png')
+    channelPaths = {'ao': str(tmp_path / 'chair_AO.<UDIM>.png'), 'roughness': str(tmp_path / 'chair_Roughness.<UDIM>.png')}
+    with pytest.warns(RuntimeWarning, match="packed as 8 bit"):
+        results = channelPacker.packTextureSet(channelPaths, output, 'orm', maxWorkers=2)
+    assert results == {str(tmp_path / 'chair_ORM.1001.png'): None, str(tmp_path / 'chair_ORM.1002.png'): None}
+    assert (readRgb(str(tmp_path / 'chair_ORM.1002.png'))[..., 0] == 255).all()
+
+def testResolutionMismatch(tmp_path, pillowOnly):
+    ao = writeGray(tmp_path / 'chair_AO.png', np.zeros((4, 8), np.uint8))
+    roughness = writeGray(tmp_path / 'chair_Roughness.png', np.zeros((8, 8), np.uint8))
+    with pytest.raises(ValueError):
+        channelPacker.packChannels({'ao': ao, 'roughness': roughness}, str(tmp_path / 'chair_ORM.png'))
@@ -0,0 +1,72 @@
+"""
+Tests for the shader network builders
+
+The api backend must build the same graph as the cmds backend with one
+MDGModifier.doIt per batch and a fixed number of cmds calls.
+
+"""
+#------------------------------------------------
+import pytest
+
+import mayaStub
+from autoShaderTool import nodeBuilder
+from autoShaderTool import shaderMain
+
+TEXTURES = {'baseColor': '/tex/{0}_BaseColor.png', 'metalness': '/tex/{0}_Metalness.png',
+            'roughness': '/tex/{0}_Roughness.png', 'normal': '/tex/{0}_Normal.png',
+            'displacement': '/tex/{0}_Height.exr', 'specular': '/tex/{0}_Specular.png',
+            'emission': '/tex/{0}_Emissive.png', 'opacity': '/tex/{0}_Opacity.png', 'ao': '/tex/{0}_AO.png'}
+# ls(nodeTypes), ls(file), ls(proxied), ls(names), pluginInfo x2, autoShaderCommit, inViewMessage
+MAX_API_CALLS = 8
+
+def makeGroups(count):
+    return dict((f"asset{i}", dict((t, p.format(f"asset{i}")) for t, p in TEXTURES.items())) for i in range(count))
+
+def build(backend, func):
+    # (cmds calls, doIt calls, scene graph) of func(creator) on an empty scene
+    mayaStub.reset()
+    # Loaded once per session in Maya, not part of a build
+    mayaStub.loadPlugin(nodeBuilder.COMMIT_PLUGIN)
+    mayaStub.scene.calls.clear()
+    mayaStub.MDGModifier.doItCalls = 0
+    creator = shaderMain.ArnoldShaderCreator()
+    creator.builderBackend = backend
+    func(creator)
+    return sum(mayaStub.scene.calls.values()), mayaStub.MDGModifier.doItCalls, mayaStub.scene.graph()
+
+#------------------------------------------------
+@pytest.mark.parametrize('count', [1, 5, 40])
+def testApiBackendRoundTrips(count):
+    groups = makeGroups(count)
+    calls, doItCalls, _ = build('api', lambda creator: creator.createShaderNetworks(groups))
+    assert doItCalls == 1
+    # Fixed per batch, so at most MAX_API_CALLS per material whatever the count
+    assert calls <= MAX_API_CALLS
+
+@pytest.mark.parametrize('count', [1, 5, 40])
+def testApiBackendMatchesCmds(count):
+    groups = makeGroups(count)
+    cmdsCalls, _, cmdsGraph = build('cmds', lambda creator: creator.createShaderNetworks(groups))
+    apiCalls, _, apiGraph = build('api', lambda creator: creator.createShaderNetworks(groups))
+    assert apiGraph == cmdsGraph
+    assert apiCalls < cmdsCalls
+
+def testSingleMaterialRoundTrips():
+    textures = makeGroups(1)['asset0']
+
+    def single(creator):
+        meshes = [mayaStub.scene.addMesh(f"mesh{i}") for i in range(10)]
+        creator.createShaderNetwork('asset0', meshes, textures)
+
+    cmdsCalls, _, cmdsGraph = build('cmds', single)
+    apiCalls, doItCalls, apiGraph = build('api', single)
+    assert apiGraph == cmdsGraph
+    assert doItCalls == 1
+    # Plus pluginInfo for mtoa and one sets call assigning the meshes
+    assert apiCalls <= MAX_API_CALLS + 2
+
+def testCommitIsOneUndoStep():
+    groups = makeGroups(3)
+    build('api', lambda creator: creator.createShaderNetworks(groups))
+    assert mayaStub.scene.calls[nodeBuilder.COMMIT_COMMAND] == 1
+    assert not nodeBuilder.pendingModifiers
@@ -0,0 +1,82 @@
+"""
+Tests for the persistent scan index
+
+"""
+#------------------------------------------------
+import os
+import stat
+import threading
+
+import pytest
+
+from autoShaderTool import scanIndex
+from autoShaderTool import shaderMain
+
+#------------------------------------------------
+@pytest.mark.skipif(os.name == 'nt', reason="no umask on Windows")
+def testTempFileFollowsUmask(tmp_path):
+    previous = os.umask(0o027)
+    try:
+        fd, tempPath = scanIndex.makeTempFile(str(tmp_path / 'index.json'))
+        os.close(fd)
+        assert stat.S_IMODE(os.stat(tempPath).st_mode) == 0o640
+        # Left as it was
+        assert os.umask(0o027) == 0o027
+    finally:
+        os.umask(previous)
+    assert os.path.basename(tempPath).startswith('index.') and tempPath.endswith('.tmp')
+
+def testTempFilesAreUnique(tmp_path):
+    paths = set()
+    for _ in range(50):
+        fd, tempPath = scanIndex.makeTempFile(str(tmp_path / 'sub' / 'index.json'))
+        os.close(fd)
+        paths.add(tempPath)
+    assert len(paths) == 50
+
+def testWriteJson(tmp_path):
+    path = str(tmp_path / 'index.json')
+    scanIndex.writeJson(path, {'a': 1})
+    scanIndex.writeJson(path, {'a': 2})
+    with open(path, 'r') as f:
+        assert f.read() == '{"a":2}'
+    assert os.listdir(str(tmp_path)) == ['index.json']
+
+#------------------------------------------------
+def testMemoWritesWhileSaving(tmp_path):
+    index = scanIndex.ScanIndex(str(tmp_path / 'scanIndex.json'))
+    entry = index.openRoot(str(tmp_path), 'listing', 'classifier')
+    memo = index.typeMemo(entry)
+    stop = threading.Event()
+    errors = []
+
+    def save():
+        while not stop.is_set():
+            try:
+                index.markDirty()
+                index.save()
+                index.prune(entry, set(), set(f"name{i}" for i in range(0, 20000, 2)))
+            except RuntimeError as e:
+                errors.append(e)
+                return
+
+    saver = threading.Thread(target=save)
+    saver.start()
+    try:
+        for i in range(20000):
+            memo[f"name{i}"] = ['baseColor']
+    finally:
+        stop.set()
+        saver.join()
+    assert not errors
+    assert memo.get('name0') == ['baseColor']
+
+def testScanStoresClassifierResults(tmp_path):
+    for name in ('chair_BaseColor.png', 'chair_Roughness.png'):
+        (tmp_path / name).write_text("")
+    manager = shaderMain.ArnoldTextureManager()
+    manager.scanIndex = scanIndex.ScanIndex(str(tmp_path / 'cache' / 'scanIndex.json'))
+    textures = manager.findTextures(str(tmp_path))
+    assert sorted(textures) == ['baseColor', 'roughness']
+    entry = manager.scanIndex.roots[os.path.normpath(str(tmp_path))]
+    assert sorted(entry['types']) == ['chair_basecolor', 'chair_roughness']
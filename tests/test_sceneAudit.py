@@ -0,0 +1,73 @@
+"""
+Tests for the scene texture audit fixes
+
+"""
+#------------------------------------------------
+import os
+
+import pytest
+
+import mayaStub
+from autoShaderTool import nodeBuilder
+from autoShaderTool import sceneAudit
+from autoShaderTool import shaderMain
+
+def makeProxiedMaterial(tmp_path, backend='cmds'):
+    # (creator, file node) of a chair material whose base color shows a viewport proxy
+    source = tmp_path / 'chair_BaseColor.png'
+    source.write_text("")
+    proxy = tmp_path / 'proxies' / 'chair_BaseColor.png'
+    proxy.parent.mkdir()
+    proxy.write_text("")
+    creator = shaderMain.ArnoldShaderCreator()
+    creator.builderBackend = backend
+    creator.textureManager.proxies = {str(source): str(proxy)}
+    material = creator.createShaderNetworks({'chair': {'baseColor': str(source)}})['chair']
+    fileNode = creator.getMaterialFileNodes([material])[material]['baseColor']
+    assert mayaStub.getAttr(f"{fileNode}.fileTextureName") == str(proxy)
+    return creator, fileNode
+
+def makeTx(tmp_path):
+    # Up to date .tx next to the source
+    source = str(tmp_path / 'chair_BaseColor.png')
+    txPath = str(tmp_path / 'chair_BaseColor.tx')
+    with open(txPath, 'w') as f:
+        f.write("")
+    stat = os.stat(source)
+    os.utime(txPath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    return txPath
+
+def assertShowsFullPath(fileNode, path):
+    assert mayaStub.getAttr(f"{fileNode}.fileTextureName") == path
+    assert mayaStub.getAttr(f"{fileNode}.{nodeBuilder.FULL_PATH_ATTR}") == path
+    assert mayaStub.getAttr(f"{fileNode}.{nodeBuilder.PROXY_PATH_ATTR}") == ''
+
+#------------------------------------------------
+def testRelinkDropsProxy(tmp_path):
+    creator, fileNode = makeProxiedMaterial(tmp_path)
+    newPath = str(tmp_path / 'v2' / 'chair_BaseColor.png')
+    change = shaderMain.RelinkChange('chair_SHD', 'baseColor', fileNode, str(tmp_path / 'chair_BaseColor.png'),
+                                     newPath, 0)
+    assert creator.applyRelink([change]) == 1
+    assertShowsFullPath(fileNode, newPath)
+
+@pytest.mark.parametrize('backend', ['cmds', 'api'])
+def testTxFixDropsProxy(tmp_path, backend):
+    creator, fileNode = makeProxiedMaterial(tmp_path, backend)
+    txPath = makeTx(tmp_path)
+    auditor = sceneAudit.SceneAuditor(creator)
+    issues = auditor.audit()
+    assert [(issue.kind, issue.fix) for issue in issues if issue.node == fileNode] == [
+        ('notTx', ('fileTextureName', txPath))]
+    assert auditor.applyFixes(issues) == 1
+    assertShowsFullPath(fileNode, txPath)
+
+@pytest.mark.parametrize('backend, doItCalls', [(None, 0), ('api', 1)])
+def testAuditSceneBackend(tmp_path, backend, doItCalls):
+    # Fixes go through the shader creator's builder unless backend is given
+    _, fileNode = makeProxiedMaterial(tmp_path)
+    txPath = makeTx(tmp_path)
+    mayaStub.MDGModifier.doItCalls = 0
+    sceneAudit.auditScene(fix=True, backend=backend)
+    assert mayaStub.MDGModifier.doItCalls == doItCalls
+    assertShowsFullPath(fileNode, txPath)
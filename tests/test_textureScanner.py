@@ -0,0 +1,67 @@
+"""
+Tests for texture classification and the first match scan
+
+"""
+#------------------------------------------------
+import os
+
+from autoShaderTool import shaderMain
+
+CORE_MAPS = ['BaseColor', 'Normal', 'Height', 'Specular', 'Emissive', 'Opacity']
+CHANNEL_MAPS = ['AO', 'Roughness', 'Metalness']
+
+def makeTree(folder, maps, subdirCount=5):
+    # Maps in the root, subdirCount folders of unrelated files below it
+    for mapName in maps:
+        (folder / f"chair_{mapName}.png").write_text("")
+    for i in range(subdirCount):
+        subdir = folder / f"variant{i}"
+        subdir.mkdir()
+        (subdir / f"table_BaseColor.png").write_text("")
+    return str(folder)
+
+def scan(directory, firstMatchOnly=True):
+    # (textures, listed directories passed on to the classifier)
+    manager = shaderMain.ArnoldTextureManager()
+    manager.useScanIndex = False
+    manager.firstMatchOnly = firstMatchOnly
+    batches = []
+    textures = manager.findTextures(directory, lambda filesSeen, matches: batches.append(filesSeen))
+    return textures, len(batches)
+
+#------------------------------------------------
+def testCoveredTypes():
+    classifier = shaderMain.ArnoldTextureManager().getClassifier()
+    assert classifier.coveredTypes({'baseColor': 'a'}) == {'baseColor'}
+    assert classifier.coveredTypes({'normal': 'a'}) == {'normal', 'bump'}
+    assert classifier.coveredTypes({'orm': 'a'}) == {'orm', 'arm', 'mrao', 'ao', 'roughness', 'metalness'}
+    assert classifier.coveredTypes({'ao': 'a', 'roughness': 'b'}) == {'ao', 'roughness'}
+    assert classifier.coveredTypes({'ao': 'a', 'roughness': 'b', 'metalness': 'c'}) == {
+        'ao', 'roughness', 'metalness', 'orm', 'arm', 'mrao'}
+
+def testStopsOnceEveryMapIsFound(tmp_path):
+    textures, batches = scan(makeTree(tmp_path, CORE_MAPS + CHANNEL_MAPS))
+    assert batches == 1
+    # No bump map needed next to the normal map
+    assert sorted(textures) == ['ao', 'baseColor', 'displacement', 'emission', 'metalness',
+                                'normal', 'opacity', 'roughness', 'specular']
+    assert textures['baseColor'].endswith('chair_BaseColor.png')
+
+def testStopsOncePackedMapCoversChannels(tmp_path):
+    textures, batches = scan(makeTree(tmp_path, CORE_MAPS + ['ORM']))
+    assert batches == 1
+    assert textures['orm'].endswith('chair_ORM.png')
+    assert 'roughness' not in textures
+
+def testWalksEverythingWhileMapsAreMissing(tmp_path):
+    textures, batches = scan(makeTree(tmp_path, ['BaseColor', 'Normal', 'ORM']))
+    assert batches == 6
+    assert sorted(textures) == ['baseColor', 'normal', 'orm']
+
+def testSortedScanWalksEverything(tmp_path):
+    # Full results: the separate roughness map wins over the packed channel
+    directory = makeTree(tmp_path, CORE_MAPS + ['ORM'])
+    (tmp_path / 'variant0' / 'chair_Roughness.png').write_text("")
+    textures, batches = scan(directory, firstMatchOnly=False)
+    assert batches == 6
+    assert textures['roughness'] == os.path.join(directory, 'variant0', 'chair_Roughness.png')
@@ -0,0 +1,128 @@
+"""
+Tests for the .tx converter and viewport proxies
+
+A small python copy command stands in for maketx and oiiotool, sources
+with 'Broken' in their name make it fail.
+
+"""
+#------------------------------------------------
+import os
+import sys
+
+import pytest
+
+from autoShaderTool import proxyGenerator
+from autoShaderTool import txConverter
+
+COPY_SCRIPT = ("import shutil, sys\n"
+               "source, target = sys.argv[1:3]\n"
+               "if 'Broken' in source:\n"
+               "    sys.exit('cannot read ' + source)\n"
+               "shutil.copyfile(source, target)\n")
+COPY_COMMAND = [sys.executable, '-c', COPY_SCRIPT, '{input}', '{output}']
+
+def makeFiles(folder, names):
+    paths = []
+    for name in names:
+        path = os.path.join(str(folder), name)
+        with open(path, 'w') as f:
+            f.write(name)
+        paths.append(path)
+    return paths
+
+def convert(paths):
+    converter = txConverter.TxConverter(COPY_COMMAND, maxWorkers=2)
+    return converter, converter.convertPaths(paths)
+
+#------------------------------------------------
+def testConvertsNextToSource(tmp_path):
+    paths = makeFiles(tmp_path, ['chair_BaseColor.png', 'chair_Roughness.png'])
+    converter, converted = convert(paths)
+    assert converted == dict((path, path[:-4] + '.tx') for path in paths)
+    assert converter.converted == 2 and converter.skipped == 0 and not converter.failed
+    with open(converted[paths[0]], 'r') as f:
+        assert f.read() == 'chair_BaseColor.png'
+    # Temporary outputs are renamed or removed
+    assert sorted(os.listdir(str(tmp_path))) == ['chair_BaseColor.png', 'chair_BaseColor.tx',
+                                                 'chair_Roughness.png', 'chair_Roughness.tx']
+
+def testSkipsUpToDateTargets(tmp_path):
+    paths = makeFiles(tmp_path, ['chair_BaseColor.png', 'chair_Roughness.png'])
+    convert(paths)
+    converter, converted = convert(paths)
+    assert converter.converted == 0 and converter.skipped == 2
+    assert len(converted) == 2
+
+    # A source newer than its .tx is converted again
+    target = os.stat(converted[paths[1]])
+    os.utime(paths[1], ns=(target.st_atime_ns, target.st_mtime_ns + 10 ** 9))
+    converter, converted = convert(paths)
+    assert converter.converted == 1 and converter.skipped == 1
+
+def testSkipsTxSources(tmp_path):
+    paths = makeFiles(tmp_path, ['chair_BaseColor.tx'])
+    converter, converted = convert(paths)
+    assert converted == {} and converter.converted == 0
+
+def testFindCollisions(tmp_path):
+    paths = [os.path.join(str(tmp_path), name) for name in
+             ('chair_BaseColor.exr', 'chair_BaseColor.png', 'chair_Roughness.png')]
+    collisions = txConverter.findCollisions(paths)
+    assert collisions == {paths[0]: [paths[1]], paths[1]: [paths[0]]}
+
+def testCollidingSourcesConvertOnce(tmp_path):
+    exr, png, roughness = makeFiles(tmp_path, ['chair_BaseColor.exr', 'chair_BaseColor.png', 'chair_Roughness.png'])
+    converter, converted = convert([exr, png, roughness])
+    assert converter.converted == 2
+    assert converter.failed == {png: f"same target as {exr}"}
+    assert converted == {exr: exr[:-4] + '.tx', roughness: roughness[:-4] + '.tx'}
+    with open(exr[:-4] + '.tx', 'r') as f:
+        assert f.read() == 'chair_BaseColor.exr'
+
+def testReportsFailures(tmp_path):
+    good, broken = makeFiles(tmp_path, ['chair_BaseColor.png', 'chair_Broken.png'])
+    converter, converted = convert([good, broken])
+    assert converted == {good: good[:-4] + '.tx'}
+    assert converter.converted == 1
+    assert list(converter.failed) == [broken]
+    assert converter.failed[broken] == f"cannot read {broken}"
+    # Nothing left behind that could pass for an up to date .tx
+    assert not os.path.exists(broken[:-4] + '.tx')
+    assert sorted(os.listdir(str(tmp_path))) == ['chair_BaseColor.png', 'chair_BaseColor.tx', 'chair_Broken.png']
+
+def testMissingConverter(tmp_path):
+    paths = makeFiles(tmp_path, ['chair_BaseColor.png'])
+    converter = txConverter.TxConverter([str(tmp_path / 'missing' / 'maketx')])
+    assert converter.convertPaths(paths) == {}
+    assert list(converter.failed) == paths
+
+def testUdimSetNeedsEveryTile(tmp_path):
+    makeFiles(tmp_path, ['chair_BaseColor.1001.png', 'chair_BaseColor.1002.png',
+                         'chair_Roughness.1001.png', 'chair_Roughness.1002.png'])
+    baseColor = os.path.join(str(tmp_path), 'chair_BaseColor.<UDIM>.png')
+    roughness = os.path.join(str(tmp_path), 'chair_Roughness.<UDIM>.png')
+    os.rename(os.path.join(str(tmp_path), 'chair_Roughness.1002.png'),
+              os.path.join(str(tmp_path), 'chair_RoughnessBroken.1002.png'))
+    roughnessBroken = os.path.join(str(tmp_path), 'chair_RoughnessBroken.<UDIM>.png')
+
+    converter, converted = convert([baseColor, roughness, roughnessBroken])
+    assert converted == {baseColor: os.path.join(str(tmp_path), 'chair_BaseColor.<UDIM>.tx'),
+                         roughness: os.path.join(str(tmp_path), 'chair_Roughness.<UDIM>.tx')}
+    assert converter.converted == 3 and len(converter.failed) == 1
+
+#------------------------------------------------
+def testConverterNeedsTargetPath():
+    with pytest.raises(TypeError):
+        txConverter.ExternalConverter(COPY_COMMAND)
+
+def testProxiesGoToCacheDir(tmp_path):
+    paths = makeFiles(tmp_path, ['chair_BaseColor.1001.png', 'chair_BaseColor.1002.png'])
+    generator = proxyGenerator.ProxyGenerator(256, COPY_COMMAND, proxyDir=str(tmp_path / 'proxies'))
+    tokenized = os.path.join(str(tmp_path), 'chair_BaseColor.<UDIM>.png')
+    proxies = generator.convertPaths([tokenized])
+    proxy = proxies[tokenized]
+    assert proxy.startswith(str(tmp_path / 'proxies' / '256').replace('\\', '/'))
+    assert os.path.basename(proxy) == 'chair_BaseColor.<UDIM>.png'
+    assert generator.converted == 2
+    # Proxies are never proxied again
+    assert generator.convertPaths([proxy]) == {}